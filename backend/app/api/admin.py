@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Club, User, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, ClasamentClub, ClasamentProba
+from .models import Club, User, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, ClasamentClub, ClasamentProba, JobImport, JobAnalizaVideo, ClipMeci, Revizie
 # Register your models here.
 
 admin.site.register(Club)
@@ -13,4 +13,8 @@ admin.site.register(Saltea)
 admin.site.register(Meci)
 admin.site.register(ClasamentClub)
 admin.site.register(ClasamentProba)
+admin.site.register(JobImport)
+admin.site.register(JobAnalizaVideo)
+admin.site.register(ClipMeci)
 
+admin.site.register(Revizie)
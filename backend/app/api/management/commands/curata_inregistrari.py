@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...utils.clipuri import curata_inregistrari
+
+
+class Command(BaseCommand):
+    help = (
+        "Șterge segmentele înregistrărilor mai vechi de --ore ore care nu aparțin niciunui "
+        "meci și clipurile MP4 tăiate (refăcute la cerere). Poate fi rulată periodic, din cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ore', type=float, default=settings.INREGISTRARI_RETENTIE_ORE,
+            help="Vârsta minimă, în ore, a fișierelor șterse"
+        )
+
+    def handle(self, *args, **options):
+        segmente, clipuri = curata_inregistrari(options['ore'])
+        self.stdout.write(self.style.SUCCESS(f"{segmente} segmente și {clipuri} clipuri șterse"))
@@ -0,0 +1,115 @@
+from statistics import median
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.operations import AddConstraint, AddIndex
+from ...models import Categorie, Inscriere, Meci, ClasamentProba, Runda
+from ...utils.date_sintetice import genereaza_competitie_sintetica
+import time
+
+# Migrarea cu indexurile compuse
+MIGRARE_INDEXURI = ('api', '0022_indexuri_si_constrangeri')
+
+
+class Command(BaseCommand):
+    help = (
+        "Afișează planul de execuție și durata interogărilor frecvente ale unui turneu, "
+        "cu și fără indexurile compuse (migrarea 0022), pe o competiție sintetică. Totul "
+        "rulează într-o bază de date de test creată și ștearsă de comandă; baza configurată "
+        "nu este atinsă."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meciuri', type=int, default=50000, help="Numărul aproximativ de meciuri generate")
+        parser.add_argument('--repetari', type=int, default=20, help="De câte ori este rulată fiecare interogare")
+
+    def handle(self, *args, **options):
+        # Baza de test are schema tuturor migrărilor; conexiunea trece pe ea până la final
+        nume_initial = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._compara(options['meciuri'], options['repetari'])
+        finally:
+            connection.creation.destroy_test_db(nume_initial, verbosity=0)
+
+    def _compara(self, numar_meciuri, repetari):
+        start = time.perf_counter()
+        competitie = genereaza_competitie_sintetica(numar_meciuri)
+        self.stdout.write(
+            f"Competiție sintetică: {Meci.objects.filter(competitie=competitie).count()} meciuri "
+            f"în {time.perf_counter() - start:.1f}s"
+        )
+
+        interogari = self._interogari(competitie)
+        self._analizeaza()
+        cu_indexuri = {nume: self._masoara(qs, repetari) for nume, qs in interogari.items()}
+
+        self._elimina_indexuri()
+        self._analizeaza()
+        fara_indexuri = {nume: self._masoara(qs, repetari) for nume, qs in interogari.items()}
+
+        for nume in interogari:
+            (plan_inainte, durata_inainte), (plan_dupa, durata_dupa) = fara_indexuri[nume], cu_indexuri[nume]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{nume}: {durata_inainte:.2f} ms -> {durata_dupa:.2f} ms"))
+            self.stdout.write(f"  Fără indexuri:\n{self._indenteaza(plan_inainte)}")
+            self.stdout.write(f"  Cu indexuri:\n{self._indenteaza(plan_dupa)}")
+
+    def _elimina_indexuri(self):
+        """
+        Anulează doar indexurile și constrângerile adăugate de 0022, pe starea
+        ultimei migrări: migrările ulterioare (coloanele lor) rămân aplicate.
+        Pe SQLite, eliminarea unei constrângeri reface tabelul din această stare.
+        """
+        loader = MigrationExecutor(connection).loader
+        migrare = loader.get_migration(*MIGRARE_INDEXURI)
+        stare = loader.project_state()
+        app_label = migrare.app_label
+
+        with connection.schema_editor() as schema_editor:
+            for operatie in reversed(migrare.operations):
+                fara = stare.clone()
+                if isinstance(operatie, AddIndex):
+                    fara.remove_index(app_label, operatie.model_name, operatie.index.name)
+                elif isinstance(operatie, AddConstraint):
+                    fara.remove_constraint(app_label, operatie.model_name, operatie.constraint.name)
+                else:
+                    continue
+                operatie.database_backwards(app_label, schema_editor, stare, fara)
+                stare = fara
+
+    def _interogari(self, competitie):
+        meci = Meci.objects.filter(competitie=competitie, runda=Runda.FINALA).first()
+        inscriere = Inscriere.objects.filter(competitie=competitie).order_by('-id').first()
+        return {
+            'meciuri_runda': Meci.objects.filter(
+                competitie=competitie, categorie_id=meci.categorie_id, runda=Runda.FINALA
+            ),
+            'meciuri_nedisputate': Meci.objects.filter(
+                competitie=competitie, castigator__isnull=True, saltea__isnull=False
+            ).order_by('saltea', 'ordine'),
+            'inscriere_existenta': Inscriere.objects.filter(
+                competitie=competitie, sportiv_id=inscriere.sportiv_id, categorie_id=inscriere.categorie_id
+            ),
+            'categorii_competitie': Categorie.objects.filter(
+                id__in=Inscriere.objects.filter(competitie=competitie).values('categorie')
+            ),
+            'clasament_categorie': ClasamentProba.objects.filter(
+                competitie=competitie, categorie_id=meci.categorie_id
+            ),
+        }
+
+    def _analizeaza(self):
+        # Statistici proaspete, ca planificatorul să vadă datele generate
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _masoara(self, qs, repetari):
+        durate = []
+        for _ in range(repetari):
+            start = time.perf_counter()
+            list(qs.all())
+            durate.append((time.perf_counter() - start) * 1000)
+        return qs.explain(), median(durate)
+
+    def _indenteaza(self, text):
+        return "\n".join(f"    {linie}" for linie in text.splitlines())
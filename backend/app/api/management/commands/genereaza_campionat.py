@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...models import Competitie, Proba, Inscriere, Meci
+from ...utils.bracket_generation import genereaza_bracket_si_meciuri
+from ...utils.categorii import populate_categorii_standard
+from ...utils.date_sintetice import PROBE_CAMPIONAT, genereaza_participanti, fisier_participanti
+from ...utils.import_participanti import ImportParticipanti
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Creează un campionat național sintetic: probele cu toate categoriile standard, "
+        "sportivi și cluburi importați prin fluxul de import obișnuit și bracket-urile. "
+        "Același --seed produce aceleași date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sportivi', type=int, default=3000)
+        parser.add_argument('--cluburi', type=int, default=150)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--probe', nargs='+', default=PROBE_CAMPIONAT)
+        parser.add_argument('--fisier', help="Doar scrie fișierul de înscriere în această cale, fără competiție")
+
+    def handle(self, *args, **options):
+        data_competitie = date.today() + timedelta(days=30)
+        randuri = genereaza_participanti(
+            options['sportivi'], options['cluburi'], options['probe'], data_competitie, options['seed']
+        )
+        fisier = fisier_participanti(randuri)
+
+        if options['fisier']:
+            with open(options['fisier'], 'wb') as f:
+                f.write(fisier.getvalue())
+            self.stdout.write(self.style.SUCCESS(f"{len(randuri)} înscrieri scrise în {options['fisier']}"))
+            return
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            competitie = Competitie.objects.create(
+                nume=f"Campionatul National (sintetic, seed {options['seed']})",
+                data_incepere=data_competitie,
+                data_sfarsit=data_competitie + timedelta(days=1),
+                oras="Bucuresti",
+            )
+            probe = [
+                Proba.objects.filter(nume=nume).first() or Proba.objects.create(nume=nume)
+                for nume in options['probe']
+            ]
+            competitie.probe.add(*probe)
+            populate_categorii_standard(*probe)
+
+            rezultat = ImportParticipanti(competitie).executa(fisier)
+            inscrieri = Inscriere.objects.filter(competitie=competitie).select_related("sportiv", "categorie__proba")
+            raport = genereaza_bracket_si_meciuri(inscrieri, competitie)
+
+        for eroare in rezultat.errors[:10]:
+            self.stdout.write(self.style.WARNING(eroare))
+        self.stdout.write(self.style.SUCCESS(
+            f"Competiția {competitie.id}: {rezultat.added_count} înscrieri, "
+            f"{len(raport['regenerate'])} bracket-uri, "
+            f"{Meci.objects.filter(competitie=competitie).count()} meciuri "
+            f"în {time.perf_counter() - start:.1f}s"
+        ))
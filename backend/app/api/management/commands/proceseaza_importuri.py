@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from ...models import JobImport
+from ...utils.import_participanti import proceseaza_job_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesează sincron joburile de import rămase în așteptare, de exemplu "
+        "după o repornire a serverului în timpul unui import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reia', action='store_true',
+            help="Reia și joburile rămase 'în lucru' (întrerupte de oprirea serverului)"
+        )
+
+    def handle(self, *args, **options):
+        if options['reia']:
+            reluate = JobImport.objects.filter(status='in_lucru').update(status='in_asteptare', data_start=None)
+            if reluate:
+                self.stdout.write(f"{reluate} joburi întrerupte repuse în așteptare")
+
+        joburi = list(JobImport.objects.filter(status='in_asteptare').order_by('id').values_list('id', flat=True))
+        for job_id in joburi:
+            proceseaza_job_import(job_id)
+            job = JobImport.objects.defer('fisier').get(id=job_id)
+            self.stdout.write(f"Import {job_id}: {job.status} - {job.mesaj}")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(joburi)} joburi procesate"))
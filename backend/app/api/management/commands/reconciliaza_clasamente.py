@@ -0,0 +1,83 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...models import Competitie, Meci, ClasamentProba, ClasamentClub
+from ...utils.clasament_proba import calculeaza_clasament_din_meciuri, aplica_clasament_categorie
+from ...utils.clasament_club import puncte_cluburi_din_clasament, aplica_clasament_cluburi
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruiește de la zero clasamentele pe categorii și pe cluburi din meciuri "
+        "și le compară cu starea întreținută incremental."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('competitii', nargs='*', type=int, help="ID-urile competițiilor (implicit toate)")
+        parser.add_argument('--repara', action='store_true', help="Scrie clasamentele reconstruite peste cele existente")
+
+    def handle(self, *args, **options):
+        competitii = Competitie.objects.all()
+        if options['competitii']:
+            competitii = competitii.filter(id__in=options['competitii'])
+
+        total_diferente = 0
+        for competitie in competitii:
+            total_diferente += self._reconciliaza(competitie, options['repara'])
+
+        if total_diferente:
+            mesaj = "reparate" if options['repara'] else "găsite"
+            self.stdout.write(self.style.WARNING(f"{total_diferente} diferențe {mesaj}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Clasamentele sunt consistente"))
+
+    def _reconciliaza(self, competitie, repara):
+        meciuri_pe_categorii = defaultdict(list)
+        for meci in Meci.objects.filter(competitie=competitie).select_related('sportiv1', 'sportiv2', 'castigator'):
+            meciuri_pe_categorii[meci.categorie_id].append(meci)
+
+        existente_pe_categorii = defaultdict(dict)
+        for rand in ClasamentProba.objects.filter(competitie=competitie):
+            existente_pe_categorii[rand.categorie_id][rand.sportiv_id] = rand.puncte
+
+        # Clasamentele pe categorii, reconstruite din meciuri
+        reconstruite = {}
+        diferente = 0
+        for categorie_id in set(meciuri_pe_categorii) | set(existente_pe_categorii):
+            clasament = calculeaza_clasament_din_meciuri(meciuri_pe_categorii.get(categorie_id, []))
+            reconstruite[categorie_id] = clasament
+
+            asteptat = {sportiv.id: loc for sportiv, loc in clasament}
+            existent = existente_pe_categorii.get(categorie_id, {})
+            if asteptat != existent:
+                diferente += 1
+                self.stdout.write(
+                    f"[{competitie.nume}] categoria {categorie_id}: "
+                    f"incremental {sorted(existent.items())} != reconstruit {sorted(asteptat.items())}"
+                )
+
+        # Clasamentul cluburilor, reconstruit din clasamentele pe categorii
+        puncte_cluburi = defaultdict(int)
+        for clasament in reconstruite.values():
+            for club_id, puncte in puncte_cluburi_din_clasament(clasament).items():
+                puncte_cluburi[club_id] += puncte
+
+        existente_cluburi = defaultdict(int)
+        for rand in ClasamentClub.objects.filter(competitie=competitie):
+            existente_cluburi[rand.club_id] += rand.puncte
+
+        for club_id in set(puncte_cluburi) | set(existente_cluburi):
+            if puncte_cluburi.get(club_id, 0) != existente_cluburi.get(club_id, 0):
+                diferente += 1
+                self.stdout.write(
+                    f"[{competitie.nume}] clubul {club_id}: "
+                    f"incremental {existente_cluburi.get(club_id, 0)} != reconstruit {puncte_cluburi.get(club_id, 0)}"
+                )
+
+        if repara and diferente:
+            with transaction.atomic():
+                for categorie_id, clasament in reconstruite.items():
+                    aplica_clasament_categorie(competitie.id, categorie_id, clasament)
+                aplica_clasament_cluburi(competitie.id, puncte_cluburi)
+
+        return diferente
@@ -0,0 +1,250 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from ...models import User, Competitie, Proba, Inscriere, Saltea, Meci, JobImport
+from ...utils.bracket_generation import genereaza_bracket_si_meciuri
+from ...utils.categorii import populate_categorii_standard
+from ...utils.date_sintetice import PROBE_CAMPIONAT, genereaza_participanti, fisier_participanti
+import json
+import random
+import time
+import tracemalloc
+
+BAZA_IMPLICITA = Path(settings.BASE_DIR) / 'benchmark_baza.json'
+
+# Sub aceste diferențe absolute, variațiile sunt zgomot de măsurare
+PRAG_ABSOLUT = {'interogari': 5, 'secunde': 0.05, 'memorie_mb': 0.5}
+# Replanificarea pornește de la ora curentă, deci numărul de scrieri poate varia puțin
+TOLERANTA_INTEROGARI = 0.02
+
+
+class Command(BaseCommand):
+    help = (
+        "Rulează de la un capăt la altul un campionat sintetic: upload, generarea bracket-urilor, "
+        "programarea, o zi întreagă de finalizări, descărcarea clasamentului și listele publice. "
+        "Pentru fiecare etapă măsoară interogările, durata și vârful de memorie și compară cu "
+        "o bază salvată (benchmark_baza.json, măsurată pe SQLite cu parametrii impliciți). Etapele "
+        "rulează cu commit-uri reale, deci includ și lucrul de după commit (revizii, evenimente, "
+        "joburi), într-o bază de date de test creată și ștearsă de comandă; baza configurată nu "
+        "este atinsă."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sportivi', type=int, default=3000)
+        parser.add_argument('--cluburi', type=int, default=150)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--saltele', type=int, default=8)
+        parser.add_argument('--baza', default=str(BAZA_IMPLICITA), help="Fișierul JSON cu rezultatele de referință")
+        parser.add_argument('--actualizeaza-baza', action='store_true', help="Salvează rezultatele ca bază")
+        parser.add_argument('--toleranta', type=float, default=0.25,
+                            help="Creșterea relativă a duratei sau memoriei considerată regresie")
+        parser.add_argument('--fara-memorie', action='store_true',
+                            help="Fără tracemalloc, care încetinește măsurătorile de durată")
+
+    def handle(self, *args, **options):
+        self.memorie = not options['fara_memorie']
+        self.rezultate = {}
+        self.rng = random.Random(options['seed'])
+
+        nume_initial = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Clientul de test trimite cererile pe host-ul "testserver"; importul rulează
+            # pe același fir, ca interogările lui să fie numărate în etapa upload
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], JOBURI_SINCRON=True):
+                self._ruleaza(options)
+        finally:
+            connection.creation.destroy_test_db(nume_initial, verbosity=0)
+
+        parametri = {k: options[k] for k in ('sportivi', 'cluburi', 'seed', 'saltele')}
+        parametri['baza_de_date'] = connection.vendor
+        baza = Path(options['baza'])
+
+        if options['actualizeaza_baza']:
+            baza.write_text(json.dumps({'parametri': parametri, 'etape': self.rezultate}, indent=2))
+            self._afiseaza({})
+            self.stdout.write(self.style.SUCCESS(f"Bază salvată în {baza}"))
+            return
+
+        referinta = json.loads(baza.read_text()) if baza.exists() else None
+        if referinta and referinta['parametri'] != parametri:
+            # Rezultatele cu alți parametri sau pe altă bază de date nu sunt comparabile
+            self.stdout.write(self.style.WARNING(
+                f"Baza a fost măsurată cu alți parametri: {referinta['parametri']}; comparația este omisă"
+            ))
+            referinta = None
+        regresii = self._afiseaza(referinta['etape'] if referinta else {}, options['toleranta'])
+        if regresii:
+            raise CommandError(f"{len(regresii)} regresii față de bază: {', '.join(regresii)}")
+
+    # ---------- Etape ----------
+
+    def _ruleaza(self, options):
+        data_competitie = date.today() + timedelta(days=30)
+        competitie = Competitie.objects.create(
+            nume="Benchmark", data_incepere=data_competitie, data_sfarsit=data_competitie + timedelta(days=1)
+        )
+        probe = [Proba.objects.filter(nume=nume).first() or Proba.objects.create(nume=nume) for nume in PROBE_CAMPIONAT]
+        competitie.probe.add(*probe)
+        populate_categorii_standard(*probe)
+
+        utilizator = User.objects.filter(username='benchmark').first() or User.objects.create_user('benchmark')
+        client = APIClient()
+        client.force_authenticate(utilizator)
+
+        randuri = genereaza_participanti(
+            options['sportivi'], options['cluburi'], PROBE_CAMPIONAT, data_competitie, options['seed']
+        )
+        continut = fisier_participanti(randuri).getvalue()
+
+        # Upload-ul plus jobul de import pornit după commit: rândurile și bracket-urile noi
+        with self._masoara('upload'):
+            response = client.post(
+                f"/api/competitii/{competitie.id}/upload-participants/",
+                {'file': SimpleUploadedFile('campionat.xlsx', continut)}, format='multipart'
+            )
+        job = JobImport.objects.get(id=response.data['id'])
+        if job.status != 'finalizat':
+            raise CommandError(f"Importul a eșuat: {job.mesaj}")
+
+        # Regenerarea completă a tuturor bracket-urilor
+        with self._masoara('generare_brackets'):
+            inscrieri = Inscriere.objects.filter(competitie=competitie).select_related('sportiv', 'categorie__proba')
+            genereaza_bracket_si_meciuri(inscrieri, competitie)
+
+        saltele = [
+            (Saltea.objects.filter(numar=numar).first() or Saltea.objects.create(numar=numar)).id
+            for numar in range(1, options['saltele'] + 1)
+        ]
+        with self._masoara('programare'):
+            client.post(
+                f"/api/competitions/{competitie.id}/program/",
+                {'saltele': saltele, 'durata_meci_minute': 4, 'pauza_minima_minute': 10}, format='json'
+            )
+
+        self._zi_de_finalizari(client, competitie)
+
+        with self._masoara('clasament_excel'):
+            response = client.get(f"/api/competitii/{competitie.id}/ranking/download/")
+            b''.join(response.streaming_content)
+
+        caches['raspunsuri'].clear()
+        with self._masoara('liste_publice'):
+            etaguri = self._liste_publice(client, competitie, {})
+        with self._masoara('liste_publice_revalidare'):
+            self._liste_publice(client, competitie, etaguri)
+
+    def _zi_de_finalizari(self, client, competitie):
+        """
+        Finalizează, în ordinea programului, fiecare meci care are ambii sportivi,
+        până nu mai rămâne niciunul. Doar cererile de finalizare sunt măsurate.
+        """
+        respinse = set()
+        while True:
+            meci = Meci.objects.filter(
+                competitie=competitie, castigator__isnull=True, sportiv1__isnull=False, sportiv2__isnull=False
+            ).exclude(id__in=respinse).order_by('ora_programata', 'id').only('id', 'sportiv1', 'sportiv2').first()
+            if meci is None:
+                break
+
+            castigator = self.rng.choice((meci.sportiv1_id, meci.sportiv2_id))
+            scor_castigator = self.rng.randint(3, 8)
+            scor_pierzator = self.rng.randint(0, scor_castigator - 1)
+            scor1, scor2 = (
+                (scor_castigator, scor_pierzator) if castigator == meci.sportiv1_id else (scor_pierzator, scor_castigator)
+            )
+            with self._masoara('finalizare_zi'):
+                response = client.patch(
+                    f"/api/meciuri/{meci.id}/finalizare/",
+                    {'scor1': scor1, 'scor2': scor2, 'castigator': castigator}, format='json'
+                )
+            if response.status_code != 200:
+                respinse.add(meci.id)
+
+    def _liste_publice(self, client, competitie, etaguri):
+        """
+        Toate paginile listelor publice ale competiției; cu `etaguri`, fiecare
+        cerere este o revalidare (If-None-Match).
+        """
+        urluri = [
+            "/api/competitions/",
+            f"/api/competitions/{competitie.id}/brackets/",
+            f"/api/meciuri/?competitie={competitie.id}&page_size=1000",
+            f"/api/sportivi/?competitie={competitie.id}&page_size=1000",
+            f"/api/categorii/?competitie={competitie.id}&page_size=1000",
+        ]
+        noi = {}
+        while urluri:
+            url = urluri.pop()
+            antete = {'HTTP_IF_NONE_MATCH': etaguri[url]} if url in etaguri else {}
+            response = client.get(url, **antete)
+            noi[url] = response['ETag']
+            if response.status_code == 200 and 'next' in response.data and response.data['next']:
+                urluri.append(response.data['next'])
+        return noi
+
+    # ---------- Măsurare și raport ----------
+
+    @contextmanager
+    def _masoara(self, etapa):
+        """
+        Interogări, durată și vârf de memorie pentru `etapa`; apelurile repetate
+        ale aceleiași etape se adună (vârful de memorie este maximul).
+        """
+        interogari = 0
+
+        def numara(execute, sql, params, many, context):
+            nonlocal interogari
+            interogari += 1
+            return execute(sql, params, many, context)
+
+        if self.memorie:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with connection.execute_wrapper(numara):
+            yield
+        durata = time.perf_counter() - start
+        varf = tracemalloc.get_traced_memory()[1] / 2 ** 20 if self.memorie else 0
+        if self.memorie:
+            tracemalloc.stop()
+
+        rezultat = self.rezultate.setdefault(etapa, {'apeluri': 0, 'interogari': 0, 'secunde': 0.0, 'memorie_mb': 0.0})
+        rezultat['apeluri'] += 1
+        rezultat['interogari'] += interogari
+        rezultat['secunde'] = round(rezultat['secunde'] + durata, 4)
+        rezultat['memorie_mb'] = round(max(rezultat['memorie_mb'], varf), 2)
+
+    def _afiseaza(self, referinta, toleranta=0.0):
+        """
+        Tabelul rezultatelor, cu diferența față de bază; întoarce regresiile.
+        Numărul de interogări are o toleranță mult mai mică decât durata și memoria.
+        """
+        regresii = []
+        self.stdout.write(f"{'etapa':<26}{'apeluri':>8}{'interogari':>12}{'secunde':>10}{'memorie MB':>12}")
+        for etapa, rezultat in self.rezultate.items():
+            linie = (
+                f"{etapa:<26}{rezultat['apeluri']:>8}{rezultat['interogari']:>12}"
+                f"{rezultat['secunde']:>10.3f}{rezultat['memorie_mb']:>12.2f}"
+            )
+            baza = referinta.get(etapa)
+            if baza:
+                diferente = []
+                limite = (('interogari', TOLERANTA_INTEROGARI), ('secunde', toleranta), ('memorie_mb', toleranta))
+                for metrica, limita in limite:
+                    if not baza[metrica]:
+                        continue
+                    relativ = rezultat[metrica] / baza[metrica] - 1
+                    diferente.append(f"{metrica} {relativ:+.0%}")
+                    crestere = rezultat[metrica] - baza[metrica]
+                    if relativ > limita and crestere > PRAG_ABSOLUT[metrica] and (metrica != 'memorie_mb' or self.memorie):
+                        regresii.append(f"{etapa}.{metrica}")
+                linie += "   " + ", ".join(diferente)
+            self.stdout.write(linie)
+        return regresii
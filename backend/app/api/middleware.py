@@ -0,0 +1,58 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .utils.metrici import incepe_masuratoare, termina_masuratoare, registru
+import time
+
+
+class InstrumentareMiddleware:
+    """
+    Măsoară fiecare request: numărul și durata interogărilor SQL, timpul de
+    serializare și latența totală. Rezultatul apare în antetul Server-Timing
+    și în agregatele pe view expuse la /metrics.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activ = getattr(settings, 'METRICI_ACTIVE', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.activ:
+            return self.get_response(request)
+
+        masuratoare, token = incepe_masuratoare()
+        try:
+            response = self.get_response(request)
+        finally:
+            termina_masuratoare(token)
+        return self._finalizeaza(request, response, masuratoare)
+
+    async def __acall__(self, request):
+        if not self.activ:
+            return await self.get_response(request)
+
+        masuratoare, token = incepe_masuratoare()
+        try:
+            response = await self.get_response(request)
+        finally:
+            termina_masuratoare(token)
+        return self._finalizeaza(request, response, masuratoare)
+
+    def _finalizeaza(self, request, response, masuratoare):
+        # Pentru răspunsurile streaming, durata este până la primul octet
+        durata = time.perf_counter() - masuratoare.start
+        potrivire = request.resolver_match
+        view = (potrivire.view_name or potrivire.route) if potrivire else 'necunoscut'
+        registru.inregistreaza(view, request.method, response.status_code, request.path, durata, masuratoare)
+
+        response['Server-Timing'] = (
+            f'db;dur={masuratoare.timp_db * 1000:.1f};desc="{masuratoare.interogari} interogari", '
+            f'ser;dur={masuratoare.timp_serializare * 1000:.1f}, '
+            f'total;dur={durata * 1000:.1f}'
+        )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_meci_next_meci_meci_pozitie_in_bracket_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fisier', models.BinaryField()),
+                ('nume_fisier', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('in_asteptare', 'În așteptare'), ('in_lucru', 'În lucru'), ('finalizat', 'Finalizat'), ('esuat', 'Eșuat')], default='in_asteptare', max_length=20)),
+                ('randuri_citite', models.IntegerField(default=0)),
+                ('randuri_adaugate', models.IntegerField(default=0)),
+                ('randuri_existente', models.IntegerField(default=0)),
+                ('randuri_respinse', models.IntegerField(default=0)),
+                ('categorii_regenerate', models.IntegerField(blank=True, null=True)),
+                ('erori', models.JSONField(blank=True, default=list)),
+                ('mesaj', models.TextField(blank=True)),
+                ('data_creare', models.DateTimeField(auto_now_add=True)),
+                ('data_start', models.DateTimeField(blank=True, null=True)),
+                ('data_sfarsit', models.DateTimeField(blank=True, null=True)),
+                ('competitie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='joburi_import', to='api.competitie')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_jobimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobimport',
+            name='brackets',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
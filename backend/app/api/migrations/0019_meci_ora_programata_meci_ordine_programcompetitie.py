@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_jobimport_brackets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meci',
+            name='ora_programata',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meci',
+            name='ordine',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProgramCompetitie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('durata_meci_minute', models.FloatField(default=5)),
+                ('pauza_minima_minute', models.FloatField(default=15)),
+                ('ora_start', models.DateTimeField()),
+                ('competitie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='program', to='api.competitie')),
+                ('saltele', models.ManyToManyField(to='api.saltea')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_meci_ora_programata_meci_ordine_programcompetitie'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Revizie',
+            fields=[
+                ('resursa', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('numar', models.PositiveBigIntegerField(default=0)),
+                ('data_modificare', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:24
+
+from django.db import migrations
+from django.db.models import Case, Count, IntegerField, Min, Q, Value, When
+
+
+def elimina_duplicate(apps, schema_editor):
+    """
+    Păstrează un singur rând din fiecare grup care ar încălca noile
+    constrângeri unice: pentru meciuri, rândul cu rezultat (câștigător, apoi
+    scor), altfel cel mai vechi. Legăturile next_meci spre meciurile șterse
+    sunt mutate pe meciul păstrat.
+    """
+    Inscriere = apps.get_model('api', 'Inscriere')
+    Meci = apps.get_model('api', 'Meci')
+
+    grupuri = (
+        Inscriere.objects.values('competitie', 'sportiv', 'categorie')
+        .annotate(primul=Min('id'), numar=Count('id')).filter(numar__gt=1)
+    )
+    for grup in grupuri:
+        Inscriere.objects.filter(
+            competitie=grup['competitie'], sportiv=grup['sportiv'], categorie=grup['categorie']
+        ).exclude(id=grup['primul']).delete()
+
+    grupuri = (
+        Meci.objects.values('competitie', 'categorie', 'runda', 'pozitie_in_bracket')
+        .annotate(numar=Count('id')).filter(numar__gt=1)
+    )
+    rezultat = Case(
+        When(castigator__isnull=False, then=Value(0)),
+        When(Q(scor1__gt=0) | Q(scor2__gt=0), then=Value(1)),
+        default=Value(2), output_field=IntegerField(),
+    )
+    for grup in grupuri:
+        meciuri = Meci.objects.filter(
+            competitie=grup['competitie'], categorie=grup['categorie'],
+            runda=grup['runda'], pozitie_in_bracket=grup['pozitie_in_bracket'],
+        )
+        pastrat = meciuri.annotate(rezultat=rezultat).order_by('rezultat', 'id').values_list('id', flat=True).first()
+        duplicate = meciuri.exclude(id=pastrat)
+        Meci.objects.filter(next_meci__in=duplicate).update(next_meci=pastrat)
+        duplicate.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_revizie'),
+    ]
+
+    operations = [
+        migrations.RunPython(elimina_duplicate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_elimina_duplicate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meci',
+            name='runda',
+            field=models.CharField(choices=[('Runda 1/64', 'Runda 1/64'), ('Runda 1/32', 'Runda 1/32'), ('Saisprezecimi', 'Șaisprezecimi'), ('Optimi', 'Optimi'), ('Sferturi', 'Sferturi'), ('Semifinala', 'Semifinală'), ('Finala', 'Finală'), ('Locul 3', 'Locul 3'), ('Best of 3 - Meci 1', 'Best of 3 - Meci 1'), ('Best of 3 - Meci 2', 'Best of 3 - Meci 2'), ('Best of 3 - Meci 3', 'Best of 3 - Meci 3'), ('Round Robin - Meci 1', 'Round Robin - Meci 1'), ('Round Robin - Meci 2', 'Round Robin - Meci 2'), ('Round Robin - Meci 3', 'Round Robin - Meci 3')], max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='clasamentproba',
+            index=models.Index(fields=['competitie', 'categorie'], name='clasament_comp_categ_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscriere',
+            index=models.Index(fields=['competitie', 'categorie'], name='inscriere_comp_categ_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meci',
+            index=models.Index(condition=models.Q(('castigator__isnull', True)), fields=['competitie', 'saltea', 'ordine'], name='meci_nedisputat_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inscriere',
+            constraint=models.UniqueConstraint(fields=('competitie', 'sportiv', 'categorie'), name='inscriere_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='meci',
+            constraint=models.UniqueConstraint(fields=('competitie', 'categorie', 'runda', 'pozitie_in_bracket'), name='meci_pozitie_unica'),
+        ),
+    ]
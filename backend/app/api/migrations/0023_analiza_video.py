@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_indexuri_si_constrangeri'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meci',
+            name='castigator_video',
+            field=models.CharField(blank=True, choices=[('ALBASTRU', 'Albastru'), ('ALB', 'Alb')], max_length=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobAnalizaVideo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cale_video', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('in_asteptare', 'În așteptare'), ('in_lucru', 'În lucru'), ('finalizat', 'Finalizat'), ('esuat', 'Eșuat')], default='in_asteptare', max_length=20)),
+                ('castigator', models.CharField(blank=True, choices=[('ALBASTRU', 'Albastru'), ('ALB', 'Alb')], max_length=10, null=True)),
+                ('rezultat', models.JSONField(blank=True, default=dict)),
+                ('mesaj', models.TextField(blank=True)),
+                ('data_creare', models.DateTimeField(auto_now_add=True)),
+                ('data_start', models.DateTimeField(blank=True, null=True)),
+                ('data_sfarsit', models.DateTimeField(blank=True, null=True)),
+                ('meci', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analize_video', to='api.meci')),
+            ],
+        ),
+    ]
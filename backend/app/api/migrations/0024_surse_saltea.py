@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_analiza_video'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saltea',
+            name='audio_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='saltea',
+            name='camera_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='saltea',
+            name='stream_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
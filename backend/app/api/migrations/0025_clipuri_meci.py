@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_surse_saltea'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobanalizavideo',
+            name='cale_video',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.CreateModel(
+            name='ClipMeci',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('director', models.CharField(max_length=500)),
+                ('inceput', models.DateTimeField()),
+                ('sfarsit', models.DateTimeField(blank=True, null=True)),
+                ('decizii', models.JSONField(blank=True, default=list)),
+                ('meci', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='clipuri', to='api.meci')),
+                ('saltea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clipuri', to='api.saltea')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobanalizavideo',
+            name='clip',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='analize', to='api.clipmeci'),
+        ),
+    ]
@@ -67,15 +67,52 @@ class Inscriere(models.Model):
     data_inscriere = models.DateTimeField(auto_now_add=True)
     meci_demonstrativ = models.CharField(max_length=20, blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['competitie', 'sportiv', 'categorie'], name='inscriere_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['competitie', 'categorie'], name='inscriere_comp_categ_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sportiv} - {self.categorie} - {self.competitie.nume}"
 
 class Saltea(models.Model):
     numar = models.IntegerField()
+    # Sursele camerei saltelei (de exemplu IP Webcam) și destinația livestream-ului (RTMP)
+    camera_url = models.CharField(max_length=500, blank=True)
+    audio_url = models.CharField(max_length=500, blank=True)
+    stream_url = models.CharField(max_length=500, blank=True)
 
     def __str__(self):
         return f"Saltea {self.numar}"
 
+class Runda(models.TextChoices):
+    RUNDA_1_64 = 'Runda 1/64', 'Runda 1/64'
+    RUNDA_1_32 = 'Runda 1/32', 'Runda 1/32'
+    SAISPREZECIMI = 'Saisprezecimi', 'Șaisprezecimi'
+    OPTIMI = 'Optimi', 'Optimi'
+    SFERTURI = 'Sferturi', 'Sferturi'
+    SEMIFINALA = 'Semifinala', 'Semifinală'
+    FINALA = 'Finala', 'Finală'
+    LOCUL_3 = 'Locul 3', 'Locul 3'
+    BEST_OF_3_MECI_1 = 'Best of 3 - Meci 1', 'Best of 3 - Meci 1'
+    BEST_OF_3_MECI_2 = 'Best of 3 - Meci 2', 'Best of 3 - Meci 2'
+    BEST_OF_3_MECI_3 = 'Best of 3 - Meci 3', 'Best of 3 - Meci 3'
+    ROUND_ROBIN_MECI_1 = 'Round Robin - Meci 1', 'Round Robin - Meci 1'
+    ROUND_ROBIN_MECI_2 = 'Round Robin - Meci 2', 'Round Robin - Meci 2'
+    ROUND_ROBIN_MECI_3 = 'Round Robin - Meci 3', 'Round Robin - Meci 3'
+
+RUNDE_BEST_OF_3 = (Runda.BEST_OF_3_MECI_1, Runda.BEST_OF_3_MECI_2, Runda.BEST_OF_3_MECI_3)
+RUNDE_ROUND_ROBIN = (Runda.ROUND_ROBIN_MECI_1, Runda.ROUND_ROBIN_MECI_2, Runda.ROUND_ROBIN_MECI_3)
+
+class CuloareColt(models.TextChoices):
+    # Sportivul 1 concurează în colțul albastru, sportivul 2 în colțul alb
+    ALBASTRU = 'ALBASTRU', 'Albastru'
+    ALB = 'ALB', 'Alb'
+
+
 class Meci(models.Model):
     competitie = models.ForeignKey(Competitie, on_delete=models.CASCADE, related_name='meciuri')
     categorie = models.ForeignKey(Categorie, on_delete=models.CASCADE)
@@ -85,16 +122,45 @@ class Meci(models.Model):
     scor1 = models.IntegerField(default=0)
     scor2 = models.IntegerField(default=0)
     diferenta_activata = models.BooleanField(default=False)
-    runda = models.CharField(max_length=50)
+    runda = models.CharField(max_length=50, choices=Runda.choices)
     pozitie_in_bracket = models.IntegerField()
     pozitie_in_runda = models.IntegerField()
     next_meci = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='meciuri_precedente')
     saltea = models.ForeignKey(Saltea, on_delete=models.SET_NULL, null=True, blank=True)
+    ordine = models.IntegerField(null=True, blank=True)
+    ora_programata = models.DateTimeField(null=True, blank=True)
+    # Câștigătorul detectat din gestul arbitrului; meciul este finalizat tot de operator
+    castigator_video = models.CharField(max_length=10, choices=CuloareColt.choices, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['competitie', 'categorie', 'runda', 'pozitie_in_bracket'], name='meci_pozitie_unica'
+            ),
+        ]
+        indexes = [
+            # Coada meciurilor nedisputate pe saltele (programul competiției)
+            models.Index(
+                fields=['competitie', 'saltea', 'ordine'], condition=models.Q(castigator__isnull=True),
+                name='meci_nedisputat_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.runda} - {self.sportiv1 or '__'} vs {self.sportiv2 or '__'}"
 
 
+class ProgramCompetitie(models.Model):
+    competitie = models.OneToOneField(Competitie, on_delete=models.CASCADE, related_name='program')
+    saltele = models.ManyToManyField(Saltea)
+    durata_meci_minute = models.FloatField(default=5)
+    pauza_minima_minute = models.FloatField(default=15)
+    ora_start = models.DateTimeField()
+
+    def __str__(self):
+        return f"Program {self.competitie.nume}"
+
+
 class ClasamentClub(models.Model):
     competitie = models.ForeignKey(Competitie, on_delete=models.CASCADE)
     club = models.ForeignKey(Club, on_delete=models.CASCADE)
@@ -109,5 +175,79 @@ class ClasamentProba(models.Model):
     sportiv = models.ForeignKey(Sportiv, on_delete=models.CASCADE)
     puncte = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['competitie', 'categorie'], name='clasament_comp_categ_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sportiv} - {self.puncte} puncte"
+
+class JobImport(models.Model):
+    STATUS_CHOICES = [
+        ('in_asteptare', 'În așteptare'),
+        ('in_lucru', 'În lucru'),
+        ('finalizat', 'Finalizat'),
+        ('esuat', 'Eșuat'),
+    ]
+    competitie = models.ForeignKey(Competitie, on_delete=models.CASCADE, related_name='joburi_import')
+    fisier = models.BinaryField()
+    nume_fisier = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_asteptare')
+    randuri_citite = models.IntegerField(default=0)
+    randuri_adaugate = models.IntegerField(default=0)
+    randuri_existente = models.IntegerField(default=0)
+    randuri_respinse = models.IntegerField(default=0)
+    categorii_regenerate = models.IntegerField(null=True, blank=True)
+    brackets = models.JSONField(default=dict, blank=True)
+    erori = models.JSONField(default=list, blank=True)
+    mesaj = models.TextField(blank=True)
+    data_creare = models.DateTimeField(auto_now_add=True)
+    data_start = models.DateTimeField(null=True, blank=True)
+    data_sfarsit = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import {self.id} - {self.competitie.nume} - {self.status}"
+
+
+class ClipMeci(models.Model):
+    """
+    Intervalul unui meci în înregistrarea segmentată a saltelei și momentele
+    deciziilor arbitrului, în secunde de la începutul meciului.
+    """
+    meci = models.ForeignKey(Meci, on_delete=models.CASCADE, null=True, blank=True, related_name='clipuri')
+    saltea = models.ForeignKey(Saltea, on_delete=models.CASCADE, related_name='clipuri')
+    director = models.CharField(max_length=500)
+    inceput = models.DateTimeField()
+    sfarsit = models.DateTimeField(null=True, blank=True)
+    decizii = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"Clip {self.id} - meci {self.meci_id} - saltea {self.saltea_id}"
+
+class JobAnalizaVideo(models.Model):
+    meci = models.ForeignKey(Meci, on_delete=models.CASCADE, null=True, blank=True, related_name='analize_video')
+    clip = models.ForeignKey(ClipMeci, on_delete=models.SET_NULL, null=True, blank=True, related_name='analize')
+    cale_video = models.CharField(max_length=500, blank=True)
+    status = models.CharField(max_length=20, choices=JobImport.STATUS_CHOICES, default='in_asteptare')
+    castigator = models.CharField(max_length=10, choices=CuloareColt.choices, null=True, blank=True)
+    rezultat = models.JSONField(default=dict, blank=True)
+    mesaj = models.TextField(blank=True)
+    data_creare = models.DateTimeField(auto_now_add=True)
+    data_start = models.DateTimeField(null=True, blank=True)
+    data_sfarsit = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Analiza video {self.id} - meci {self.meci_id} - {self.status}"
+
+class Revizie(models.Model):
+    """
+    Contor de versiune pentru o resursă publică ("meci", "competitie:5" etc.),
+    crescut la fiecare scriere; din el se calculează ETag-urile răspunsurilor.
+    """
+    resursa = models.CharField(max_length=50, primary_key=True)
+    numar = models.PositiveBigIntegerField(default=0)
+    data_modificare = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.resursa} - {self.numar}"
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPaginare(CursorPagination):
+    """
+    Paginare după id, stabilă la inserările făcute între pagini; clientul urmează
+    linkul `next` până devine null. Dimensiunea paginii: ?page_size=, maxim 1000.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -1,6 +1,8 @@
 from rest_framework import serializers
-from .models import Club, User, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, ClasamentClub, ClasamentProba
+from .models import Club, User, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, ClasamentClub, ClasamentProba, JobImport, JobAnalizaVideo, ClipMeci, ProgramCompetitie
 from django.contrib.auth.password_validation import validate_password
+from .utils.metrici import masuratoare_curenta
+import time
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -13,12 +15,46 @@ class RegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
-class ProbaSerializer(serializers.ModelSerializer):
+class CampuriSelectabileMixin:
+    """
+    Permite clientului să ceară doar o parte din câmpuri cu ?fields=id,nume.
+    Câmpurile necunoscute sunt ignorate.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        campuri = request.query_params.get('fields') if request is not None and request.method == 'GET' else None
+        if campuri:
+            cerute = {c.strip() for c in campuri.split(',')}
+            for nume in set(self.fields) - cerute:
+                self.fields.pop(nume)
+
+class SerializareMasurataMixin:
+    """
+    Adaugă durata serializării la măsurătoarea requestului (Server-Timing,
+    /metrics). Doar apelul exterior este cronometrat, nu și serializatoarele imbricate.
+    """
+
+    def to_representation(self, instance):
+        masuratoare = masuratoare_curenta()
+        if masuratoare is None or masuratoare.in_serializare:
+            return super().to_representation(instance)
+
+        masuratoare.in_serializare = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            masuratoare.timp_serializare += time.perf_counter() - start
+            masuratoare.in_serializare = False
+
+class ProbaSerializer(SerializareMasurataMixin, serializers.ModelSerializer):
     class Meta:
         model = Proba
         fields = ["id", "nume"]
 
-class CompetitieSerializer(serializers.ModelSerializer):
+class CompetitieSerializer(SerializareMasurataMixin, serializers.ModelSerializer):
     probe = ProbaSerializer(many=True, read_only=True)
     probe_input = serializers.ListField(
         child=serializers.CharField(), write_only=True, required=False
@@ -36,26 +72,123 @@ class CompetitieSerializer(serializers.ModelSerializer):
             competitie.probe.add(proba)
         return competitie
 
-class MeciSerializer(serializers.ModelSerializer):
-    sportiv1_nume = serializers.CharField(source='sportiv1.user.username', read_only=True)
-    sportiv2_nume = serializers.CharField(source='sportiv2.user.username', read_only=True)
-    categorie_nume = serializers.CharField(source='categorie.nume', read_only=True)
-
+class MeciSerializer(SerializareMasurataMixin, CampuriSelectabileMixin, serializers.ModelSerializer):
     class Meta:
         model = Meci
         fields = '__all__'
 
-class CategorieSerializer(serializers.ModelSerializer):
+class MeciListSerializer(MeciSerializer):
+    """
+    Serializer de citire pentru meciuri; numele sunt calculate din obiectele
+    încărcate cu select_related (vezi MeciViewSet.get_queryset).
+    """
+    sportiv1_nume = serializers.SerializerMethodField()
+    sportiv2_nume = serializers.SerializerMethodField()
+    castigator_nume = serializers.SerializerMethodField()
+    categorie_nume = serializers.SerializerMethodField()
+
+    def get_sportiv1_nume(self, obj):
+        return nume_afisat_sportiv(obj.sportiv1)
+
+    def get_sportiv2_nume(self, obj):
+        return nume_afisat_sportiv(obj.sportiv2)
+
+    def get_castigator_nume(self, obj):
+        return nume_afisat_sportiv(obj.castigator)
+
+    def get_categorie_nume(self, obj):
+        return str(obj.categorie)
+
+def nume_afisat_sportiv(sportiv):
+    if sportiv is None:
+        return None
+    if sportiv.club:
+        return f"{sportiv.nume} {sportiv.prenume} ({sportiv.club.nume})"
+    return f"{sportiv.nume} {sportiv.prenume}"
+
+class CategorieSerializer(SerializareMasurataMixin, CampuriSelectabileMixin, serializers.ModelSerializer):
     probe = ProbaSerializer(many=True, read_only=True)
 
     class Meta:
         model = Categorie
         fields = '__all__'
 
-class SportivSerializer(serializers.ModelSerializer):
+class SportivSerializer(SerializareMasurataMixin, CampuriSelectabileMixin, serializers.ModelSerializer):
     club_nume = serializers.CharField(source='club.nume', read_only=True)
     club_id = serializers.IntegerField(source='club.id', read_only=True)
 
     class Meta:
         model = Sportiv
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class BracketSportivSerializer(serializers.ModelSerializer):
+    nume = serializers.SerializerMethodField()
+    club = serializers.CharField(source='club.nume', default=None, read_only=True)
+
+    class Meta:
+        model = Sportiv
+        fields = ['id', 'nume', 'club']
+
+    def get_nume(self, obj):
+        return f"{obj.nume} {obj.prenume}"
+
+class BracketMeciSerializer(serializers.ModelSerializer):
+    sportiv1 = BracketSportivSerializer(read_only=True)
+    sportiv2 = BracketSportivSerializer(read_only=True)
+
+    class Meta:
+        model = Meci
+        fields = ['id', 'runda', 'pozitie_in_bracket', 'next_meci', 'sportiv1', 'sportiv2', 'scor1', 'scor2', 'castigator', 'saltea', 'ordine', 'ora_programata']
+
+class BracketCategorieSerializer(SerializareMasurataMixin, serializers.ModelSerializer):
+    proba = ProbaSerializer(read_only=True)
+    participanti = serializers.SerializerMethodField()
+    meciuri = BracketMeciSerializer(source='meciuri_competitie', many=True, read_only=True)
+
+    class Meta:
+        model = Categorie
+        fields = ['id', 'proba', 'sex', 'varsta_min', 'varsta_max', 'categorie_greutate', 'participanti', 'meciuri']
+
+    def get_participanti(self, obj):
+        sportivi = set()
+        for meci in obj.meciuri_competitie:
+            sportivi.update(s for s in (meci.sportiv1_id, meci.sportiv2_id) if s)
+        return len(sportivi)
+
+class JobImportSerializer(SerializareMasurataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = JobImport
+        exclude = ['fisier']
+
+class JobAnalizaVideoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobAnalizaVideo
+        exclude = ['cale_video']
+
+class ClipMeciSerializer(serializers.ModelSerializer):
+    durata = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClipMeci
+        fields = ['id', 'meci', 'saltea', 'inceput', 'sfarsit', 'durata', 'decizii']
+
+    def get_durata(self, obj):
+        return round((obj.sfarsit - obj.inceput).total_seconds(), 2) if obj.sfarsit else None
+
+class ProgramCompetitieSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProgramCompetitie
+        fields = ['saltele', 'durata_meci_minute', 'pauza_minima_minute', 'ora_start']
+        extra_kwargs = {'ora_start': {'required': False}}
+
+    def validate(self, data):
+        for camp in ('durata_meci_minute', 'pauza_minima_minute'):
+            if camp in data and data[camp] < 0:
+                raise serializers.ValidationError({camp: "Valoarea nu poate fi negativă."})
+        if data.get('durata_meci_minute') == 0:
+            raise serializers.ValidationError({'durata_meci_minute': "Durata unui meci trebuie să fie pozitivă."})
+        return data
+
+class ProgramMeciSerializer(MeciListSerializer):
+    class Meta(MeciListSerializer.Meta):
+        fields = ['id', 'categorie', 'categorie_nume', 'runda', 'sportiv1_nume', 'sportiv2_nume', 'saltea', 'ordine', 'ora_programata']
@@ -0,0 +1,85 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+from .models import Club, Sportiv, Proba, Categorie, Competitie, Inscriere, Meci
+from .utils.clasament_proba import calculeaza_clasament_din_meciuri, aplica_clasament_categorie
+from .utils.clasament_club import delta_puncte_cluburi, aplica_delta_cluburi
+from .utils.programare import replanifica_dupa_finalizare
+from .utils.evenimente import publica_dupa_commit, eveniment_meci
+from .utils.revizii import creste_revizie, resurse_instanta
+from .utils.metrici import executa_masurat
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Trimis în tranzacția finalizării, cu meciul finalizat, toate meciurile
+# categoriei sale (deja actualizate în memorie) și meciurile scrise de
+# finalizare (meciul însuși și meciurile în care au avansat sportivii):
+# meci=..., meciuri=[...], modificate=[...]
+meci_finalizat = Signal()
+
+
+@receiver(meci_finalizat)
+def actualizeaza_clasamente(sender, meci, meciuri, **kwargs):
+    """
+    Actualizează incremental clasamentul categoriei meciului și aplică doar
+    diferența de puncte cluburilor afectate. Rulează în tranzacția finalizării:
+    o eroare aici anulează finalizarea (500), ca meciurile și clasamentele să nu
+    ajungă niciodată inconsistente.
+    """
+    clasament = calculeaza_clasament_din_meciuri(meciuri, meci)
+    if clasament is None:
+        return
+
+    clasament_vechi = aplica_clasament_categorie(meci.competitie_id, meci.categorie_id, clasament)
+    aplica_delta_cluburi(meci.competitie_id, delta_puncte_cluburi(clasament_vechi, clasament))
+
+    logger.info(f"Clasament actualizat pentru categoria {meci.categorie_id}")
+
+
+@receiver(meci_finalizat)
+def replanifica_saltele(sender, meci, meciuri, **kwargs):
+    """
+    Reprogramează incremental meciurile rămase: saltea meciului finalizat s-a
+    eliberat, iar sportivii lui încep pauza de acum. Rulează în tranzacția
+    finalizării, deci atinge doar saltea eliberată și meciurile afectate.
+    """
+    replanifica_dupa_finalizare(meci)
+
+
+@receiver(meci_finalizat)
+def publica_meciuri_modificate(sender, meci, modificate=(), **kwargs):
+    """
+    Trimite clienților conectați delta meciurilor atinse de finalizare.
+    """
+    publica_dupa_commit(*[eveniment_meci(m) for m in modificate])
+
+
+@receiver(meci_finalizat)
+def invalideaza_meciuri(sender, meci, **kwargs):
+    """
+    Finalizarea scrie meciurile cu bulk_update, deci fără post_save.
+    """
+    creste_revizie('meci', f"competitie:{meci.competitie_id}")
+
+
+def invalideaza_instanta(sender, instance, **kwargs):
+    creste_revizie(*resurse_instanta(instance))
+
+
+# Modelele servite public prin GET-uri cu cache (vezi utils/revizii.py)
+for model in (Club, Sportiv, Proba, Categorie, Competitie, Inscriere, Meci):
+    post_save.connect(invalideaza_instanta, sender=model, dispatch_uid=f"revizie_save_{model.__name__}")
+    post_delete.connect(invalideaza_instanta, sender=model, dispatch_uid=f"revizie_delete_{model.__name__}")
+
+
+@receiver(m2m_changed, sender=Competitie.probe.through)
+def invalideaza_probe_competitie(sender, instance, **kwargs):
+    creste_revizie(*resurse_instanta(instance))
+
+
+@receiver(connection_created, dispatch_uid='instrumenteaza_conexiunea')
+def instrumenteaza_conexiunea(sender, connection, **kwargs):
+    """Interogările fiecărei conexiuni noi sunt atribuite requestului măsurat."""
+    if executa_masurat not in connection.execute_wrappers:
+        connection.execute_wrappers.append(executa_masurat)
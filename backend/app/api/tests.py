@@ -1,3 +1,1339 @@
-from django.test import TestCase
+import asyncio
+import math
+import io
+import threading
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+from io import StringIO
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Sum
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+import openpyxl
+
+from django.utils import timezone
+
+from .models import User, Club, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, JobAnalizaVideo, ClipMeci, ClasamentProba, ClasamentClub, ProgramCompetitie, JobImport
+from .signals import meci_finalizat
+from .utils.analiza_video import proceseaza_job_analiza, salveaza_rezultat
+from .utils.bracket_generation import genereaza_bracket_si_meciuri, nume_runda
+from .utils.categorii import IndexCategorii, populate_categorii_standard
+from .utils.clasament_club import puncte_cluburi_din_clasament
+from .utils.clipuri import curata_inregistrari, segmente
+from .utils.date_sintetice import PROBE_CAMPIONAT, genereaza_participanti, fisier_participanti
+from .utils.evenimente import broadcaster, eveniment_meci
+from .utils.excel import XLSX_CONTENT_TYPE, adauga_foaie, creeaza_workbook, rand, raspuns_excel
+from .utils.finalizare_meci import FinalizareMeci
+from .utils.import_participanti import ANTET_SABLON, ImportInvalid, ImportParticipanti
+from .utils.metrici import registru
+from .utils.programare import replanifica_competitie
+from .utils.supervizor import Supervizor
+
+# Analiza video are nevoie de OpenCV și NumPy; testele ei sunt sărite fără ele
+try:
+    import cv2
+    import numpy as np
+    from app.script import process_video
+except ImportError:
+    process_video = None
+
+
+def _competitie_cu_bracket(categorii, sportivi_pe_categorie, cluburi=1):
+    """
+    Competiție de Pankration cu `categorii` categorii de greutate, fiecare cu
+    `sportivi_pe_categorie` sportivi împărțiți pe rând între `cluburi` cluburi,
+    și cu bracket-urile generate. Întoarce competiția și categoriile.
+    """
+    competitie = Competitie.objects.create(
+        nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 2)
+    )
+    proba = Proba.objects.create(nume="Pankration")
+    cluburi = [Club.objects.create(nume=f"Club {i}") for i in range(cluburi)]
+
+    lista = []
+    for c in range(categorii):
+        categorie = Categorie.objects.create(
+            proba=proba, sex="M", varsta_min=18, varsta_max=20, categorie_greutate=f"-{60 + c}"
+        )
+        lista.append(categorie)
+        for s in range(sportivi_pe_categorie):
+            sportiv = Sportiv.objects.create(
+                nume="Sportiv", prenume=f"{c}-{s}", cnp=f"1{c:06d}{s:06d}",
+                club=cluburi[s % len(cluburi)], sex="M", data_nastere=date(2006, 1, 1)
+            )
+            Inscriere.objects.create(sportiv=sportiv, categorie=categorie, competitie=competitie)
+
+    inscrieri = Inscriere.objects.filter(competitie=competitie).select_related("sportiv", "categorie__proba")
+    genereaza_bracket_si_meciuri(inscrieri, competitie)
+    return competitie, lista
+
+
+class FinalizareConcurentaTest(TransactionTestCase):
+    """
+    Semifinalele aceleiași categorii finalizate simultan, pe fire de execuție
+    separate, trebuie să ajungă în locurile fixe ale finalei și ale meciului
+    pentru locul 3, fără să se suprascrie și fără meciuri duplicate. Pe SQLite
+    fără transaction_mode IMMEDIATE, finalizările blocate sunt reluate.
+    """
+    NUMAR_CATEGORII = 6
+
+    def setUp(self):
+        self.competitie, _ = _competitie_cu_bracket(self.NUMAR_CATEGORII, 4)
+
+    def _finalizeaza(self, meci, start):
+        try:
+            start.wait()
+            response = APIClient().patch(
+                f"/api/meciuri/{meci.id}/finalizare/",
+                {"scor1": 3, "scor2": 1, "castigator": meci.sportiv1_id},
+                format="json",
+            )
+            return response.status_code
+        finally:
+            connection.close()
+
+    def test_semifinale_finalizate_simultan(self):
+        semifinale = list(Meci.objects.filter(competitie=self.competitie, runda="Semifinala"))
+        start = threading.Barrier(len(semifinale))
+
+        with ThreadPoolExecutor(max_workers=len(semifinale)) as executor:
+            coduri = list(executor.map(lambda meci: self._finalizeaza(meci, start), semifinale))
+
+        self.assertEqual(coduri, [200] * len(semifinale))
+
+        for semifinala in semifinale:
+            slot = "sportiv1" if semifinala.pozitie_in_bracket % 2 == 1 else "sportiv2"
+            finale = Meci.objects.filter(competitie=self.competitie, categorie=semifinala.categorie, runda="Finala")
+            meciuri_loc3 = Meci.objects.filter(competitie=self.competitie, categorie=semifinala.categorie, runda="Locul 3")
+
+            self.assertEqual(finale.count(), 1)
+            self.assertEqual(meciuri_loc3.count(), 1)
+            self.assertEqual(getattr(finale.get(), f"{slot}_id"), semifinala.sportiv1_id)
+            self.assertEqual(getattr(meciuri_loc3.get(), f"{slot}_id"), semifinala.sportiv2_id)
+
+    def test_acelasi_meci_finalizat_de_doua_ori(self):
+        semifinala = Meci.objects.filter(competitie=self.competitie, runda="Semifinala").first()
+        start = threading.Barrier(4)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            coduri = list(executor.map(lambda _: self._finalizeaza(semifinala, start), range(4)))
+
+        self.assertEqual(sorted(coduri), [200, 400, 400, 400])
+
+
+class EliminaDuplicateMigrareTest(TransactionTestCase):
+    """
+    Migrarea 0021 păstrează din meciurile duplicate rândul cu rezultatul
+    și mută pe el legăturile next_meci.
+    """
+    inainte = [("api", "0020_revizie")]
+    dupa = [("api", "0021_elimina_duplicate")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.inainte)
+        self.apps = executor.loader.project_state(self.inainte).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_meciul_disputat_este_pastrat(self):
+        Meci, Sportiv = self.apps.get_model("api", "Meci"), self.apps.get_model("api", "Sportiv")
+        competitie = self.apps.get_model("api", "Competitie").objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 1)
+        )
+        categorie = self.apps.get_model("api", "Categorie").objects.create(
+            proba=self.apps.get_model("api", "Proba").objects.create(nume="Pankration"),
+            sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60",
+        )
+        club = self.apps.get_model("api", "Club").objects.create(nume="Club")
+        sportivi = [
+            Sportiv.objects.create(nume="Sportiv", prenume=str(i), cnp=f"6{i:012d}", club=club, sex="M", data_nastere=date(2006, 1, 1))
+            for i in range(2)
+        ]
+
+        def meci(runda, pozitie, **campuri):
+            return Meci.objects.create(
+                competitie=competitie, categorie=categorie, runda=runda,
+                pozitie_in_bracket=pozitie, pozitie_in_runda=pozitie, **campuri
+            )
+
+        gol = meci("Finala", 1)
+        disputat = meci("Finala", 1, sportiv1=sportivi[0], sportiv2=sportivi[1], castigator=sportivi[1], scor1=1, scor2=3)
+        semifinala = meci("Semifinala", 1, next_meci=gol)
+        # Fără rezultat în grup, este păstrat cel mai vechi rând
+        loc3 = [meci("Locul 3", 1) for _ in range(2)]
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.dupa)
+
+        Meci = executor.loader.project_state(self.dupa).apps.get_model("api", "Meci")
+        self.assertEqual(
+            list(Meci.objects.filter(runda="Finala").values_list("id", "castigator_id", "scor2")),
+            [(disputat.id, sportivi[1].id, 3)],
+        )
+        self.assertFalse(Meci.objects.filter(id=gol.id).exists())
+        self.assertEqual(Meci.objects.get(id=semifinala.id).next_meci_id, disputat.id)
+        self.assertEqual(list(Meci.objects.filter(runda="Locul 3").values_list("id", flat=True)), [loc3[0].id])
+
+
+class FinalizareMeciTest(TestCase):
+    def test_id_invalid(self):
+        response = APIClient().patch("/api/meciuri/abc/finalizare/", {"scor1": 3, "scor2": 1}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Meci invalid")
+
+
+class ClasamentTest(TestCase):
+    """
+    Clasamentele întreținute incremental la fiecare finalizare sunt identice cu
+    cele reconstruite din meciuri de reconciliaza_clasamente.
+    """
+
+    def setUp(self):
+        self.competitie, (self.categorie,) = _competitie_cu_bracket(1, 8, cluburi=3)
+
+    def _joaca(self, meciuri):
+        while (meci := meciuri.filter(castigator__isnull=True, sportiv1__isnull=False, sportiv2__isnull=False).first()):
+            FinalizareMeci(meci.id).executa(3, 1, meci.sportiv2_id, False)
+
+    def _clasament(self):
+        return dict(ClasamentProba.objects.filter(competitie=self.competitie).values_list("sportiv_id", "puncte"))
+
+    def test_incremental_egal_cu_reconstruit(self):
+        meciuri = Meci.objects.filter(competitie=self.competitie).order_by("id")
+        self._joaca(meciuri.exclude(runda__in=["Finala", "Locul 3"]))
+        # Doar finala și meciul pentru locul 3 clasează sportivi
+        self.assertEqual(self._clasament(), {})
+        self._joaca(meciuri)
+
+        finala = Meci.objects.get(competitie=self.competitie, runda="Finala")
+        loc3 = Meci.objects.get(competitie=self.competitie, runda="Locul 3")
+        self.assertEqual(self._clasament(), {
+            finala.sportiv2_id: 1, finala.sportiv1_id: 2, loc3.sportiv2_id: 3, loc3.sportiv1_id: 4,
+        })
+        self.assertEqual(
+            ClasamentClub.objects.filter(competitie=self.competitie).aggregate(total=Sum("puncte"))["total"],
+            sum(puncte_cluburi_din_clasament(
+                [(Sportiv.objects.get(id=s), loc) for s, loc in self._clasament().items()]
+            ).values()),
+        )
+
+        iesire = StringIO()
+        call_command("reconciliaza_clasamente", self.competitie.id, stdout=iesire)
+        self.assertIn("Clasamentele sunt consistente", iesire.getvalue())
+
+    def test_eroarea_clasamentului_anuleaza_finalizarea(self):
+        meciuri = Meci.objects.filter(competitie=self.competitie).order_by("id")
+        self._joaca(meciuri.exclude(runda="Finala"))
+        finala = meciuri.get(runda="Finala")
+        with mock.patch("app.api.signals.aplica_clasament_categorie", side_effect=RuntimeError("clasament")):
+            response = APIClient().patch(
+                f"/api/meciuri/{finala.id}/finalizare/",
+                {"scor1": 3, "scor2": 1, "castigator": finala.sportiv1_id}, format="json",
+            )
+        self.assertEqual(response.status_code, 500)
+        finala.refresh_from_db()
+        self.assertIsNone(finala.castigator_id)
+
+
+class BracketTest(TestCase):
+    """
+    Eliminarea directă pe 5..128 de sportivi: bye-urile intră direct în runda a
+    doua, prima rundă nu are meciuri goale și fiecare meci duce, prin next_meci,
+    în meciul de pe poziția (p + 1) // 2 a rundei următoare.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competitie = Competitie.objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 2)
+        )
+        cls.proba = Proba.objects.create(nume="Pankration")
+        cluburi = Club.objects.bulk_create([Club(nume=f"Club {i}") for i in range(5)])
+        cls.sportivi = Sportiv.objects.bulk_create([
+            Sportiv(nume="Sportiv", prenume=str(i), cnp=f"4{i:012d}", club=cluburi[i % 5],
+                    sex="M", data_nastere=date(2006, 1, 1))
+            for i in range(128)
+        ])
+
+    def _categorie(self, numar_sportivi, greutate="-60"):
+        categorie = Categorie.objects.create(
+            proba=self.proba, sex="M", varsta_min=18, varsta_max=20, categorie_greutate=greutate
+        )
+        Inscriere.objects.bulk_create([
+            Inscriere(sportiv=sportiv, categorie=categorie, competitie=self.competitie)
+            for sportiv in self.sportivi[:numar_sportivi]
+        ])
+        return categorie
+
+    def _genereaza(self):
+        inscrieri = Inscriere.objects.filter(competitie=self.competitie).select_related("sportiv", "categorie__proba")
+        genereaza_bracket_si_meciuri(inscrieri, self.competitie)
+
+    def test_bye_uri_si_legaturi(self):
+        for numar_sportivi in (5, 6, 7, 8, 9, 12, 16, 17, 31, 33, 64, 100, 127, 128):
+            with self.subTest(sportivi=numar_sportivi):
+                Inscriere.objects.all().delete()
+                Meci.objects.all().delete()
+                categorie = self._categorie(numar_sportivi, f"-{numar_sportivi}")
+                self._genereaza()
+
+                spoturi = 4
+                while spoturi < numar_sportivi:
+                    spoturi *= 2
+                runde, numar_meciuri = [], spoturi // 2
+                while numar_meciuri >= 1:
+                    runde.append({
+                        m.pozitie_in_bracket: m
+                        for m in Meci.objects.filter(categorie=categorie, runda=nume_runda(numar_meciuri))
+                    })
+                    numar_meciuri //= 2
+
+                prima, a_doua = runde[0], runde[1]
+                # Un meci pe pereche de sportivi fără bye, niciunul gol
+                self.assertEqual(len(prima), numar_sportivi - spoturi // 2)
+                self.assertTrue(all(m.sportiv1_id and m.sportiv2_id for m in prima.values()))
+
+                for pozitie, meci in a_doua.items():
+                    for slot, sursa in (("sportiv1_id", 2 * pozitie - 1), ("sportiv2_id", 2 * pozitie)):
+                        if sursa in prima:
+                            self.assertIsNone(getattr(meci, slot))
+                        else:
+                            self.assertIsNotNone(getattr(meci, slot))
+
+                in_bracket = [
+                    s for m in list(prima.values()) + list(a_doua.values()) for s in (m.sportiv1_id, m.sportiv2_id) if s
+                ]
+                self.assertEqual(sorted(in_bracket), sorted(s.id for s in self.sportivi[:numar_sportivi]))
+
+                for runda, urmatoarea in zip(runde, runde[1:]):
+                    for pozitie, meci in runda.items():
+                        self.assertEqual(meci.next_meci_id, urmatoarea[(pozitie + 1) // 2].id)
+                self.assertIsNone(runde[-1][1].next_meci_id)
+                self.assertTrue(Meci.objects.filter(categorie=categorie, runda="Locul 3").exists())
+
+    def test_scrieri_constante_pe_nivel(self):
+        # Trei categorii de 8 (3 niveluri) și una de 16 (4 niveluri)
+        for i in range(3):
+            self._categorie(8, f"-{60 + i}")
+        self._categorie(16, "-70")
+
+        with CaptureQueriesContext(connection) as interogari:
+            self._genereaza()
+        scrieri = [q["sql"].split()[0] for q in interogari.captured_queries]
+        # Un INSERT pe nivel pentru toate categoriile și un UPDATE pentru next_meci
+        self.assertEqual(scrieri.count("INSERT"), 4)
+        self.assertEqual(sum(1 for q in interogari.captured_queries if q["sql"].startswith("UPDATE \"api_meci\"")), 1)
+
+    def test_doar_modificate(self):
+        neschimbata, schimbata, disputata, retrasa = (self._categorie(4, f"-{60 + i}") for i in range(4))
+        self._genereaza()
+        meci = Meci.objects.filter(categorie=disputata, sportiv1__isnull=False, sportiv2__isnull=False).first()
+        FinalizareMeci(meci.id).executa(3, 1, meci.sportiv1_id, False)
+        meciuri_neschimbate = set(Meci.objects.filter(categorie=neschimbata).values_list("id", flat=True))
+
+        for categorie in (schimbata, disputata):
+            Inscriere.objects.create(sportiv=self.sportivi[10], categorie=categorie, competitie=self.competitie)
+        Inscriere.objects.filter(categorie=retrasa).delete()
+
+        inscrieri = Inscriere.objects.filter(competitie=self.competitie).select_related("sportiv", "categorie__proba")
+        raport = genereaza_bracket_si_meciuri(inscrieri, self.competitie, doar_modificate=True)
+
+        self.assertEqual(
+            {cheie: sorted(c["id"] for c in categorii) for cheie, categorii in raport.items()},
+            {"omise": [neschimbata.id], "regenerate": sorted([schimbata.id, retrasa.id]), "blocate": [disputata.id]},
+        )
+        self.assertEqual(set(Meci.objects.filter(categorie=neschimbata).values_list("id", flat=True)), meciuri_neschimbate)
+        in_bracket = {s for pereche in Meci.objects.filter(categorie=schimbata).values_list("sportiv1_id", "sportiv2_id") for s in pereche}
+        self.assertIn(self.sportivi[10].id, in_bracket)
+        self.assertFalse(Meci.objects.filter(categorie=retrasa).exists())
+        self.assertTrue(Meci.objects.filter(categorie=disputata, castigator__isnull=False).exists())
+
+        # A doua rulare nu mai are nimic de refăcut
+        raport = genereaza_bracket_si_meciuri(inscrieri, self.competitie, doar_modificate=True)
+        self.assertEqual(raport["regenerate"], [])
+
+
+class ProgramareTest(TestCase):
+    """
+    După o finalizare este replanificată doar saltea eliberată: meciul în
+    desfășurare și ordinea celorlalte saltele rămân neschimbate.
+    """
+
+    def setUp(self):
+        self.competitie, _ = _competitie_cu_bracket(3, 8)
+
+        self.saltele = [Saltea.objects.create(numar=i) for i in (1, 2, 3)]
+        program = ProgramCompetitie.objects.create(
+            competitie=self.competitie, durata_meci_minute=5, pauza_minima_minute=15, ora_start=timezone.now()
+        )
+        program.saltele.set(self.saltele)
+        replanifica_competitie(self.competitie.id)
+
+    def _program(self):
+        return {
+            m.id: (m.saltea_id, m.ordine, m.ora_programata)
+            for m in Meci.objects.filter(competitie=self.competitie, castigator__isnull=True)
+        }
+
+    def _coada(self, saltea):
+        return Meci.objects.filter(competitie=self.competitie, saltea=saltea, castigator__isnull=True).order_by("ordine")
+
+    def test_meciul_in_desfasurare_nu_este_mutat(self):
+        in_desfasurare = self._coada(self.saltele[1]).first()
+        ClipMeci.objects.create(
+            meci=in_desfasurare, saltea=self.saltele[1], director="saltea_2", inceput=timezone.now()
+        )
+        meci = self._coada(self.saltele[0]).first()
+        coada_eliberata = set(self._coada(self.saltele[0]).values_list("id", flat=True)) - {meci.id}
+        inainte = self._program()
+
+        with CaptureQueriesContext(connection) as interogari:
+            FinalizareMeci(meci.id).executa(3, 1, meci.sportiv1_id, False)
+
+        dupa = self._program()
+        self.assertEqual(dupa[in_desfasurare.id], inainte[in_desfasurare.id])
+        # Celelalte saltele sunt neatinse; se schimbă doar coada saltelei eliberate
+        rescrise = {meci_id for meci_id, valori in dupa.items() if inainte[meci_id] != valori}
+        self.assertLessEqual(rescrise, coada_eliberata)
+        self.assertTrue(all(inainte[m][0] == self.saltele[0].id for m in rescrise))
+        scrieri_program = [q for q in interogari.captured_queries if q["sql"].startswith('UPDATE "api_meci" SET "saltea_id"')]
+        self.assertLessEqual(len(scrieri_program), 1)
+
+    def test_meciul_urmator_respecta_pauza(self):
+        meci = self._coada(self.saltele[0]).first()
+        urmator = Meci.objects.get(id=meci.next_meci_id)
+        # Meciul următor a fost mutat manual prea devreme pe o saltea ocupată
+        ora = timezone.now() + timedelta(minutes=1)
+        Meci.objects.filter(id=urmator.id).update(saltea=self.saltele[1], ordine=0, ora_programata=ora)
+        coada = list(self._coada(self.saltele[1]).exclude(id=urmator.id).values_list("id", "ordine", "ora_programata"))
+
+        FinalizareMeci(meci.id).executa(3, 1, meci.sportiv1_id, False)
+
+        urmator.refresh_from_db()
+        self.assertGreaterEqual(urmator.ora_programata, ora + timedelta(minutes=13))
+        self.assertEqual(list(self._coada(self.saltele[1]).exclude(id=urmator.id).values_list("id", "ordine", "ora_programata")), coada)
+
+
+class ListaMeciuriInterogariTest(TestCase):
+    """
+    Lista de meciuri rulează un număr constant de interogări, indiferent de
+    numărul de meciuri, iar numele afișate sunt calculate din sportiv și club.
+    """
+    NUMAR_MECIURI = 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competitie = Competitie.objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 2)
+        )
+        proba = Proba.objects.create(nume="Pankration")
+        categorie = Categorie.objects.create(
+            proba=proba, sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60"
+        )
+        cluburi = Club.objects.bulk_create([Club(nume=f"Club {i}") for i in range(10)])
+        sportivi = Sportiv.objects.bulk_create([
+            Sportiv(nume="Sportiv", prenume=str(i), cnp=f"1{i:012d}", club=cluburi[i % 10],
+                    sex="M", data_nastere=date(2006, 1, 1))
+            for i in range(2 * cls.NUMAR_MECIURI)
+        ])
+        Meci.objects.bulk_create([
+            Meci(competitie=cls.competitie, categorie=categorie, runda="Runda 1/1000",
+                 sportiv1=sportivi[2 * i], sportiv2=sportivi[2 * i + 1], castigator=sportivi[2 * i],
+                 pozitie_in_bracket=i + 1, pozitie_in_runda=i + 1)
+            for i in range(cls.NUMAR_MECIURI)
+        ])
+
+    def test_numar_constant_de_interogari(self):
+        caches["raspunsuri"].clear()
+        client = APIClient()
+        # Reviziile pentru ETag, validarea filtrului `competitie` și meciurile
+        with self.assertNumQueries(3):
+            response = client.get("/api/meciuri/", {"competitie": self.competitie.id, "page_size": 1000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), self.NUMAR_MECIURI)
+        self.assertIsNone(response.data["next"])
+
+        primul = response.data["results"][0]
+        self.assertEqual(primul["sportiv1_nume"], "Sportiv 0 (Club 0)")
+        self.assertEqual(primul["sportiv2_nume"], "Sportiv 1 (Club 1)")
+        self.assertEqual(primul["castigator_nume"], "Sportiv 0 (Club 0)")
+        self.assertEqual(primul["categorie_nume"], "Pankration - M - -60kg")
+
+
+class BracketsCompetitieTest(TestCase):
+    """
+    Endpoint-ul de bracket-uri întoarce toate categoriile competiției cu un
+    număr constant de interogări, aplică filtrele și răspunde cu 304 la ETag.
+    """
+
+    def setUp(self):
+        caches["raspunsuri"].clear()
+        self.competitie, self.categorii = _competitie_cu_bracket(3, 8, cluburi=2)
+        # O categorie feminină, la altă probă, cu un singur meci
+        self.proba = Proba.objects.create(nume="Pale")
+        self.feminin = Categorie.objects.create(
+            proba=self.proba, sex="F", varsta_min=15, varsta_max=17, categorie_greutate="-52"
+        )
+        Meci.objects.create(
+            competitie=self.competitie, categorie=self.feminin, runda="Finala",
+            pozitie_in_bracket=1, pozitie_in_runda=1,
+        )
+        # Meciurile altei competiții nu apar în bracket-uri
+        alta = Competitie.objects.create(nume="Cupa", data_incepere=date(2025, 6, 1), data_sfarsit=date(2025, 6, 1))
+        Meci.objects.create(competitie=alta, categorie=self.categorii[0], runda="Finala", pozitie_in_bracket=1, pozitie_in_runda=1)
+        self.url = f"/api/competitions/{self.competitie.id}/brackets/"
+
+    def _categorii(self, **filtre):
+        response = APIClient().get(self.url, filtre)
+        self.assertEqual(response.status_code, 200)
+        return [c["id"] for c in response.json()["categorii"]]
+
+    def test_numar_constant_de_interogari(self):
+        # Reviziile pentru ETag, competiția, categoriile și meciurile lor
+        with self.assertNumQueries(4):
+            response = APIClient().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        categorii = response.json()["categorii"]
+        # Ordonate după probă, sex și vârstă
+        self.assertEqual([c["id"] for c in categorii], [self.feminin.id] + [c.id for c in self.categorii])
+        prima = categorii[1]
+        self.assertEqual(prima["proba"]["nume"], "Pankration")
+        self.assertEqual(prima["participanti"], 8)
+        self.assertEqual(
+            len(prima["meciuri"]),
+            Meci.objects.filter(competitie=self.competitie, categorie=self.categorii[0]).count(),
+        )
+        self.assertTrue(all(m["sportiv1"] for m in prima["meciuri"] if m["runda"] == "Sferturi"))
+
+    def test_filtre(self):
+        pankration = self.categorii[0].proba_id
+        self.assertEqual(self._categorii(proba=self.proba.id), [self.feminin.id])
+        self.assertEqual(self._categorii(sex="F"), [self.feminin.id])
+        self.assertEqual(self._categorii(varsta="18-20"), [c.id for c in self.categorii])
+        self.assertEqual(self._categorii(varsta="16"), [self.feminin.id])
+        self.assertEqual(self._categorii(proba=pankration, greutate="-61 kg"), [self.categorii[1].id])
+        self.assertEqual(self._categorii(sex="M", varsta="6-7"), [])
+
+    def test_filtru_invalid(self):
+        client = APIClient()
+        for filtre in ({"proba": "Pankration"}, {"varsta": "tineret"}, {"varsta": "18-"}):
+            self.assertEqual(client.get(self.url, filtre).status_code, 400)
+
+    def test_competitie_inexistenta(self):
+        response = APIClient().get("/api/competitions/999999/brackets/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag(self):
+        client = APIClient()
+        response = client.get(self.url)
+        etag = response["ETag"]
+
+        # Revalidarea costă doar citirea reviziilor
+        with self.assertNumQueries(1):
+            response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        sfert = Meci.objects.filter(competitie=self.competitie, runda="Sferturi").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            FinalizareMeci(sfert.id).executa(3, 1, sfert.sportiv1_id, False)
+
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        meciuri = {m["id"]: m for c in response.json()["categorii"] for m in c["meciuri"]}
+        self.assertEqual(meciuri[sfert.id]["castigator"], sfert.sportiv1_id)
+
+
+class EvenimenteTest(TestCase):
+    """
+    Finalizarea publică, după commit, delta meciurilor atinse, doar abonaților
+    competiției și categoriei respective; fluxul SSE le transmite mai departe.
+    """
+
+    def setUp(self):
+        self.competitie, self.categorii = _competitie_cu_bracket(2, 4)
+
+    def _evenimente(self, abonament):
+        evenimente = []
+        while not abonament.coada.empty():
+            evenimente.append(abonament.coada.get_nowait())
+        return evenimente
+
+    def test_finalizarea_publica_delta_meciurilor(self):
+        categorie, alta_categorie = self.categorii
+        abonament = broadcaster.aboneaza(self.competitie.id, categorie.id)
+        abonament_alta_categorie = broadcaster.aboneaza(self.competitie.id, alta_categorie.id)
+        self.addCleanup(broadcaster.dezaboneaza, abonament)
+        self.addCleanup(broadcaster.dezaboneaza, abonament_alta_categorie)
+
+        semifinala = Meci.objects.filter(categorie=categorie, runda="Semifinala").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().patch(
+                f"/api/meciuri/{semifinala.id}/finalizare/",
+                {"scor1": 3, "scor2": 1, "castigator": semifinala.sportiv1_id},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        delte = {e["meci"]["id"]: e["meci"] for e in self._evenimente(abonament) if e["tip"] == "meci"}
+        finala = Meci.objects.get(categorie=categorie, runda="Finala")
+        loc3 = Meci.objects.get(categorie=categorie, runda="Locul 3")
+
+        self.assertEqual(set(delte), {semifinala.id, finala.id, loc3.id})
+        self.assertEqual(delte[semifinala.id]["castigator"], semifinala.sportiv1_id)
+        slot = "sportiv1" if semifinala.pozitie_in_bracket % 2 == 1 else "sportiv2"
+        self.assertEqual(delte[finala.id][slot], semifinala.sportiv1_id)
+        self.assertEqual(delte[loc3.id][slot], semifinala.sportiv2_id)
+        self.assertEqual(self._evenimente(abonament_alta_categorie), [])
+
+    async def test_flux_sse(self):
+        response = await AsyncClient().get(f"/api/competitii/{self.competitie.id}/evenimente/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        flux = aiter(response.streaming_content)
+        self.assertEqual(await anext(flux), b"retry: 3000\n\n")
+
+        meci = await Meci.objects.filter(competitie=self.competitie).afirst()
+        broadcaster.publica(eveniment_meci(meci))
+        mesaj = (await anext(flux)).decode()
+        self.assertTrue(mesaj.startswith("event: meci\ndata: "))
+        self.assertIn(f'"id": {meci.id}', mesaj)
+
+        # La deconectarea clientului, handler-ul ASGI anulează citirea fluxului
+        citire = asyncio.ensure_future(anext(flux))
+        await asyncio.sleep(0)
+        citire.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await citire
+        self.assertEqual(broadcaster.numar_abonati(self.competitie.id), 0)
+
+
+class CacheConditionatTest(TestCase):
+    """
+    Citirile publice primesc ETag; clientul cu versiunea curentă primește 304,
+    iar o scriere schimbă revizia și deci răspunsul.
+    """
+
+    def setUp(self):
+        caches["raspunsuri"].clear()
+        self.proba = Proba.objects.create(nume="Pankration")
+        Categorie.objects.create(proba=self.proba, sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60")
+
+    def test_etag_si_invalidare(self):
+        client = APIClient()
+        response = client.get("/api/categorii/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # Revalidarea costă doar citirea reviziilor
+        with self.assertNumQueries(1):
+            response = client.get("/api/categorii/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # Fără ETag, răspunsul vine din cache, fără serializare
+        with self.assertNumQueries(1):
+            response = client.get("/api/categorii/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Categorie.objects.create(proba=self.proba, sex="F", varsta_min=18, varsta_max=20, categorie_greutate="-52")
+
+        response = client.get("/api/categorii/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_finalizarea_invalideaza_doar_competitia_ei(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            competitie, alta = (
+                Competitie.objects.create(nume=nume, data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 2))
+                for nume in ("Campionat", "Cupa")
+            )
+        client = APIClient()
+        url = f"/api/meciuri/?competitie={competitie.id}"
+        etag = client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            meci_finalizat.send(sender=None, meci=Meci(competitie=alta), meciuri=[])
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            meci_finalizat.send(sender=None, meci=Meci(competitie=competitie), meciuri=[])
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ListeSportiviCategoriiTest(TestCase):
+    """
+    Listele sunt paginate cu cursor, pot fi restrânse la o competiție prin
+    înscrieri și pot întoarce doar câmpurile cerute.
+    """
+
+    def setUp(self):
+        caches["raspunsuri"].clear()
+        self.competitie = Competitie.objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 2)
+        )
+        proba = Proba.objects.create(nume="Pankration")
+        club = Club.objects.create(nume="Club")
+        self.categorie = Categorie.objects.create(proba=proba, sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60")
+        Categorie.objects.create(proba=proba, sex="F", varsta_min=18, varsta_max=20, categorie_greutate="-52")
+        sportivi = Sportiv.objects.bulk_create([
+            Sportiv(nume="Sportiv", prenume=str(i), cnp=f"3{i:012d}", club=club, sex="M", data_nastere=date(2006, 1, 1))
+            for i in range(5)
+        ])
+        for sportiv in sportivi[:3]:
+            Inscriere.objects.create(sportiv=sportiv, categorie=self.categorie, competitie=self.competitie)
+
+    def test_paginare_cu_cursor(self):
+        client = APIClient()
+        url, ids = "/api/sportivi/?page_size=2", []
+        while url:
+            pagina = client.get(url).json()
+            ids.extend(s["id"] for s in pagina["results"])
+            url = pagina["next"]
+        self.assertEqual(ids, sorted(Sportiv.objects.values_list("id", flat=True)))
+
+    def test_filtru_competitie_si_campuri(self):
+        client = APIClient()
+        sportivi = client.get("/api/sportivi/", {"competitie": self.competitie.id, "fields": "id,nume"}).json()["results"]
+        self.assertEqual(len(sportivi), 3)
+        self.assertEqual(set(sportivi[0]), {"id", "nume"})
+
+        categorii = client.get("/api/categorii/", {"competitie": self.competitie.id}).json()["results"]
+        self.assertEqual([c["id"] for c in categorii], [self.categorie.id])
+
+
+class DateSinteticeTest(TestCase):
+    def test_campionat_reproductibil_si_importabil(self):
+        randuri = genereaza_participanti(80, 10, PROBE_CAMPIONAT, date(2025, 5, 1), seed=7)
+        self.assertEqual(randuri, genereaza_participanti(80, 10, PROBE_CAMPIONAT, date(2025, 5, 1), seed=7))
+
+        competitie = Competitie.objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 1)
+        )
+        probe = [Proba.objects.create(nume=nume) for nume in PROBE_CAMPIONAT]
+        competitie.probe.add(*probe)
+        populate_categorii_standard(*probe)
+
+        importul = ImportParticipanti(competitie).executa(fisier_participanti(randuri))
+        self.assertEqual(importul.errors, [])
+        self.assertEqual(Inscriere.objects.filter(competitie=competitie).count(), len(randuri))
+
+
+class ImportParticipantiTest(TestCase):
+    def setUp(self):
+        self.competitie = Competitie.objects.create(
+            nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 1)
+        )
+
+    def _rand(self, nume="Pop Ion", cnp="5000101000001", data="01.01.2000", kg="", cat_kg="-62"):
+        return ["1", nume, "CS Arad", "M", cnp, data, "", kg, cat_kg, "Pankration", "", ""]
+
+    def test_erori_pe_rand_si_reimport(self):
+        # Sportivul există deja, cu alt nume: nu este modificat
+        Sportiv.objects.create(
+            nume="Vechi", prenume="Nume", cnp="5000101000002", club=Club.objects.create(nume="Alt club"),
+            sex="M", data_nastere=date(2000, 1, 1)
+        )
+        randuri = [
+            self._rand(),
+            self._rand(nume="Popion", cnp="5000101000003"),
+            self._rand(cnp=None),
+            self._rand(cnp="5000101000004", data="2000-01-01"),
+            self._rand(),
+            self._rand(cnp="123"),
+            self._rand(cnp="5230101000005", data="01.01.2023"),
+            self._rand(nume="Ionescu Dan", cnp="5000101000002", kg="61.5", cat_kg=""),
+        ]
+
+        importul = ImportParticipanti(self.competitie).executa(fisier_participanti(randuri))
+        self.assertEqual([eroare.split(":")[0] for eroare in importul.errors], [f"Randul {i}" for i in range(3, 9)])
+        self.assertIn("apare de mai multe ori", importul.errors[3])
+        self.assertEqual((importul.added_count, importul.existing_count), (2, 0))
+
+        inscrieri = Inscriere.objects.filter(competitie=self.competitie).select_related("sportiv", "categorie")
+        self.assertEqual({(i.sportiv.nume, i.categorie.categorie_greutate) for i in inscrieri}, {("Pop", "-62"), ("Vechi", "-62")})
+
+        # Același fișier importat din nou nu dublează nimic
+        importul = ImportParticipanti(self.competitie).executa(fisier_participanti(randuri))
+        self.assertEqual((importul.added_count, importul.existing_count), (0, 2))
+        self.assertEqual(Inscriere.objects.filter(competitie=self.competitie).count(), 2)
+        self.assertEqual(Sportiv.objects.count(), 2)
+        self.assertEqual(Club.objects.filter(nume="CS Arad").count(), 1)
+
+    def test_antet_lipsa(self):
+        fisier = fisier_participanti([])
+        wb = openpyxl.load_workbook(fisier)
+        wb.active.delete_cols(5)
+        fisier = io.BytesIO()
+        wb.save(fisier)
+        fisier.seek(0)
+        with self.assertRaises(ImportInvalid):
+            ImportParticipanti(self.competitie).executa(fisier)
+
+    @override_settings(JOBURI_SINCRON=True)
+    def test_upload_cu_joburi_sincrone(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("organizator"))
+        fisier = fisier_participanti([self._rand(), self._rand(cnp="5000101000002")])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                f"/api/competitii/{self.competitie.id}/upload-participants/",
+                {"file": SimpleUploadedFile("campionat.xlsx", fisier.getvalue())}, format="multipart",
+            )
+        self.assertEqual(response.status_code, 202)
+
+        # Jobul a rulat pe firul request-ului, imediat după commit
+        job = JobImport.objects.get(id=response.data["id"])
+        self.assertEqual((job.status, job.randuri_adaugate), ("finalizat", 2))
+        self.assertEqual(Meci.objects.filter(competitie=self.competitie).count(), 3)
+
+
+class ExportExcelTest(TestCase):
+    """
+    Șablonul, lista de participanți și clasamentul se descarcă drept fișiere
+    xlsx valide, cu antetul și rândurile așteptate și numele competiției.
+    """
+
+    def setUp(self):
+        self.competitie, (self.categorie,) = _competitie_cu_bracket(1, 4, cluburi=2)
+        self.competitie.probe.add(self.categorie.proba)
+        Sportiv.objects.filter(prenume="0-0").update(nr_legitimatie="L-100")
+
+    def _descarca(self, url, nume_fisier):
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        self.assertEqual(response["Content-Disposition"], f"attachment; filename*=UTF-8''{nume_fisier}")
+        return openpyxl.load_workbook(io.BytesIO(response.getvalue()))
+
+    def _randuri(self, ws):
+        return list(ws.iter_rows(values_only=True))
+
+    def test_sablon(self):
+        wb = self._descarca(f"/api/competitii/{self.competitie.id}/template/", "Inscriere%20Campionat.xlsx")
+        ws = wb["Sportivi"]
+        randuri = self._randuri(ws)
+        self.assertEqual(list(randuri[0]), ANTET_SABLON)
+        self.assertEqual(randuri[1], (None,) * len(ANTET_SABLON))
+        self.assertEqual(len(randuri), 1000)
+        self.assertIn('"Pankration"', [v.formula1 for v in ws.data_validations.dataValidation])
+
+    def test_export_participanti(self):
+        wb = self._descarca(
+            f"/api/competitii/{self.competitie.id}/export-participants/", "Lista%20Sportivi%20Campionat.xlsx"
+        )
+        randuri = self._randuri(wb["Sportivi"])
+        self.assertEqual(randuri[0][:5], ("NR LEG", "NUME SI PRENUME", "CLUB", "GEN", "CNP"))
+        self.assertEqual(len(randuri), 1 + 4)
+        self.assertEqual(
+            randuri[1],
+            ("L-100", "Sportiv 0-0", "Club 0", "M", "1000000000000", "01.01.2006", "18-20", "-60 KG", "Pankration", None, 100),
+        )
+
+    def test_clasament(self):
+        meciuri = Meci.objects.filter(competitie=self.competitie).order_by("id")
+        while (meci := meciuri.filter(castigator__isnull=True, sportiv1__isnull=False, sportiv2__isnull=False).first()):
+            FinalizareMeci(meci.id).executa(3, 1, meci.sportiv1_id, False)
+        finala = meciuri.get(runda="Finala")
+
+        url = f"/api/competitii/{self.competitie.id}/ranking/download/"
+        # Competiția, clasamentul pe probe și cel al cluburilor
+        with self.assertNumQueries(3):
+            response = APIClient().get(url)
+            continut = response.getvalue()
+        self.assertEqual(response["Content-Disposition"], "attachment; filename*=UTF-8''Clasament%20Complet%20Campionat.xlsx")
+
+        wb = openpyxl.load_workbook(io.BytesIO(continut))
+        self.assertEqual(wb.sheetnames, ["Clasament Sportivi", "Clasament Cluburi", "Statistici"])
+        sportivi = self._randuri(wb["Clasament Sportivi"])
+        self.assertEqual(sportivi[0], ("LOCUL", "NUME SI PRENUME", "PROBA", "GEN", "CATEGORIE KG", "CATEGORIE VARSTA", "CLUB"))
+        self.assertEqual(len(sportivi), 1 + 4)
+        campion = finala.sportiv1
+        self.assertEqual(
+            sportivi[1],
+            (1, f"{campion.nume} {campion.prenume}", "Pankration", "Masculin", "-60 KG", "18-20", campion.club.nume),
+        )
+        cluburi = self._randuri(wb["Clasament Cluburi"])
+        self.assertEqual(cluburi[0], ("LOCUL", "CLUB", "PUNCTE"))
+        self.assertEqual(
+            [r[1:] for r in cluburi[1:]],
+            list(ClasamentClub.objects.filter(competitie=self.competitie).order_by("-puncte").values_list("club__nume", "puncte")),
+        )
+        statistici = self._randuri(wb["Statistici"])
+        self.assertEqual(statistici[1][:5], ("PANKRATION MASCULIN", "18 - 20 ANI", "-60 KG", "TINERET", sportivi[1][1]))
+
+    def test_raspuns_excel(self):
+        wb = creeaza_workbook()
+        ws = adauga_foaie(wb, "Foaie", ["A", "B"], [10, None])
+        ws.append(rand(ws, ["ă", 2], "date"))
+
+        response = raspuns_excel(wb, "Clasament Școală.xlsx")
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        self.assertEqual(response["Content-Disposition"], "attachment; filename*=UTF-8''Clasament%20%C8%98coal%C4%83.xlsx")
+        foaie = openpyxl.load_workbook(io.BytesIO(response.getvalue()))["Foaie"]
+        self.assertEqual(self._randuri(foaie), [("A", "B"), ("ă", 2)])
+        self.assertEqual(foaie["A2"].style, "date")
+
+
+class IndexCategoriiTest(TestCase):
+    def setUp(self):
+        self.pankration = Proba.objects.create(nume="Pankration")
+        self.polydamas = Proba.objects.create(nume="Polydamas")
+        populate_categorii_standard(self.pankration, self.polydamas)
+        self.index = IndexCategorii.pentru_probe([self.pankration, self.polydamas])
+
+    def _greutate(self, varsta, greutate, sex="M"):
+        categorie = self.index.rezolva(self.pankration, sex, varsta, greutate)
+        return categorie and (categorie.varsta_min, categorie.varsta_max, categorie.categorie_greutate)
+
+    def test_limite_varsta(self):
+        self.assertEqual(self._greutate(21, 60), (21, 34, "-62"))
+        self.assertEqual(self._greutate(34, 60), (21, 34, "-62"))
+        self.assertEqual(self._greutate(20, 60), (18, 20, "-62"))
+        self.assertEqual(self._greutate(35, 60), (35, 100, "-62"))
+        self.assertIsNone(self._greutate(5, 20))
+        self.assertIsNone(self._greutate(101, 60))
+
+    def test_limite_greutate(self):
+        self.assertEqual(self._greutate(25, 56), (21, 34, "-56"))
+        self.assertEqual(self._greutate(25, 56.1), (21, 34, "-62"))
+        self.assertEqual(self._greutate(25, "61,9"), (21, 34, "-62"))
+        self.assertEqual(self._greutate(25, 105), (21, 34, "-105"))
+        self.assertEqual(self._greutate(25, 105.5), (21, 34, "+105"))
+        self.assertEqual(self._greutate(19, 120), (18, 20, "+95"))
+        self.assertEqual(self._greutate(25, "-69"), (21, 34, "-69"))
+        self.assertEqual(self._greutate(25, "+105"), (21, 34, "+105"))
+        self.assertIsNone(self._greutate(25, "-70"))
+        self.assertIsNone(self._greutate(25, None))
+        self.assertEqual(self._greutate(13, 40, sex="F"), (12, 14, "-40"))
+        self.assertEqual(self._greutate(13, 40), (12, 14, "-41"))
+
+    def test_proba_fara_greutate(self):
+        categorie = self.index.rezolva(self.polydamas, "F", 25, None)
+        self.assertEqual((categorie.proba, categorie.varsta_min, categorie.categorie_greutate), (self.polydamas, 21, None))
+        self.assertEqual(self.index.rezolva(self.polydamas, "M", 25, 80), categorie)
+        self.assertIsNone(self.index.rezolva(self.polydamas, "M", 4, None))
+
+    def test_proba_fara_categorii(self):
+        self.assertIsNone(self.index.rezolva(Proba.objects.create(nume="Sambo"), "M", 25, 60))
+
+
+class InstrumentareTest(TestCase):
+    def setUp(self):
+        registru.reseteaza()
+        caches["raspunsuri"].clear()
+        self.admin = APIClient()
+        self.admin.force_login(User.objects.create_user("admin", is_staff=True))
+
+    def _interogari(self, response):
+        # db;dur=1.2;desc="3 interogari", ser;dur=..., total;dur=...
+        return int(response["Server-Timing"].split('desc="')[1].split()[0])
+
+    def test_server_timing_si_metrici(self):
+        response = APIClient().get("/api/meciuri/")
+        self.assertGreater(self._interogari(response), 0)
+        self.assertIn("ser;dur=", response["Server-Timing"])
+
+        self.assertEqual(APIClient().get("/metrics").status_code, 403)
+        text = self.admin.get("/metrics").content.decode()
+        self.assertIn('http_requests_total{view="meci-list",method="GET",status="200"} 1', text)
+        self.assertIn('http_request_duration_seconds_bucket{view="meci-list",method="GET",le="+Inf"} 1', text)
+        self.assertIn('http_request_db_queries_total{view="meci-list",method="GET"}', text)
+
+    @override_settings(METRICI_LENTE=2)
+    def test_requesturi_lente_cu_interogari(self):
+        for url in ("/api/meciuri/", "/api/sportivi/", "/api/categorii/"):
+            APIClient().get(url)
+        lente = self.admin.get("/metrics/lente").json()["requesturi"]
+        self.assertEqual(len(lente), 2)
+        self.assertGreaterEqual(lente[0]["ms"], lente[1]["ms"])
+        self.assertEqual(len(lente[0]["sql"]), lente[0]["interogari"])
+
+    async def test_view_sincron_sub_asgi(self):
+        # Interogările rulează în firul lui sync_to_async, pe altă conexiune
+        response = await AsyncClient().get("/api/meciuri/")
+        self.assertGreater(self._interogari(response), 0)
+
+
+class AnalizaVideoTest(TestCase):
+    def setUp(self):
+        competitie = Competitie.objects.create(nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 1))
+        categorie = Categorie.objects.create(
+            proba=Proba.objects.create(nume="Pankration"), sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60"
+        )
+        self.meci = Meci.objects.create(competitie=competitie, categorie=categorie, runda="Finala", pozitie_in_bracket=1, pozitie_in_runda=1)
+
+    def test_castigatorul_detectat_este_salvat_pe_meci(self):
+        job = JobAnalizaVideo.objects.create(meci=self.meci, cale_video="/tmp/meci.mp4")
+        rezultat = {"castigator": "ALBASTRU", "brat": "Right", "moment_secunde": 41.2, "eroare": None}
+        with mock.patch("app.api.utils.analiza_video._analizeaza", return_value=rezultat):
+            with self.captureOnCommitCallbacks(execute=True):
+                proceseaza_job_analiza(job.id)
+            proceseaza_job_analiza(job.id)  # preluat o singură dată
+
+        self.meci.refresh_from_db()
+        self.assertEqual(self.meci.castigator_video, "ALBASTRU")
+        stare = APIClient().get(f"/api/analize-video/{job.id}/").json()
+        self.assertEqual((stare["status"], stare["castigator"]), ("finalizat", "ALBASTRU"))
+
+    def test_eroarea_analizei_marcheaza_jobul_esuat(self):
+        job = JobAnalizaVideo.objects.create(meci=self.meci, cale_video="/tmp/lipsa.mp4")
+        with mock.patch("app.api.utils.analiza_video._analizeaza", return_value={"eroare": "Nu s-a putut deschide"}):
+            proceseaza_job_analiza(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "esuat")
+        self.meci.refresh_from_db()
+        self.assertIsNone(self.meci.castigator_video)
+
+    def test_verdictul_live_nu_este_suprascris(self):
+        job = JobAnalizaVideo.objects.create(meci=self.meci, status="in_lucru")
+        self.assertTrue(salveaza_rezultat(job.id, {"castigator": "ALB", "sursa": "live"}))
+        # Oprirea înregistrării nu mai trimite jobul la analiza offline
+        self.assertFalse(salveaza_rezultat(job.id, {"castigator": "ALBASTRU"}))
+        self.meci.refresh_from_db()
+        self.assertEqual(self.meci.castigator_video, "ALB")
+
+    def test_decizia_este_pastrata_in_indexul_clipului(self):
+        inceput = datetime(2025, 5, 1, 10, 0).astimezone()
+        clip = ClipMeci.objects.create(
+            meci=self.meci, saltea=Saltea.objects.create(numar=1), director="/tmp/saltea_1",
+            inceput=inceput, sfarsit=inceput + timedelta(minutes=3),
+        )
+        job = JobAnalizaVideo.objects.create(meci=self.meci, clip=clip, status="in_lucru")
+        # Video-ul analizat începe cu 20 s înainte de sfârșitul meciului
+        salveaza_rezultat(job.id, {
+            "castigator": "ALB", "moment_secunde": 12.5,
+            "inceput_video": (inceput + timedelta(seconds=160)).isoformat(),
+        })
+        clip.refresh_from_db()
+        self.assertEqual(clip.decizii, [{"secunda": 172.5, "castigator": "ALB", "sursa": "analiza"}])
+        clipuri = APIClient().get(f"/api/meciuri/{self.meci.id}/clipuri/").json()
+        self.assertEqual((clipuri[0]["durata"], clipuri[0]["decizii"][0]["secunda"]), (180.0, 172.5))
+
+
+class SegmenteTest(TestCase):
+    def test_segmentele_care_acopera_intervalul(self):
+        with tempfile.TemporaryDirectory() as director:
+            for nume in ("20250501_100000.ts", "20250501_100010.ts", "20250501_100020.ts", "20250501_100030.ts", "lista.txt"):
+                open(os.path.join(director, nume), "w").close()
+            ora = lambda secunda: datetime(2025, 5, 1, 10, 0, secunda).astimezone()
+
+            gasite = segmente(director, ora(15), ora(25))
+            self.assertEqual([os.path.basename(cale) for cale, _ in gasite], ["20250501_100010.ts", "20250501_100020.ts"])
+            self.assertEqual(gasite[0][1], ora(10))
+            # Ultimul segment este încă scris, deci acoperă orice moment de după începutul lui
+            self.assertEqual(len(segmente(director, ora(50), ora(59))), 1)
+            self.assertEqual(segmente(os.path.join(director, "lipsa")), [])
+
+    def test_retentia_pastreaza_segmentele_meciurilor(self):
+        ora = lambda minut, secunda: datetime(2025, 5, 1, 10, minut, secunda).astimezone()
+        with tempfile.TemporaryDirectory() as director, override_settings(INREGISTRARI_DIR=director):
+            saltea = os.path.join(director, "saltea_1")
+            os.makedirs(saltea)
+            for secunda in range(0, 60, 10):
+                open(os.path.join(saltea, f"20250501_1000{secunda:02d}.ts"), "w").close()
+            open(os.path.join(saltea, "20250501_100100.ts"), "w").close()
+            ClipMeci.objects.create(
+                saltea=Saltea.objects.create(numar=1), director=saltea, inceput=ora(0, 25), sfarsit=ora(0, 35)
+            )
+
+            os.makedirs(os.path.join(director, "clipuri"))
+            vechi, nou = (os.path.join(director, "clipuri", nume) for nume in ("clip_1_0_final.mp4", "analiza_2.mp4"))
+            for cale in (vechi, nou):
+                open(cale, "w").close()
+            acum = ora(0, 45) + timedelta(hours=1)
+            os.utime(vechi, (acum.timestamp() - 7200, acum.timestamp() - 7200))
+
+            self.assertEqual(curata_inregistrari(1, acum=acum), (2, 1))
+            self.assertEqual(
+                sorted(os.listdir(saltea)),
+                ["20250501_100020.ts", "20250501_100030.ts", "20250501_100040.ts", "20250501_100050.ts", "20250501_100100.ts"],
+            )
+            self.assertEqual(os.listdir(os.path.join(director, "clipuri")), ["analiza_2.mp4"])
+            # Segmentul scris acum nu este niciodată șters
+            self.assertEqual(curata_inregistrari(0, acum=acum + timedelta(days=1)), (2, 0))
+            self.assertEqual(sorted(os.listdir(saltea)), ["20250501_100020.ts", "20250501_100030.ts", "20250501_100100.ts"])
+
+
+@override_settings(ANALIZA_LIVE=False, INREGISTRARI_DIR="/tmp/inregistrari-test")
+class SupervizorTest(TestCase):
+    def setUp(self):
+        self.saltele = [Saltea.objects.create(numar=i, camera_url=f"http://camera{i}/video") for i in (1, 2)]
+        patch_supervizor = mock.patch("app.api.views.recording_views.supervizor", Supervizor())
+        patch_popen = mock.patch("app.api.utils.supervizor.subprocess.Popen")
+        patch_supervizor.start()
+        self.popen = patch_popen.start()
+        self.popen.return_value.poll.return_value = None
+        self.popen.return_value.returncode = 0
+        self.popen.return_value.pid = 4321
+        self.addCleanup(patch_supervizor.stop)
+        self.addCleanup(patch_popen.stop)
+
+    def test_o_inregistrare_pe_fiecare_saltea(self):
+        client = APIClient()
+        for saltea in self.saltele:
+            self.assertEqual(client.post("/api/start-recording/", {"saltea": saltea.id}).status_code, 200)
+        self.assertEqual(client.post("/api/start-recording/", {"saltea": self.saltele[0].id}).status_code, 409)
+
+        comenzi = [apel.args[0] for apel in self.popen.call_args_list]
+        self.assertEqual([c[2] for c in comenzi], ["http://camera1/video", "http://camera2/video"])
+        self.assertIn("segment", comenzi[0])
+        self.assertEqual(os.path.dirname(comenzi[0][-1]), f"/tmp/inregistrari-test/saltea_{self.saltele[0].id}")
+        self.assertEqual(
+            [(p["numar_saltea"], p["stare"]) for p in client.get("/api/saltele/stare/").json()],
+            [(1, "activ"), (2, "activ")],
+        )
+
+        response = client.post("/api/stop-recording/", {"saltea": self.saltele[0].id})
+        self.assertEqual(response.status_code, 202)
+        job = JobAnalizaVideo.objects.select_related("clip").get(id=response.json()["id"])
+        self.assertEqual(job.clip.saltea, self.saltele[0])
+        self.assertIsNotNone(job.clip.sfarsit)
+        self.assertEqual(client.post("/api/stop-recording/", {"saltea": self.saltele[0].id}).status_code, 400)
+
+    @override_settings(LIVESTREAM_URL="rtmp://live/cheie")
+    def test_livestream_fara_saltea_foloseste_saltea_implicita(self):
+        client = APIClient()
+        response = client.post("/api/start-livestream/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["numar_saltea"], 1)
+        self.assertEqual(client.post("/api/start-livestream/", {}, format="json").status_code, 409)
+        self.assertEqual(client.post("/api/stop-livestream/", {}, format="json").status_code, 200)
+        self.assertEqual(client.post("/api/stop-livestream/", {}, format="json").status_code, 400)
+        self.assertEqual(client.post("/api/start-livestream/", {"saltea": 999}, format="json").status_code, 400)
+
+    def test_meci_neprogramat_inregistrat_pe_saltea_implicita(self):
+        competitie = Competitie.objects.create(nume="Campionat", data_incepere=date(2025, 5, 1), data_sfarsit=date(2025, 5, 1))
+        categorie = Categorie.objects.create(
+            proba=Proba.objects.create(nume="Pankration"), sex="M", varsta_min=18, varsta_max=20, categorie_greutate="-60"
+        )
+        meciuri = [
+            Meci.objects.create(competitie=competitie, categorie=categorie, runda="Semifinala", pozitie_in_bracket=i, pozitie_in_runda=i)
+            for i in (1, 2)
+        ]
+        client = APIClient()
+
+        response = client.post("/api/start-recording/", {"meci": meciuri[0].id}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ClipMeci.objects.get(meci=meciuri[0]).saltea, self.saltele[0])
+        # Saltea implicită înregistrează deja: al doilea meci neprogramat primește 409
+        self.assertEqual(client.post("/api/start-recording/", {"meci": meciuri[1].id}, format="json").status_code, 409)
+        self.assertFalse(ClipMeci.objects.filter(meci=meciuri[1]).exists())
+        self.assertEqual(client.post("/api/stop-recording/", {"meci": meciuri[0].id}, format="json").status_code, 202)
+
+    def test_saltea_implicita_creata_la_nevoie(self):
+        Saltea.objects.all().delete()
+        response = APIClient().post("/api/start-recording/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Saltea.objects.values_list("numar", flat=True)), [1])
+
+
+@unittest.skipUnless(process_video, "OpenCV și NumPy nu sunt instalate")
+class CuloareTabelTest(SimpleTestCase):
+    """
+    Tabelul culorilor roșii cuantizează canalele la BITI_CULOARE biți, deci se
+    poate abate de măștile HSV/LAB originale doar lângă praguri.
+    """
+
+    def _masca_originala(self, image):
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        masca = cv2.threshold(lab[:, :, 1], process_video.PRAG_LAB_A, 255, cv2.THRESH_BINARY)[1]
+        for lower, upper in process_video.RED_RANGES:
+            masca = cv2.bitwise_or(masca, cv2.inRange(hsv, np.array(lower), np.array(upper)))
+        return masca
+
+    def _scor_original(self, image, bbox):
+        x1, y1, x2, y2 = bbox
+        masca = self._masca_originala(image[y1:y2, x1:x2])
+        kernel = np.ones((3, 3), np.uint8)
+        masca = cv2.morphologyEx(masca, cv2.MORPH_CLOSE, kernel)
+        masca = cv2.morphologyEx(masca, cv2.MORPH_OPEN, kernel)
+        return np.count_nonzero(masca) / masca.size
+
+    def test_dezacord_marginit_pe_culori_aleatoare(self):
+        image = np.random.default_rng(0).integers(0, 256, (256, 256, 3), dtype=np.uint8)
+        dezacord = np.count_nonzero(process_video.masca_rosie(image) != self._masca_originala(image)) / (256 * 256)
+        self.assertLess(dezacord, 0.02)
+
+    def test_culori_departe_de_praguri(self):
+        culori = np.array([[
+            (0, 0, 255), (40, 40, 200), (30, 20, 120), (100, 110, 105), (0, 0, 0), (255, 255, 255), (40, 200, 40),
+        ]], dtype=np.uint8)
+        np.testing.assert_array_equal(process_video.masca_rosie(culori), self._masca_originala(culori))
+
+    def test_scorul_zonei_persoanei(self):
+        # Blocuri aliniate la scara ROI-ului (256 -> 64), fără pixeli amestecați la margini
+        image = np.full((320, 320, 3), (100, 110, 105), dtype=np.uint8)
+        image[64:192, 64:160] = (40, 40, 200)
+        image[200:256, 100:300] = (200, 60, 40)
+        bbox = (32, 32, 288, 288)
+        self.assertAlmostEqual(
+            process_video.enhanced_color_detection(image, bbox), self._scor_original(image, bbox), delta=0.01
+        )
+
+
+@unittest.skipUnless(process_video, "OpenCV și NumPy nu sunt instalate")
+class BrateRidicateTest(SimpleTestCase):
+    """detect_raised_arms vectorizat dă aceleași brațe ca vechiul calcul per braț."""
+
+    def _brate_original(self, landmarks):
+        brate = []
+        for side, (s, e, w) in (("Left", (11, 13, 15)), ("Right", (12, 14, 16))):
+            shoulder, elbow, wrist = ([float(v) for v in landmarks[i]] for i in (s, e, w))
+            if min(shoulder[2], elbow[2], wrist[2]) <= 0.5:
+                continue
+            angle = math.degrees(math.atan2(-(wrist[1] - shoulder[1]), wrist[0] - shoulder[0]))
+            conditions = [
+                45 <= angle <= 135, wrist[1] < shoulder[1],
+                elbow[1] <= shoulder[1] + 0.1, (shoulder[1] - wrist[1]) > 0.05,
+            ]
+            relaxed_conditions = [30 <= angle <= 150, wrist[1] < shoulder[1], elbow[1] < shoulder[1] + 0.15]
+            if sum(conditions) >= 3 or sum(relaxed_conditions) >= 2:
+                brate.append(side)
+        return brate
+
+    def test_paritate_cu_calculul_per_brat(self):
+        rng = np.random.default_rng(1)
+        gasite = set()
+        for _ in range(5000):
+            landmarks = rng.random((33, 3), dtype=np.float32)
+            # Vizibilitatea este de cele mai multe ori peste prag, ca ambele ramuri să fie acoperite
+            landmarks[:, 2] = rng.choice(np.array([0.3, 0.9], dtype=np.float32), 33, p=[0.2, 0.8])
+            brate = process_video.detect_raised_arms({"landmarks": landmarks})
+            self.assertEqual(brate, self._brate_original(landmarks))
+            gasite.add(tuple(brate))
+        self.assertEqual(gasite, {(), ("Left",), ("Right",), ("Left", "Right")})
+        self.assertEqual(process_video.detect_raised_arms(None), [])
+
+
+class _CaptureSintetica:
+    """
+    Video sintetic pentru DecodorCadre, poziționat la cadrul `inceput` (ca după
+    cap.set): reține cadrele decodate efectiv.
+    """
+
+    def __init__(self, cadre, inceput=0):
+        self.cadre = cadre
+        self.index = inceput - 1
+        self.decodate = []
+        self.la_decodare = lambda index: None
+
+    def grab(self):
+        if self.index + 1 >= self.cadre:
+            return False
+        self.index += 1
+        return True
+
+    def retrieve(self):
+        self.decodate.append(self.index)
+        self.la_decodare(self.index)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+@unittest.skipUnless(process_video, "OpenCV și NumPy nu sunt instalate")
+class DecodorCadreTest(SimpleTestCase):
+    """La 25 fps: un cadru din 5 în căutare, fiecare cadru în confirmare."""
+
+    def _ruleaza(self, cadre, index_start=0, la_decodare=None):
+        cap = _CaptureSintetica(cadre, index_start)
+        decodor = process_video.DecodorCadre(cap, 25, 5, 25, 640, marime_coada=100, index_start=index_start)
+        if la_decodare:
+            cap.la_decodare = lambda index: la_decodare(decodor, index)
+        decodor.start()
+        elemente = []
+        while (element := decodor.coada.get(timeout=5)) is not None:
+            elemente.append(element)
+        decodor.join()
+        return cap, decodor, elemente
+
+    def test_cautarea_sare_cadrele_fara_decodare(self):
+        cap, decodor, elemente = self._ruleaza(50)
+        self.assertEqual([index for index, _, _ in elemente], list(range(0, 50, 5)))
+        self.assertEqual(cap.decodate, list(range(0, 50, 5)))
+        self.assertEqual(elemente[1][1], 0.2)
+        self.assertEqual(decodor.cadre_citite, 50)
+
+    def test_confirmarea_decodeaza_fiecare_cadru(self):
+        def la_decodare(decodor, index):
+            # Gestul candidat apare la cadrul 10 și dispare la cadrul 14
+            if index == 10:
+                decodor.mod_confirmare.set()
+            elif index == 14:
+                decodor.mod_confirmare.clear()
+
+        cap, decodor, elemente = self._ruleaza(30, index_start=5, la_decodare=la_decodare)
+        self.assertEqual([index for index, _, _ in elemente], [5, 10, 11, 12, 13, 14, 19, 24, 29])
+        self.assertEqual(cap.decodate, [5, 10, 11, 12, 13, 14, 19, 24, 29])
+        self.assertEqual(elemente[0][1], 0.2)
+        self.assertEqual(decodor.cadre_citite, 25)
+
+
+@unittest.skipUnless(process_video, "OpenCV și NumPy nu sunt instalate")
+class AnalizaVideoOprireTest(SimpleTestCase):
+    """
+    analizeaza_video se oprește la gestul confirmat. Detecția pozei este
+    înlocuită de un analyze_frame care vede arbitrul cu brațul drept ridicat
+    în cadrele luminoase, iar pool-ul de procese de un singur fir.
+    """
+    FPS = 25
+
+    def setUp(self):
+        director = tempfile.TemporaryDirectory()
+        self.addCleanup(director.cleanup)
+        self.video = os.path.join(director.name, "meci.avi")
+        scriere = cv2.VideoWriter(self.video, cv2.VideoWriter_fourcc(*"MJPG"), self.FPS, (64, 48))
+        if not scriere.isOpened():
+            self.skipTest("OpenCV nu poate scrie MJPG")
+        # 10 secunde: întuneric, apoi gestul arbitrului de la secunda 4
+        for index in range(10 * self.FPS):
+            scriere.write(np.full((48, 64, 3), 200 if index >= 4 * self.FPS else 0, dtype=np.uint8))
+        scriere.release()
+
+        landmarks = np.zeros((33, 3), dtype=np.float32)
+        landmarks[[11, 13, 15]] = [(0.4, 0.5, 1), (0.4, 0.65, 1), (0.4, 0.8, 1)]
+        landmarks[[12, 14, 16]] = [(0.6, 0.5, 1), (0.6, 0.35, 1), (0.6, 0.2, 1)]
+        self.arbitru = {"center_x": 32.0, "landmarks": landmarks}
+
+        patch_pool = mock.patch.object(process_video, "creeaza_pool", lambda procese, complexitate: ThreadPoolExecutor(1))
+        patch_pool.start()
+        self.addCleanup(patch_pool.stop)
+
+    def _analizeaza(self, analyze_frame):
+        with mock.patch.object(process_video, "analyze_frame", analyze_frame):
+            return process_video.analizeaza_video(self.video, procese=1)
+
+    def test_oprire_la_gestul_confirmat(self):
+        rezultat = self._analizeaza(lambda image: self.arbitru if image.mean() > 100 else None)
+        self.assertEqual((rezultat.brat, rezultat.castigator), ("Right", "ALBASTRU"))
+        # Primul cadru luminos (4.0 s) pornește gestul, confirmat după DURATA_CONFIRMARE
+        self.assertEqual(rezultat.moment_secunde, 4.2)
+        self.assertEqual(rezultat.cadre_totale, 250)
+        self.assertLess(rezultat.cadre_citite, 200)
+
+    def test_fara_gest_citeste_tot_video_ul(self):
+        rezultat = self._analizeaza(lambda image: None)
+        self.assertIsNone(rezultat.castigator)
+        self.assertEqual(rezultat.cadre_citite, 250)
+        self.assertEqual(rezultat.cadre_analizate, 50)
@@ -1,12 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views.auth_views import RegisterView, LogoutView
-from .views.competitie_views import CompetitieViewSet, CompetitionExcelTemplateView, UploadParticipantsView, ExportParticipantsView, DownloadRankingView
+from .views.competitie_views import CompetitieViewSet, CompetitionExcelTemplateView, UploadParticipantsView, ImportJobView, ExportParticipantsView, DownloadRankingView
 from .views.meci_views import MeciViewSet
+from .views.evenimente_views import flux_evenimente
 from .views.categorie_views import CategorieViewSet
 from .views.sportiv_views import SportivViewSet
 from .views.proba_views import ProbaViewSet
-from .views.recording_views import StartRecordingView, StopRecordingView, StartLivestreamView, StopLivestreamView
+from .views.recording_views import StartRecordingView, StopRecordingView, StarePipelineView, JobAnalizaVideoView, ClipuriMeciView, ClipVideoView, StartLivestreamView, StopLivestreamView
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
 
 router = DefaultRouter()
@@ -29,11 +30,17 @@ urlpatterns = [
     path("competitii/<int:competition_id>/template/", CompetitionExcelTemplateView.as_view(), name="download_excel_template"),
     path("competitii/<int:competition_id>/export-participants/", ExportParticipantsView.as_view(), name="export_participants"),
     path("competitii/<int:competition_id>/upload-participants/", UploadParticipantsView.as_view()),
+    path("competitii/<int:competition_id>/imports/<int:job_id>/", ImportJobView.as_view(), name="import_job"),
     path("competitii/<int:competition_id>/ranking/download/", DownloadRankingView.as_view(), name="download_ranking"),
+    path("competitii/<int:competition_id>/evenimente/", flux_evenimente, name="flux_evenimente"),
 
     # Recording
     path('start-recording/', StartRecordingView.as_view(), name='start_recording'),
     path('stop-recording/', StopRecordingView.as_view(), name='stop_recording'),
+    path('saltele/stare/', StarePipelineView.as_view(), name='stare_pipeline'),
+    path('analize-video/<int:job_id>/', JobAnalizaVideoView.as_view(), name='analiza_video'),
+    path('meciuri/<int:meci_id>/clipuri/', ClipuriMeciView.as_view(), name='clipuri_meci'),
+    path('clipuri/<int:clip_id>/video/', ClipVideoView.as_view(), name='clip_video'),
     path('start-livestream/', StartLivestreamView.as_view(), name='start_livestream'),
     path('stop-livestream/', StopLivestreamView.as_view(), name='stop_livestream'),
 ]
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db import connection
+from .analiza_video import salveaza_rezultat
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dimensiunea cadrelor brute trimise de ffmpeg analizei live
+LATIME, INALTIME = 640, 360
+
+_pool = None
+_lacat = threading.Lock()
+
+
+def _pool_live():
+    """
+    Un singur proces de detecție, păstrat între înregistrări, cu modelul de
+    poză deja încărcat.
+    """
+    global _pool
+    with _lacat:
+        if _pool is None:
+            from app.script.process_video import creeaza_pool
+            _pool = creeaza_pool(1, settings.ANALIZA_LIVE_COMPLEXITATE)
+        return _pool
+
+
+def _reseteaza_pool():
+    global _pool
+    with _lacat:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def incalzeste():
+    """Pornește procesul de detecție înainte de primul cadru."""
+    try:
+        _pool_live().submit(int)
+    except Exception as e:
+        # Fără OpenCV/MediaPipe înregistrarea continuă; rămâne analiza după oprire
+        logger.warning(f"Analiza live indisponibilă: {e}")
+
+
+def argumente_ffmpeg():
+    """
+    A doua ieșire ffmpeg: cadre bgr24 micșorate, la ANALIZA_LIVE_FPS, pe stdout.
+    """
+    fps = settings.ANALIZA_LIVE_FPS
+    filtru = (
+        f"fps={fps},scale={LATIME}:{INALTIME}:force_original_aspect_ratio=decrease,"
+        f"pad={LATIME}:{INALTIME}:(ow-iw)/2:(oh-ih)/2"
+    )
+    return ["-an", "-vf", filtru, "-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1"]
+
+
+class AnalizaLive(threading.Thread):
+    """
+    Citește cadrele brute ale unei înregistrări din `flux` și salvează verdictul
+    pe jobul `job_id` în momentul în care gestul arbitrului este confirmat.
+    `inceput` este momentul pornirii lui ffmpeg, primul cadru al fluxului.
+    Fluxul este citit până la capăt în orice situație, altfel ffmpeg s-ar bloca
+    în scrierea pe pipe.
+    """
+
+    def __init__(self, flux, job_id, inceput):
+        super().__init__(daemon=True, name=f"analiza-live-{job_id}")
+        self.flux = flux
+        self.job_id = job_id
+        self.inceput = inceput
+
+    def run(self):
+        try:
+            from app.script.process_video import analizeaza_flux, cadre_rawvideo
+            rezultat = analizeaza_flux(
+                cadre_rawvideo(self.flux, LATIME, INALTIME), settings.ANALIZA_LIVE_FPS, _pool_live(),
+                la_verdict=self._verdict,
+            )
+            if rezultat.eroare:
+                logger.warning(f"Analiza live {self.job_id}: {rezultat.eroare}")
+                _reseteaza_pool()
+        except Exception:
+            logger.exception(f"Analiza live {self.job_id} a eșuat")
+            while self.flux.read(1 << 16):
+                pass
+        finally:
+            connection.close()
+
+    def _verdict(self, rezultat):
+        salveaza_rezultat(self.job_id, {**rezultat.to_dict(), 'sursa': 'live', 'inceput_video': self.inceput.isoformat()})
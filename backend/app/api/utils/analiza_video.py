@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import JobAnalizaVideo, Meci, ClipMeci
+from .clipuri import clip_pentru_analiza
+from .evenimente import publica_dupa_commit, eveniment_meci
+from datetime import datetime, timedelta
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _analizeaza(job):
+    """
+    Analizează doar ultimele ANALIZA_VIDEO_ULTIMELE_SECUNDE ale meciului, unde
+    se află decizia arbitrului. Pentru o înregistrare segmentată sunt lipite
+    doar segmentele necesare.
+    """
+    # Import târziu: OpenCV și MediaPipe sunt necesare doar pe serverul care analizează
+    from app.script.process_video import analizeaza_video
+    procese = settings.ANALIZA_VIDEO_PROCESE or None
+    ultimele = settings.ANALIZA_VIDEO_ULTIMELE_SECUNDE or None
+    if job.clip is None:
+        return analizeaza_video(job.cale_video, procese=procese, ultimele=ultimele).to_dict()
+
+    cale, inceput, de_la = clip_pentru_analiza(job.clip, ultimele)
+    try:
+        return {**analizeaza_video(cale, procese=procese, de_la=de_la).to_dict(), 'inceput_video': inceput.isoformat()}
+    finally:
+        # Fișierul lipit servește doar analizei; meciul rămâne în segmente
+        try:
+            os.unlink(cale)
+        except FileNotFoundError:
+            pass
+
+
+def proceseaza_job_analiza(job_id):
+    """
+    Rulează un JobAnalizaVideo în fundal și, dacă gestul arbitrului a fost
+    recunoscut, salvează culoarea câștigătorului pe meci (castigator_video).
+    """
+    if not JobAnalizaVideo.objects.filter(id=job_id, status='in_asteptare').update(
+        status='in_lucru', data_start=timezone.now()
+    ):
+        return
+
+    job = JobAnalizaVideo.objects.select_related('clip').get(id=job_id)
+    actualizeaza = JobAnalizaVideo.objects.filter(id=job_id).update
+
+    try:
+        rezultat = _analizeaza(job)
+    except Exception as e:
+        logger.exception(f"Analiza video {job_id} a eșuat")
+        actualizeaza(status='esuat', mesaj=str(e), data_sfarsit=timezone.now())
+        return
+
+    if rezultat.get('eroare'):
+        actualizeaza(status='esuat', rezultat=rezultat, mesaj=rezultat['eroare'], data_sfarsit=timezone.now())
+        return
+
+    salveaza_rezultat(job_id, rezultat)
+
+
+def salveaza_rezultat(job_id, rezultat):
+    """
+    Finalizează jobul (încă în lucru) cu rezultatul analizei și salvează
+    câștigătorul pe meci, iar momentul deciziei în indexul clipului. Întoarce
+    False dacă jobul a fost deja finalizat, de exemplu de analiza live.
+    """
+    castigator = rezultat.get('castigator')
+    with transaction.atomic():
+        if not JobAnalizaVideo.objects.filter(id=job_id, status='in_lucru').update(
+            status='finalizat',
+            castigator=castigator,
+            rezultat=rezultat,
+            mesaj=f"Câștigător: {castigator}" if castigator else "Nu s-a putut detecta un câștigător.",
+            data_sfarsit=timezone.now(),
+        ):
+            return False
+
+        meci_id, clip_id = JobAnalizaVideo.objects.filter(id=job_id).values_list('meci_id', 'clip_id').first()
+        if castigator and clip_id:
+            _adauga_decizie(clip_id, rezultat)
+        meci = Meci.objects.select_for_update().filter(id=meci_id).first() if castigator and meci_id else None
+        if meci is not None:
+            meci.castigator_video = castigator
+            # post_save crește și revizia meciurilor competiției
+            meci.save(update_fields=['castigator_video'])
+            publica_dupa_commit(eveniment_meci(meci))
+
+    logger.info(f"Analiza video {job_id}: {castigator or 'fara castigator'} in {rezultat.get('durata_procesare')} s")
+    return True
+
+
+def _adauga_decizie(clip_id, rezultat):
+    """
+    `moment_secunde` este măsurat de la începutul video-ului analizat
+    (`inceput_video`); în clip decizia este păstrată în secunde de la
+    începutul meciului.
+    """
+    if rezultat.get('moment_secunde') is None or not rezultat.get('inceput_video'):
+        return
+    clip = ClipMeci.objects.select_for_update().filter(id=clip_id).first()
+    if clip is None:
+        return
+    moment = datetime.fromisoformat(rezultat['inceput_video']) + timedelta(seconds=rezultat['moment_secunde'])
+    clip.decizii.append({
+        'secunda': round((moment - clip.inceput).total_seconds(), 2),
+        'castigator': rezultat['castigator'],
+        'sursa': rezultat.get('sursa', 'analiza'),
+    })
+    clip.save(update_fields=['decizii'])
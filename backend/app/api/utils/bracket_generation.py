@@ -1,199 +1,286 @@
 from collections import defaultdict
-from ..models import Meci
+from django.db import transaction
+from ..models import Categorie, Meci, Runda, RUNDE_BEST_OF_3, RUNDE_ROUND_ROBIN
+from .evenimente import publica_dupa_commit, eveniment_bracket
+from .revizii import creste_revizie
 import random
 
-def genereaza_bracket_si_meciuri(inscrieri, competitie):
+PROBE_FARA_BRACKET = ["Polydamas", "Palaismata"]
+
+# Numele rundelor de eliminare directă, după numărul de meciuri din rundă
+NUME_RUNDE = {
+    1: Runda.FINALA,
+    2: Runda.SEMIFINALA,
+    4: Runda.SFERTURI,
+    8: Runda.OPTIMI,
+    16: Runda.SAISPREZECIMI,
+    32: Runda.RUNDA_1_32,
+    64: Runda.RUNDA_1_64,
+}
+
+
+def genereaza_bracket_si_meciuri(inscrieri, competitie, doar_modificate=False):
+    """
+    Generează bracket-urile pentru toate categoriile competiției.
+    Turneul este construit întâi în memorie, apoi scris cu o singură ștergere
+    și câte un bulk_create pentru fiecare rundă, indiferent de numărul de categorii.
+
+    Cu `doar_modificate`, o categorie este refăcută doar dacă amprenta sportivilor
+    înscriși diferă de cea a sportivilor din meciurile existente și niciun meci
+    nu a fost încă finalizat. Categoriile cu meciuri rămase fără înscrieri își
+    pierd meciurile. Întoarce raportul categoriilor refăcute, omise
+    (neschimbate) și blocate (schimbate, dar cu meciuri deja disputate).
+    """
     categorii_grupate = defaultdict(list)
     for inscriere in inscrieri:
         categorii_grupate[inscriere.categorie].append(inscriere.sportiv)
 
+    categorii_grupate = {
+        categorie: sportivi for categorie, sportivi in categorii_grupate.items()
+        if not any(p.lower() in categorie.proba.nume.lower() for p in PROBE_FARA_BRACKET)
+    }
+
+    raport = {'regenerate': [], 'omise': [], 'blocate': []}
+    if doar_modificate:
+        existente = _amprente_existente(competitie)
+        # Toți sportivii categoriei s-au retras: amprenta nouă este goală
+        retrase = set(existente) - {categorie.id for categorie in categorii_grupate}
+        for categorie in Categorie.objects.filter(id__in=retrase).select_related('proba'):
+            categorii_grupate[categorie] = []
+
+        de_refacut = {}
+        for categorie, sportivi in categorii_grupate.items():
+            amprenta, finalizate = existente.get(categorie.id, (frozenset(), False))
+            if amprenta_sportivi(sportivi) == amprenta:
+                raport['omise'].append(_descriere(categorie))
+            elif finalizate:
+                raport['blocate'].append(_descriere(categorie))
+            else:
+                de_refacut[categorie] = sportivi
+        categorii_grupate = de_refacut
+
+    plan = []
     for categorie, sportivi in categorii_grupate.items():
-        if any(p.lower() in categorie.proba.nume.lower() for p in ["Polydamas", "Palaismata"]):
-            continue
-        
-        # Ștergem meciurile existente pentru această categorie
-        Meci.objects.filter(categorie=categorie, competitie=competitie).delete()
-
-        if len(sportivi) == 2:
-            # Best of 3 pentru 2 sportivi
-            for i in range(1, 4):
-                Meci.objects.create(
+        plan.extend(_planifica_categorie(categorie, sportivi))
+        raport['regenerate'].append(_descriere(categorie))
+
+    _salveaza_plan(plan, competitie, [categorie for categorie in categorii_grupate])
+    publica_dupa_commit(*[eveniment_bracket(competitie.id, categorie.id) for categorie in categorii_grupate])
+    return raport
+
+
+def amprenta_sportivi(sportivi):
+    """
+    Amprenta unei categorii: mulțimea sportivilor care apar în meciurile ei.
+    Sub 2 sportivi nu se creează meciuri, deci amprenta este goală.
+    """
+    if len(sportivi) < 2:
+        return frozenset()
+    return frozenset(s.id for s in sportivi)
+
+
+def _amprente_existente(competitie):
+    """
+    Pentru fiecare categorie a competiției cu meciuri: amprenta sportivilor din
+    meciuri și dacă vreun meci are deja câștigător. O singură interogare.
+    """
+    sportivi = defaultdict(set)
+    finalizate = set()
+    for categorie_id, sportiv1_id, sportiv2_id, castigator_id in Meci.objects.filter(
+        competitie=competitie
+    ).values_list('categorie_id', 'sportiv1_id', 'sportiv2_id', 'castigator_id'):
+        sportivi[categorie_id].update(s for s in (sportiv1_id, sportiv2_id) if s is not None)
+        if castigator_id is not None:
+            finalizate.add(categorie_id)
+
+    return {
+        categorie_id: (frozenset(ids), categorie_id in finalizate)
+        for categorie_id, ids in sportivi.items()
+    }
+
+
+def _descriere(categorie):
+    return {'id': categorie.id, 'nume': str(categorie)}
+
+
+def _meci_planificat(categorie, runda, pozitie, nivel, sportiv1=None, sportiv2=None):
+    """
+    Înregistrare simplă (în memorie) pentru un meci ce urmează a fi creat.
+    `nivel` dă ordinea de scriere: rundele de la începutul bracket-ului se scriu primele.
+    """
+    return {
+        'categorie': categorie,
+        'runda': runda,
+        'pozitie_in_bracket': pozitie,
+        'pozitie_in_runda': pozitie,
+        'nivel': nivel,
+        'sportiv1': sportiv1,
+        'sportiv2': sportiv2,
+        'next': None,
+    }
+
+
+def _planifica_categorie(categorie, sportivi):
+    """
+    Construiește în memorie lista de meciuri pentru o categorie.
+    """
+    meciuri = []
+
+    if len(sportivi) == 2:
+        # Best of 3 pentru 2 sportivi
+        for i, runda in enumerate(RUNDE_BEST_OF_3, start=1):
+            meciuri.append(_meci_planificat(categorie, runda, i, 0, sportivi[0], sportivi[1]))
+
+    elif len(sportivi) == 3:
+        # Round Robin pentru 3 sportivi
+        perechi = [(0, 1), (1, 2), (0, 2)]
+        for i, ((a, b), runda) in enumerate(zip(perechi, RUNDE_ROUND_ROBIN), start=1):
+            meciuri.append(_meci_planificat(categorie, runda, i, 0, sportivi[a], sportivi[b]))
+
+    elif len(sportivi) >= 4:
+        meciuri = _planifica_eliminare_directa(categorie, sportivi)
+
+    return meciuri
+
+
+def nume_runda(numar_meciuri):
+    """
+    Numele rundei de eliminare directă care are `numar_meciuri` meciuri.
+    """
+    return NUME_RUNDE.get(numar_meciuri, f"Runda 1/{numar_meciuri}")
+
+
+def slot_in_meciul_urmator(meci):
+    """
+    Locul fix (sportiv1/sportiv2) în care intră câștigătorul în meciul următor.
+    Pozițiile impare alimentează sportiv1, cele pare sportiv2.
+    """
+    return 'sportiv1' if meci.pozitie_in_bracket % 2 == 1 else 'sportiv2'
+
+
+def _planifica_eliminare_directa(categorie, sportivi):
+    """
+    Bracket de eliminare directă pe orice putere a lui 2 (4, 8, 16, ..., 128).
+    Toate rundele sunt pre-create și legate prin `next`; sportivii care primesc
+    bye sunt plasați direct în runda a doua, fără un meci fantomă în prima rundă.
+    """
+    numar_spoturi = 4
+    while numar_spoturi < len(sportivi):
+        numar_spoturi *= 2
+
+    capi_de_serie = _distribuie_pe_capi_de_serie(sportivi)
+    ordine = _ordine_capi_de_serie(numar_spoturi)
+
+    # Construim toate rundele, de la prima până la finală
+    runde = []
+    numar_meciuri = numar_spoturi // 2
+    nivel = 0
+    while numar_meciuri >= 1:
+        runda = nume_runda(numar_meciuri)
+        runde.append([
+            _meci_planificat(categorie, runda, pozitie, nivel)
+            for pozitie in range(1, numar_meciuri + 1)
+        ])
+        numar_meciuri //= 2
+        nivel += 1
+
+    for runda_curenta, runda_urmatoare in zip(runde, runde[1:]):
+        for meci in runda_curenta:
+            meci['next'] = runda_urmatoare[(meci['pozitie_in_bracket'] - 1) // 2]
+
+    meci_loc3 = _meci_planificat(categorie, Runda.LOCUL_3, 1, nivel - 1)
+
+    # Populăm prima rundă; un sportiv fără adversar avansează direct
+    prima_runda = []
+    for meci in runde[0]:
+        pozitie = meci['pozitie_in_bracket']
+        sportiv1 = capi_de_serie.get(ordine[2 * pozitie - 2])
+        sportiv2 = capi_de_serie.get(ordine[2 * pozitie - 1])
+
+        if sportiv1 and sportiv2:
+            meci['sportiv1'] = sportiv1
+            meci['sportiv2'] = sportiv2
+            prima_runda.append(meci)
+        else:
+            slot = 'sportiv1' if pozitie % 2 == 1 else 'sportiv2'
+            meci['next'][slot] = sportiv1 or sportiv2
+
+    meciuri = prima_runda
+    for runda in runde[1:]:
+        meciuri.extend(runda)
+    meciuri.append(meci_loc3)
+    return meciuri
+
+
+def _ordine_capi_de_serie(numar_spoturi):
+    """
+    Ordinea standard a capilor de serie pe pozițiile din bracket
+    (pentru 8: 1, 8, 4, 5, 2, 7, 3, 6). Capii de serie peste numărul de sportivi
+    sunt bye-uri, deci niciun meci din prima rundă nu are doi sportivi lipsă.
+    """
+    ordine = [1]
+    while len(ordine) < numar_spoturi:
+        total = len(ordine) * 2 + 1
+        ordine = [cap for c in ordine for cap in (c, total - c)]
+    return ordine
+
+
+def _distribuie_pe_capi_de_serie(sportivi):
+    """
+    Atribuie numerele de cap de serie alternând cluburile, astfel încât sportivii
+    din același club ajung în jumătăți (sferturi, ...) diferite ale bracket-ului.
+    """
+    sportivi_per_club = defaultdict(list)
+    for s in random.sample(sportivi, len(sportivi)):
+        sportivi_per_club[s.club_id].append(s)
+
+    cluburi_ordonate = sorted(sportivi_per_club.values(), key=len, reverse=True)
+
+    capi_de_serie = {}
+    cap = 1
+    while cap <= len(sportivi):
+        for lista_sportivi in cluburi_ordonate:
+            if lista_sportivi:
+                capi_de_serie[cap] = lista_sportivi.pop(0)
+                cap += 1
+
+    return capi_de_serie
+
+
+def _salveaza_plan(plan, competitie, categorii):
+    """
+    Scrie planul în baza de date: o ștergere pentru toate categoriile,
+    un bulk_create pe rundă și un singur bulk_update pentru legăturile next_meci.
+    """
+    with transaction.atomic():
+        Meci.objects.filter(competitie=competitie, categorie__in=categorii).delete()
+
+        runde = defaultdict(list)
+        for meci in plan:
+            runde[meci['nivel']].append(meci)
+
+        for nivel in sorted(runde):
+            obiecte = [
+                Meci(
                     competitie=competitie,
-                    categorie=categorie,
-                    sportiv1=sportivi[0],
-                    sportiv2=sportivi[1],
-                    runda=f"Best of 3 - Meci {i}",
-                    pozitie_in_bracket=i,
-                    pozitie_in_runda=i
+                    categorie=meci['categorie'],
+                    sportiv1=meci['sportiv1'],
+                    sportiv2=meci['sportiv2'],
+                    runda=meci['runda'],
+                    pozitie_in_bracket=meci['pozitie_in_bracket'],
+                    pozitie_in_runda=meci['pozitie_in_runda'],
                 )
-                
-        elif len(sportivi) == 3:
-            # Round Robin pentru 3 sportivi
-            Meci.objects.create(
-                competitie=competitie,
-                categorie=categorie,
-                sportiv1=sportivi[0],
-                sportiv2=sportivi[1],
-                runda="Round Robin - Meci 1",
-                pozitie_in_bracket=1,
-                pozitie_in_runda=1
-            )
-            Meci.objects.create(
-                competitie=competitie,
-                categorie=categorie,
-                sportiv1=sportivi[1],
-                sportiv2=sportivi[2],
-                runda="Round Robin - Meci 2",
-                pozitie_in_bracket=2,
-                pozitie_in_runda=2
-            )
-            Meci.objects.create(
-                competitie=competitie,
-                categorie=categorie,
-                sportiv1=sportivi[0],
-                sportiv2=sportivi[2],
-                runda="Round Robin - Meci 3",
-                pozitie_in_bracket=3,
-                pozitie_in_runda=3
-            )
-            
-        elif len(sportivi) >= 4:
-            numar_spoturi = 8 if len(sportivi) > 4 else 4
-            locuri = list(range(1, numar_spoturi + 1))
-
-            # Grupare sportivi după club 
-            sportivi_per_club = defaultdict(list)
-            for s in sportivi:
-                sportivi_per_club[s.club.id].append(s)
-
-            cluburi_ordonate = sorted(sportivi_per_club.items(), key=lambda x: len(x[1]), reverse=True)
-
-            pozitii = {}
-            sportivi_random = sportivi.copy()
-            random.shuffle(sportivi_random)
-
-            # Distribuire sortivi în poziții
-            idx_poz = 0
-            while sportivi_random:
-                for club_id, lista_sportivi in cluburi_ordonate:
-                    if not lista_sportivi:
-                        continue
-                    if idx_poz < len(locuri):
-                        pozitii[locuri[idx_poz]] = lista_sportivi.pop(0)
-                        idx_poz += 1
-                    if idx_poz >= len(locuri) or not sportivi_random:
-                        break
-                sportivi_random = [s for s in sportivi_random if s not in pozitii.values()]
-
-            # Completăm pozițiile goale
-            for loc in locuri:
-                if loc not in pozitii:
-                    pozitii[loc] = None
-
-            # Creăm meciurile pentru prima rundă
-            if numar_spoturi == 4:
-                # Pentru 4 sportivi: direct semifinale
-                perechi = [(1, 2), (3, 4)]
-                runda_nume = 'Semifinala'
-            else:
-                # Pentru 8 sportivi: sferturi de finală
-                perechi = [(1, 2), (3, 4), (5, 6), (7, 8)]
-                runda_nume = 'Sferturi'
-
-            # Creăm meciurile din prima rundă
-            for idx, (loc1, loc2) in enumerate(perechi, start=1):
-                sportiv1 = pozitii.get(loc1)
-                sportiv2 = pozitii.get(loc2)
-
-                if sportiv1 or sportiv2:
-                    Meci.objects.create(
-                        competitie=competitie,
-                        categorie=categorie,
-                        sportiv1=sportiv1,
-                        sportiv2=sportiv2,
-                        runda=runda_nume,
-                        pozitie_in_bracket=loc1,
-                        pozitie_in_runda=idx
-                    )
-
-            # Pentru bracket-urile cu 4+ sportivi, pre-creăm finala și meciul pentru locul 3
-            # Acestea vor fi populate automat când semifinalele se termină
-            
-            # Creăm finala (goală inițial)
-            Meci.objects.create(
-                competitie=competitie,
-                categorie=categorie,
-                sportiv1=None,
-                sportiv2=None,
-                runda='Finala',
-                pozitie_in_bracket=1,
-                pozitie_in_runda=1
-            )
-            
-            # Creăm meciul pentru locul 3 (goală inițial)
-            Meci.objects.create(
-                competitie=competitie,
-                categorie=categorie,
-                sportiv1=None,
-                sportiv2=None,
-                runda='Locul 3',
-                pozitie_in_bracket=1,
-                pozitie_in_runda=1
-            )
-
-def actualizeaza_bracket_dupa_meci(meci_finalizat):
-    """
-    Funcție helper pentru a actualiza bracket-ul după finalizarea unui meci.
-    Poate fi apelată din ViewSet pentru logică suplimentară.
-    """
-    if not meci_finalizat.castigator:
-        return
-    
-    runda = meci_finalizat.runda.lower()
-    
-    # Logică specială pentru diferite tipuri de runde
-    if 'semifinala' in runda:
-        # După semifinală, trebuie să actualizăm finala și meciul pentru locul 3
-        _actualizeaza_dupa_semifinala(meci_finalizat)
-    elif 'sferturi' in runda:
-        # După sferturi, trebuie să creăm/actualizăm semifinalele
-        _actualizeaza_dupa_sferturi(meci_finalizat)
-    elif 'optimi' in runda:
-        # După optimi, trebuie să creăm/actualizăm sferturile
-        _actualizeaza_dupa_optimi(meci_finalizat)
-
-def _actualizeaza_dupa_semifinala(meci_semifinala):
-    """
-    Actualizează finala și meciul pentru locul 3 după o semifinală.
-    """
-    castigator = meci_semifinala.castigator
-    pierzator = (meci_semifinala.sportiv2 if castigator == meci_semifinala.sportiv1 
-                else meci_semifinala.sportiv1)
-    
-    # Actualizăm finala
-    finala = Meci.objects.filter(
-        competitie=meci_semifinala.competitie,
-        categorie=meci_semifinala.categorie,
-        runda='Finala'
-    ).first()
-    
-    if finala:
-        if finala.sportiv1 is None:
-            finala.sportiv1 = castigator
-        elif finala.sportiv2 is None:
-            finala.sportiv2 = castigator
-        finala.save()
-    
-    # Actualizăm meciul pentru locul 3
-    meci_loc3 = Meci.objects.filter(
-        competitie=meci_semifinala.competitie,
-        categorie=meci_semifinala.categorie,
-        runda='Locul 3'
-    ).first()
-    
-    if meci_loc3:
-        if meci_loc3.sportiv1 is None:
-            meci_loc3.sportiv1 = pierzator
-        elif meci_loc3.sportiv2 is None:
-            meci_loc3.sportiv2 = pierzator
-        meci_loc3.save()
\ No newline at end of file
+                for meci in runde[nivel]
+            ]
+            for meci, obiect in zip(runde[nivel], Meci.objects.bulk_create(obiecte)):
+                meci['obiect'] = obiect
+
+        legate = []
+        for meci in plan:
+            if meci['next'] is not None:
+                meci['obiect'].next_meci = meci['next']['obiect']
+                legate.append(meci['obiect'])
+        if legate:
+            Meci.objects.bulk_update(legate, ['next_meci'])
+
+        creste_revizie('meci', f"competitie:{competitie.id}")
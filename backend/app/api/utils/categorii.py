@@ -1,58 +1,185 @@
+from bisect import bisect_left, bisect_right
 from ..models import Categorie
+from .revizii import creste_revizie
 
-def populate_categorii_standard(proba):
-    categorii_data = {
-        (6, 7): {
-            "F": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
-            "M": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
-        },
-        (8, 9): {
-            "F": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
-            "M": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
-        },
-        (10, 11): {
-            "F": ["-21", "-24", "-27", "-30", "-34", "-38", "-42", "-46", "-52", "-60", "+60"],
-            "M": ["-21", "-24", "-27", "-30", "-34", "-38", "-42", "-46", "-52", "-60", "+60"],
-        },
-        (12, 14): {
-            "F": ["-32", "-36", "-40", "-44", "-48", "-52", "-57", "-63", "+63"],
-            "M": ["-34", "-37", "-41", "-45", "-50", "-55", "-60", "-66", "+66"],
-        },
-        (15, 17): {
-            "F": ["-44", "-48", "-52", "-57", "-63", "-70", "+70"],
-            "M": ["-46", "-50", "-55", "-60", "-66", "-73", "-81", "+81"],
-        },
-        (18, 20): {
-            "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
-            "M": ["-56", "-62", "-69", "-77", "-85", "-95", "+95"],
-        },
-        (21, 34): {
-            "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
-            "M": ["-56", "-62", "-69", "-77", "-85", "-95", "-105", "+105"],
-        },
-        (35, 100): {
-            "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
-            "M": ["-56", "-62", "-69", "-77", "-85", "-95", "-105", "+105"],
-        },
-    }
-
-    probe_fara_greutate = ["Polydamas", "Palaismata"]
-
-    if any(p.lower() in proba.nume.lower() for p in probe_fara_greutate):
-        for age_range in categorii_data.keys():
-            Categorie.objects.get_or_create(
-                proba=proba,
-                varsta_min=age_range[0],
-                varsta_max=age_range[1],
+# Categoriile standard: (vârstă minimă, vârstă maximă) -> sex -> categorii de greutate
+CATEGORII_STANDARD = {
+    (6, 7): {
+        "F": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
+        "M": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
+    },
+    (8, 9): {
+        "F": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
+        "M": ["-18", "-21", "-24", "-27", "-30", "-33", "-36", "-39", "-42", "-45", "+45"],
+    },
+    (10, 11): {
+        "F": ["-21", "-24", "-27", "-30", "-34", "-38", "-42", "-46", "-52", "-60", "+60"],
+        "M": ["-21", "-24", "-27", "-30", "-34", "-38", "-42", "-46", "-52", "-60", "+60"],
+    },
+    (12, 14): {
+        "F": ["-32", "-36", "-40", "-44", "-48", "-52", "-57", "-63", "+63"],
+        "M": ["-34", "-37", "-41", "-45", "-50", "-55", "-60", "-66", "+66"],
+    },
+    (15, 17): {
+        "F": ["-44", "-48", "-52", "-57", "-63", "-70", "+70"],
+        "M": ["-46", "-50", "-55", "-60", "-66", "-73", "-81", "+81"],
+    },
+    (18, 20): {
+        "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
+        "M": ["-56", "-62", "-69", "-77", "-85", "-95", "+95"],
+    },
+    (21, 34): {
+        "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
+        "M": ["-56", "-62", "-69", "-77", "-85", "-95", "-105", "+105"],
+    },
+    (35, 100): {
+        "F": ["-48", "-52", "-57", "-63", "-70", "-78", "+78"],
+        "M": ["-56", "-62", "-69", "-77", "-85", "-95", "-105", "+105"],
+    },
+}
+
+PROBE_FARA_GREUTATE = ["Polydamas", "Palaismata"]
+
+
+def este_proba_fara_greutate(proba):
+    return any(p.lower() in proba.nume.lower() for p in PROBE_FARA_GREUTATE)
+
+
+def populate_categorii_standard(*probe):
+    """
+    Creează categoriile standard lipsă pentru probele date, cu un singur bulk_create.
+    """
+    existente = set(
+        Categorie.objects.filter(proba__in=probe).values_list(
+            "proba_id", "sex", "varsta_min", "varsta_max", "categorie_greutate"
+        )
+    )
+
+    noi = []
+    for proba in probe:
+        if este_proba_fara_greutate(proba):
+            chei = [("", varsta, None) for varsta in CATEGORII_STANDARD]
+        else:
+            chei = [
+                (sex, varsta, g)
+                for varsta, greutati_per_sex in CATEGORII_STANDARD.items()
+                for sex, greutati in greutati_per_sex.items()
+                for g in greutati
+            ]
+        for sex, (varsta_min, varsta_max), g in chei:
+            if (proba.id, sex, varsta_min, varsta_max, g) not in existente:
+                noi.append(Categorie(
+                    proba=proba,
+                    sex=sex,
+                    varsta_min=varsta_min,
+                    varsta_max=varsta_max,
+                    categorie_greutate=g,
+                ))
+
+    if noi:
+        creste_revizie('categorie')
+    return Categorie.objects.bulk_create(noi)
+
+
+class IndexCategorii:
+    """
+    Index în memorie pentru găsirea categoriei unui sportiv după
+    (probă, sex, vârstă, greutate), construit dintr-o singură interogare.
+    Intervalele de vârstă și limitele de greutate sunt căutate binar.
+    """
+
+    def __init__(self, categorii):
+        grupe = {}
+        for categorie in categorii:
+            # Probele fără greutate nu țin cont nici de sex
+            sex = None if este_proba_fara_greutate(categorie.proba) else categorie.sex
+            cheie = (categorie.proba_id, sex)
+            grupe.setdefault(cheie, {}).setdefault((categorie.varsta_min, categorie.varsta_max), []).append(categorie)
+
+        self._grupe = {}
+        for cheie, intervale in grupe.items():
+            ordonate = sorted(intervale.items())
+            self._grupe[cheie] = (
+                [varsta_min for (varsta_min, _), _ in ordonate],
+                [(varsta_max, _GrupaGreutate(lista)) for (_, varsta_max), lista in ordonate],
             )
-    else:
-        for age_range, greutati_per_sex in categorii_data.items():
-            for sex, greutati in greutati_per_sex.items():
-                for g in greutati:
-                    Categorie.objects.get_or_create(
-                        proba=proba,
-                        sex=sex,
-                        varsta_min=age_range[0],
-                        varsta_max=age_range[1],
-                        categorie_greutate=g,
-                    )
\ No newline at end of file
+
+    @classmethod
+    def pentru_probe(cls, probe):
+        return cls(Categorie.objects.filter(proba__in=probe).select_related("proba"))
+
+    @classmethod
+    def pentru_competitie(cls, competitie):
+        return cls.pentru_probe(competitie.probe.all())
+
+    def rezolva(self, proba, sex, varsta, greutate=None):
+        """
+        Categoria pentru sportiv sau None. `greutate` poate fi numele categoriei
+        ("-62", "+95") sau greutatea cântărită ("57.3", 57); în al doilea caz
+        sportivul intră în prima categorie a cărei limită nu o depășește.
+        """
+        fara_greutate = este_proba_fara_greutate(proba)
+        grupa = self._grupe.get((proba.id, None if fara_greutate else sex))
+        if grupa is None:
+            return None
+
+        varste_min, intervale = grupa
+        i = bisect_right(varste_min, varsta) - 1
+        if i < 0 or varsta > intervale[i][0]:
+            return None
+
+        categorii = intervale[i][1]
+        if fara_greutate:
+            return categorii.prima
+        return categorii.cauta(greutate)
+
+
+class _GrupaGreutate:
+    """
+    Categoriile de greutate ale unui interval de vârstă: "-X" ordonate după
+    limită, plus categoria deschisă "+X".
+    """
+
+    def __init__(self, categorii):
+        self.prima = categorii[0]
+        self.dupa_nume = {c.categorie_greutate: c for c in categorii}
+        limitate = sorted(
+            ((_greutate_numerica(c.categorie_greutate[1:]), c)
+             for c in categorii
+             if c.categorie_greutate and c.categorie_greutate.startswith("-")),
+            key=lambda pereche: pereche[0] if pereche[0] is not None else float("inf")
+        )
+        limitate = [(limita, c) for limita, c in limitate if limita is not None]
+        self.limite = [limita for limita, _ in limitate]
+        self.categorii_limitate = [c for _, c in limitate]
+        self.deschisa = next(
+            (c for c in categorii if c.categorie_greutate and c.categorie_greutate.startswith("+")), None
+        )
+
+    def cauta(self, greutate):
+        if greutate is None:
+            return None
+
+        kg = _greutate_numerica(greutate)
+        if kg is None:
+            return self.dupa_nume.get(str(greutate))
+
+        i = bisect_left(self.limite, kg)
+        if i < len(self.limite):
+            return self.categorii_limitate[i]
+        return self.deschisa
+
+
+def _greutate_numerica(greutate):
+    """
+    Greutatea cântărită ca număr, sau None dacă valoarea este numele unei categorii.
+    """
+    if isinstance(greutate, (int, float)):
+        return float(greutate)
+    valoare = str(greutate).strip()
+    if valoare.startswith(("-", "+")):
+        return None
+    try:
+        return float(valoare.replace(",", "."))
+    except ValueError:
+        return None
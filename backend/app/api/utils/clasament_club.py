@@ -26,41 +26,19 @@ class ClasamentClubCalculator:
         - loc 3: 1 pct
         """
         cluburi_puncte = defaultdict(int)
+        cluburi = {}
         
         # Grupăm clasamentele pe categorii pentru a determina câți sportivi sunt
         categorii_clasamente = defaultdict(list)
         for clasament in self.clasamente_proba:
-            categorie_key = (
-                clasament.categorie.id,
-                clasament.categorie.proba.nume,
-                clasament.categorie.sex,
-                clasament.categorie.categorie_greutate
-            )
-            categorii_clasamente[categorie_key].append(clasament)
+            categorii_clasamente[clasament.categorie_id].append((clasament.sportiv, clasament.puncte))
+            if clasament.sportiv.club:
+                cluburi[clasament.sportiv.club_id] = clasament.sportiv.club
         
         # Calcul puncte pentru fiecare categorie
-        for categorie_key, clasamente_categorie in categorii_clasamente.items():
-            clasamente_categorie.sort(key=lambda x: x.puncte)
-            nr_sportivi = len(clasamente_categorie)
-            
-            if nr_sportivi <= 1:
-                continue
-            elif nr_sportivi == 2:
-                for i, clasament in enumerate(clasamente_categorie):
-                    if clasament.sportiv.club:
-                        if i == 0:  # Locul 1
-                            cluburi_puncte[clasament.sportiv.club] += 3
-                        elif i == 1:  # Locul 2
-                            cluburi_puncte[clasament.sportiv.club] += 1
-            else:
-                for i, clasament in enumerate(clasamente_categorie):
-                    if clasament.sportiv.club:
-                        if i == 0:  # Locul 1
-                            cluburi_puncte[clasament.sportiv.club] += 5
-                        elif i == 1:  # Locul 2
-                            cluburi_puncte[clasament.sportiv.club] += 3
-                        elif i == 2:  # Locul 3
-                            cluburi_puncte[clasament.sportiv.club] += 1
+        for clasament_categorie in categorii_clasamente.values():
+            for club_id, puncte in puncte_cluburi_din_clasament(clasament_categorie).items():
+                cluburi_puncte[cluburi[club_id]] += puncte
         
         # Sortare cluburi după puncte (descrescător)
         cluburi_sortate = sorted(
@@ -87,17 +65,10 @@ class ClasamentClubCalculator:
         
         try:
             with transaction.atomic():
-                # Ștergem clasamentul existent pentru această competiție
-                ClasamentClub.objects.filter(competitie=self.competitie).delete()
-                
-                # Creăm noile înregistrări de clasament
-                for item in clasament:
-                    ClasamentClub.objects.create(
-                        competitie=self.competitie,
-                        club=item['club'],
-                        puncte=item['puncte']
-                    )
-                
+                aplica_clasament_cluburi(
+                    self.competitie.id,
+                    {item['club'].id: item['puncte'] for item in clasament}
+                )
                 logger.info(f"Clasament cluburi actualizat pentru {self.competitie.nume}: {len(clasament)} cluburi")
         
         except Exception as e:
@@ -118,4 +89,102 @@ def obtine_clasament_cluburi_pentru_competitie(competitie):
     Funcție helper pentru a obține clasamentul calculat pentru cluburi.
     """
     calculator = ClasamentClubCalculator(competitie)
-    return calculator.calculeaza_clasament_cluburi()
\ No newline at end of file
+    return calculator.calculeaza_clasament_cluburi()
+
+
+def puncte_cluburi_din_clasament(clasament):
+    """
+    Punctele aduse cluburilor de clasamentul unei categorii (listă de (sportiv, loc)),
+    ca dicționar {club_id: puncte}:
+    - loc 1: 5 pct (3 pct dacă doar 2 sportivi, 0 pct dacă doar 1 sportiv)
+    - loc 2: 3 pct (1 pct dacă doar 2 sportivi)
+    - loc 3: 1 pct
+    """
+    if len(clasament) <= 1:
+        return {}
+
+    puncte_pe_loc = [3, 1] if len(clasament) == 2 else [5, 3, 1]
+    ordonat = sorted(clasament, key=lambda x: x[1])
+
+    puncte = defaultdict(int)
+    for (sportiv, _), puncte_loc in zip(ordonat, puncte_pe_loc):
+        if sportiv.club_id:
+            puncte[sportiv.club_id] += puncte_loc
+    return puncte
+
+
+def delta_puncte_cluburi(clasament_vechi, clasament_nou):
+    """
+    Diferența de puncte pe cluburi când clasamentul unei categorii se schimbă.
+    """
+    delta = defaultdict(int)
+    for club_id, puncte in puncte_cluburi_din_clasament(clasament_nou).items():
+        delta[club_id] += puncte
+    for club_id, puncte in puncte_cluburi_din_clasament(clasament_vechi).items():
+        delta[club_id] -= puncte
+    return {club_id: d for club_id, d in delta.items() if d}
+
+
+def aplica_delta_cluburi(competitie_id, delta):
+    """
+    Aplică o diferență de puncte doar rândurilor ClasamentClub ale cluburilor afectate.
+    Competiția este blocată, deci finalizările simultane din categorii diferite
+    nu creează rânduri duble pentru același club.
+    """
+    if not delta:
+        return
+
+    list(Competitie.objects.select_for_update().filter(pk=competitie_id).values_list('id', flat=True))
+    existente = {
+        rand.club_id: rand
+        for rand in ClasamentClub.objects.filter(competitie_id=competitie_id, club_id__in=list(delta))
+    }
+    puncte_noi = {
+        club_id: (existente[club_id].puncte if club_id in existente else 0) + d
+        for club_id, d in delta.items()
+    }
+    _scrie_clasament_cluburi(competitie_id, existente, puncte_noi)
+
+
+def aplica_clasament_cluburi(competitie_id, puncte_cluburi):
+    """
+    Aduce clasamentul cluburilor unei competiții la `puncte_cluburi` ({club_id: puncte}),
+    scriind doar diferențele.
+    """
+    existente = {}
+    de_sters = []
+    for rand in ClasamentClub.objects.filter(competitie_id=competitie_id):
+        if rand.club_id in existente:
+            de_sters.append(rand.id)
+        else:
+            existente[rand.club_id] = rand
+
+    if de_sters:
+        ClasamentClub.objects.filter(id__in=de_sters).delete()
+
+    puncte_noi = {club_id: puncte_cluburi.get(club_id, 0) for club_id in existente}
+    puncte_noi.update(puncte_cluburi)
+    _scrie_clasament_cluburi(competitie_id, existente, puncte_noi)
+
+
+def _scrie_clasament_cluburi(competitie_id, existente, puncte_noi):
+    de_sters = []
+    de_actualizat = []
+    de_creat = []
+    for club_id, puncte in puncte_noi.items():
+        rand = existente.get(club_id)
+        if not puncte:
+            if rand:
+                de_sters.append(rand.id)
+        elif rand is None:
+            de_creat.append(ClasamentClub(competitie_id=competitie_id, club_id=club_id, puncte=puncte))
+        elif rand.puncte != puncte:
+            rand.puncte = puncte
+            de_actualizat.append(rand)
+
+    if de_sters:
+        ClasamentClub.objects.filter(id__in=de_sters).delete()
+    if de_actualizat:
+        ClasamentClub.objects.bulk_update(de_actualizat, ['puncte'])
+    if de_creat:
+        ClasamentClub.objects.bulk_create(de_creat)
@@ -1,241 +1,129 @@
-from collections import defaultdict
-from django.db import transaction
-from ..models import Meci, Sportiv, ClasamentProba
-import logging
+from ..models import ClasamentProba, Runda, RUNDE_BEST_OF_3, RUNDE_ROUND_ROBIN
 
-logger = logging.getLogger(__name__)
+# Singura sursă a clasamentului pe categorii: folosită incremental la finalizare
+# (signals.actualizeaza_clasamente) și la reconstruire (reconciliaza_clasamente).
+# Sunt clasați doar sportivii de pe locurile 1-4.
 
-class ClasamentProbaCalculator:
+def calculeaza_clasament_din_meciuri(meciuri, meci=None):
     """
-    Calculează clasamentul pentru o probă pe baza rezultatelor efective ale meciurilor.
+    Calculează în memorie clasamentul unei categorii din meciurile ei, ca listă de
+    (sportiv, loc). Dacă `meci` (meciul tocmai finalizat) nu poate schimba
+    clasamentul, întoarce None:
+    - Turnee de 2 persoane (best of 3): după finalizarea tuturor meciurilor
+    - Turnee de 3 persoane (round robin): după finalizarea tuturor meciurilor
+    - Turnee de 4+ persoane (knockout): după finală și locul 3
     """
-    
-    def __init__(self, competitie, categorie):
-        self.competitie = competitie
-        self.categorie = categorie
-        self.meciuri = Meci.objects.filter(
-            competitie=competitie,
-            categorie=categorie,
-            castigator__isnull=False  # Doar meciurile finalizate
-        )
-    
-    def calculeaza_clasament(self):
-        """
-        Calculează clasamentul complet pentru categoria dată.
-        """
-        tipul_competitie = self._determina_tipul_competitie()
-        
-        if tipul_competitie == 'turneu':
-            return self._calculeaza_clasament_turneu()
-        elif tipul_competitie == 'best_of_3':
-            return self._calculeaza_clasament_best_of_3()
-        elif tipul_competitie == 'round_robin':
-            return self._calculeaza_clasament_round_robin()
-        else:
-            logger.warning(f"Tip de competiție necunoscut pentru {self.categorie}")
-            return []
-    
-    def _determina_tipul_competitie(self):
-        """
-        Determină tipul de competiție pe baza rundelor existente.
-        """
-        runde = set(meci.runda for meci in self.meciuri)
-        
-        if any('Finala' in runda for runda in runde):
-            return 'turneu'
-        elif any('Best of 3' in runda for runda in runde):
-            return 'best_of_3'
-        elif any('Round Robin' in runda for runda in runde):
-            return 'round_robin'
-        else:
-            # Default la turneu dacă nu știm sigur
-            return 'turneu'
-    
-    def _calculeaza_clasament_turneu(self):
-        """
-        Pentru turnee: câștigătorul finalei este locul 1, 
-        finalistul învins este locul 2, etc.
-        """
-        clasament = []
-        
-        # Găsim finala
-        finala = self.meciuri.filter(runda__icontains='Finala').first()
-        if finala:
-            # Locul 1: Câștigătorul finalei
-            clasament.append({
-                'pozitie': 1,
-                'sportiv': finala.castigator,
-                'detalii': 'Câștigător finală'
-            })
-            
-            # Locul 2: Finalistul învins
-            finalist_invins = finala.sportiv2 if finala.castigator == finala.sportiv1 else finala.sportiv1
-            clasament.append({
-                'pozitie': 2,
-                'sportiv': finalist_invins,
-                'detalii': 'Finalist'
-            })
-        
-        # Semifinalištii (locurile 3-4)
-        semifinale = self.meciuri.filter(runda__icontains='Semifinala')
-        semifinalisti_invins = []
-        for semi in semifinale:
-            invins = semi.sportiv2 if semi.castigator == semi.sportiv1 else semi.sportiv1
-            if invins not in [item['sportiv'] for item in clasament]:
-                semifinalisti_invins.append(invins)
-        
-        for i, sportiv in enumerate(semifinalisti_invins):
-            clasament.append({
-                'pozitie': 3 + i,
-                'sportiv': sportiv,
-                'detalii': 'Semifinalist'
-            })
-        
-        # Sfertfinaliștii (locurile 5-8)
-        sferturi = self.meciuri.filter(runda__icontains='Sferturi')
-        sfertfinalisti_invins = []
-        for sferturi_meci in sferturi:
-            invins = sferturi_meci.sportiv2 if sferturi_meci.castigator == sferturi_meci.sportiv1 else sferturi_meci.sportiv1
-            if invins not in [item['sportiv'] for item in clasament]:
-                sfertfinalisti_invins.append(invins)
-        
-        for i, sportiv in enumerate(sfertfinalisti_invins):
-            clasament.append({
-                'pozitie': 5 + i,
-                'sportiv': sportiv,
-                'detalii': 'Sfertfinalist'
-            })
-        
-        # Optimi (locurile 9-16)
-        optimi = self.meciuri.filter(runda__icontains='Optimi')
-        optimisti_invins = []
-        for optimi_meci in optimi:
-            invins = optimi_meci.sportiv2 if optimi_meci.castigator == optimi_meci.sportiv1 else optimi_meci.sportiv1
-            if invins not in [item['sportiv'] for item in clasament]:
-                optimisti_invins.append(invins)
-        
-        for i, sportiv in enumerate(optimisti_invins):
-            clasament.append({
-                'pozitie': 9 + i,
-                'sportiv': sportiv,
-                'detalii': 'Optimi'
-            })
-        
-        return clasament
-    
-    def _calculeaza_clasament_best_of_3(self):
-        """
-        Pentru Best of 3: se numără victoriile pentru fiecare sportiv.
-        """
-        victorii_per_sportiv = defaultdict(int)
-        sportivi_participanti = set()
-        
-        for meci in self.meciuri:
-            sportivi_participanti.add(meci.sportiv1)
-            sportivi_participanti.add(meci.sportiv2)
-            victorii_per_sportiv[meci.castigator] += 1
-        
-        # Sortăm după numărul de victorii (descrescător)
-        sportivi_sortati = sorted(
-            sportivi_participanti,
-            key=lambda s: victorii_per_sportiv[s],
-            reverse=True
-        )
-        
-        clasament = []
-        for i, sportiv in enumerate(sportivi_sortati):
-            clasament.append({
-                'pozitie': i + 1,
-                'sportiv': sportiv,
-                'detalii': f'{victorii_per_sportiv[sportiv]} victorii'
-            })
-        
-        return clasament
-    
-    def _calculeaza_clasament_round_robin(self):
-        victorii_per_sportiv = defaultdict(int)
-        diferenta_puncte_per_sportiv = defaultdict(int)
-        sportivi_participanti = set()
-        
-        for meci in self.meciuri:
-            sportivi_participanti.add(meci.sportiv1)
-            sportivi_participanti.add(meci.sportiv2)
-            
-            victorii_per_sportiv[meci.castigator] += 1
-            
-            if meci.castigator == meci.sportiv1:
-                diferenta_puncte_per_sportiv[meci.sportiv1] += (meci.scor1 - meci.scor2)
-                diferenta_puncte_per_sportiv[meci.sportiv2] += (meci.scor2 - meci.scor1)
-            else:
-                diferenta_puncte_per_sportiv[meci.sportiv2] += (meci.scor2 - meci.scor1)
-                diferenta_puncte_per_sportiv[meci.sportiv1] += (meci.scor1 - meci.scor2)
-        
-        # Sortare după numărul de victorii, apoi după diferența de puncte
-        sportivi_sortati = sorted(
-            sportivi_participanti,
-            key=lambda s: (victorii_per_sportiv[s], diferenta_puncte_per_sportiv[s]),
-            reverse=True
-        )
-        
-        clasament = []
-        for i, sportiv in enumerate(sportivi_sortati):
-            clasament.append({
-                'pozitie': i + 1,
-                'sportiv': sportiv,
-                'detalii': f'{victorii_per_sportiv[sportiv]} victorii, +{diferenta_puncte_per_sportiv[sportiv]} diferență'
-            })
-        
-        return clasament
-    
-    def actualizeaza_clasament_in_baza_de_date(self):
-        """
-        Actualizează clasamentul în baza de date cu pozițiile calculate.
-        """
-        clasament = self.calculeaza_clasament()
-        
-        try:
-            with transaction.atomic():
-                # Ștergem clasamentul existent pentru această categorie
-                ClasamentProba.objects.filter(
-                    competitie=self.competitie,
-                    categorie=self.categorie
-                ).delete()
-                
-                # Creăm noile înregistrări de clasament
-                for item in clasament:
-                    ClasamentProba.objects.create(
-                        competitie=self.competitie,
-                        categorie=self.categorie,
-                        sportiv=item['sportiv'],
-                        puncte=item['pozitie']  # Folosim puncte pentru a stoca poziția
-                    )
-                
-                logger.info(f"Clasament actualizat pentru {self.categorie}: {len(clasament)} poziții")
-        
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea clasamentului pentru {self.categorie}: {e}")
-            raise
-
-
-def actualizeaza_clasament_dupa_meci(meci):
+    runde = {m.runda for m in meciuri}
+    meciuri_numerotate = [m for m in meciuri if m.runda in RUNDE_BEST_OF_3 + RUNDE_ROUND_ROBIN]
+
+    if len(meciuri_numerotate) == 3:
+        if any(m.castigator_id is None for m in meciuri):
+            return None if meci else []
+
+        sportivi = []
+        for m in meciuri:
+            for sportiv in (m.sportiv1, m.sportiv2):
+                if sportiv and sportiv not in sportivi:
+                    sportivi.append(sportiv)
+
+        if len(sportivi) == 2:
+            return _clasament_2_persoane(sportivi, meciuri)
+        if len(sportivi) == 3:
+            return _clasament_3_persoane(sportivi, meciuri)
+
+    elif Runda.FINALA in runde or Runda.SEMIFINALA in runde:
+        if meci and meci.runda not in (Runda.FINALA, Runda.LOCUL_3):
+            return None
+        return _clasament_eliminare_directa(meciuri)
+
+    return None if meci else []
+
+
+def aplica_clasament_categorie(competitie_id, categorie_id, clasament):
     """
-    Funcție helper pentru a actualiza clasamentul după finalizarea unui meci.
+    Aduce rândurile ClasamentProba ale unei categorii la `clasament` (listă de
+    (sportiv, loc)), scriind doar diferențele. Întoarce clasamentul anterior.
     """
-    calculator = ClasamentProbaCalculator(meci.competitie, meci.categorie)
-    calculator.actualizeaza_clasament_in_baza_de_date()
+    existente = list(ClasamentProba.objects.filter(
+        competitie_id=competitie_id,
+        categorie_id=categorie_id
+    ).select_related('sportiv'))
+    vechi = [(rand.sportiv, rand.puncte) for rand in existente]
+
+    noi = {sportiv.id: loc for sportiv, loc in clasament}
+    pe_sportiv = {}
+    de_sters = []
+    de_actualizat = []
+    for rand in existente:
+        if rand.sportiv_id in pe_sportiv or rand.sportiv_id not in noi:
+            de_sters.append(rand.id)
+            continue
+        pe_sportiv[rand.sportiv_id] = rand
+        if rand.puncte != noi[rand.sportiv_id]:
+            rand.puncte = noi[rand.sportiv_id]
+            de_actualizat.append(rand)
+
+    de_creat = [
+        ClasamentProba(competitie_id=competitie_id, categorie_id=categorie_id, sportiv=sportiv, puncte=loc)
+        for sportiv, loc in clasament
+        if sportiv.id not in pe_sportiv
+    ]
 
+    if de_sters:
+        ClasamentProba.objects.filter(id__in=de_sters).delete()
+    if de_actualizat:
+        ClasamentProba.objects.bulk_update(de_actualizat, ['puncte'])
+    if de_creat:
+        ClasamentProba.objects.bulk_create(de_creat)
 
-def actualizeaza_clasament_pentru_categorie(competitie, categorie):
+    return vechi
+
+
+def _clasament_2_persoane(sportivi, meciuri):
+    """
+    Turneu de 2 persoane (best of 3): ordonăm după numărul de victorii.
+    """
+    castiguri = {s: sum(1 for m in meciuri if m.castigator_id == s.id) for s in sportivi}
+    ordine = sorted(sportivi, key=lambda s: castiguri[s], reverse=True)
+    return [(sportiv, loc) for loc, sportiv in enumerate(ordine, 1)]
+
+
+def _clasament_3_persoane(sportivi, meciuri):
     """
-    Funcție helper pentru a actualiza clasamentul pentru o categorie specifică.
+    Turneu de 3 persoane (round robin), ordonat după:
+    1. numărul de victorii, 2. diferența de puncte, 3. punctele marcate.
     """
-    calculator = ClasamentProbaCalculator(competitie, categorie)
-    return calculator.actualizeaza_clasament_in_baza_de_date()
+    stats = {s.id: {'victorii': 0, 'puncte_marcate': 0, 'puncte_primite': 0} for s in sportivi}
+
+    for m in meciuri:
+        if m.sportiv1 and m.sportiv2 and m.castigator_id:
+            stats[m.castigator_id]['victorii'] += 1
+            stats[m.sportiv1_id]['puncte_marcate'] += m.scor1 or 0
+            stats[m.sportiv1_id]['puncte_primite'] += m.scor2 or 0
+            stats[m.sportiv2_id]['puncte_marcate'] += m.scor2 or 0
+            stats[m.sportiv2_id]['puncte_primite'] += m.scor1 or 0
+
+    ordine = sorted(
+        sportivi,
+        key=lambda s: (
+            stats[s.id]['victorii'],
+            stats[s.id]['puncte_marcate'] - stats[s.id]['puncte_primite'],
+            stats[s.id]['puncte_marcate']
+        ),
+        reverse=True
+    )
+    return [(sportiv, loc) for loc, sportiv in enumerate(ordine, 1)]
 
 
-def obtine_clasament_pentru_categorie(competitie, categorie):
+def _clasament_eliminare_directa(meciuri):
     """
-    Funcție helper pentru a obține clasamentul calculat pentru o categorie.
+    Locurile 1-2 din finală și 3-4 din meciul pentru locul 3 (doar cele jucate).
     """
-    calculator = ClasamentProbaCalculator(competitie, categorie)
-    return calculator.calculeaza_clasament()
\ No newline at end of file
+    clasament = []
+    for runda, loc in ((Runda.FINALA, 1), (Runda.LOCUL_3, 3)):
+        meci = next((m for m in meciuri if m.runda == runda and m.castigator_id), None)
+        if meci:
+            pierzator = meci.sportiv2 if meci.castigator_id == meci.sportiv1_id else meci.sportiv1
+            clasament.append((meci.castigator, loc))
+            clasament.append((pierzator, loc + 1))
+    return clasament
@@ -0,0 +1,200 @@
+from django.conf import settings
+from django.utils import timezone
+from ..models import ClipMeci
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import subprocess
+import tempfile
+import os
+
+# Înregistrarea unei saltele este scrisă în segmente MPEG-TS scurte, numite după
+# ora la care încep; cadrele cheie forțate permit tăierea fără re-encodare
+SECUNDE_SEGMENT = 10
+SECUNDE_CADRU_CHEIE = 2
+FORMAT_SEGMENT = "%Y%m%d_%H%M%S"
+EXTENSIE_SEGMENT = ".ts"
+
+
+class ClipIndisponibil(Exception):
+    pass
+
+
+def director_saltea(saltea):
+    return os.path.join(settings.INREGISTRARI_DIR, f"saltea_{saltea.id}")
+
+
+def director_clipuri():
+    return os.path.join(settings.INREGISTRARI_DIR, "clipuri")
+
+
+def argumente_segmente(director):
+    """Ieșirea ffmpeg a înregistrării: segmente de SECUNDE_SEGMENT secunde în `director`."""
+    return [
+        "-force_key_frames", f"expr:gte(t,n_forced*{SECUNDE_CADRU_CHEIE})",
+        "-f", "segment", "-segment_time", str(SECUNDE_SEGMENT), "-segment_format", "mpegts",
+        "-reset_timestamps", "1", "-strftime", "1",
+        os.path.join(director, FORMAT_SEGMENT + EXTENSIE_SEGMENT),
+    ]
+
+
+def _inceput_segment(nume):
+    try:
+        # ffmpeg numește segmentele în ora locală a serverului
+        return datetime.strptime(nume[:-len(EXTENSIE_SEGMENT)], FORMAT_SEGMENT).astimezone()
+    except ValueError:
+        return None
+
+
+def ultimul_segment(director):
+    """(nume, mărime) pentru segmentul scris acum, sau None."""
+    try:
+        with os.scandir(director) as intrari:
+            ultimul = max((i for i in intrari if i.name.endswith(EXTENSIE_SEGMENT)), key=lambda i: i.name, default=None)
+            return (ultimul.name, ultimul.stat().st_size) if ultimul else None
+    except OSError:
+        return None
+
+
+def segmente(director, de_la=None, pana_la=None):
+    """
+    Segmentele din `director` care acoperă intervalul [de_la, pana_la], ca
+    (cale, început), în ordine. Un segment ține până la începutul următorului;
+    începutul este cunoscut la secundă.
+    """
+    try:
+        nume = sorted(n for n in os.listdir(director) if n.endswith(EXTENSIE_SEGMENT))
+    except FileNotFoundError:
+        return []
+    toate = [(os.path.join(director, n), inceput) for n in nume if (inceput := _inceput_segment(n))]
+
+    rezultat = []
+    for i, (cale, inceput) in enumerate(toate):
+        if pana_la is not None and inceput >= pana_la:
+            break
+        sfarsit = toate[i + 1][1] if i + 1 < len(toate) else None
+        if de_la is not None and sfarsit is not None and sfarsit <= de_la:
+            continue
+        rezultat.append((cale, inceput))
+    return rezultat
+
+
+def taie_clip(parti, destinatie, de_la=0.0, durata=None):
+    """
+    Lipește segmentele `parti` într-un MP4 fără re-encodare (stream copy),
+    începând la `de_la` secunde de la începutul primului segment. Tăietura cade
+    pe cadrul cheie anterior, deci cel mult SECUNDE_CADRU_CHEIE mai devreme.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as lista:
+        for cale in parti:
+            cale = os.path.abspath(cale).replace("'", "'\\''")
+            lista.write(f"file '{cale}'\n")
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0"]
+    if de_la > 0:
+        cmd += ["-ss", f"{de_la:.2f}"]
+    cmd += ["-i", lista.name]
+    if durata is not None:
+        cmd += ["-t", f"{durata:.2f}"]
+    cmd += ["-c", "copy", "-movflags", "+faststart", "-f", "mp4", destinatie + ".partial"]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=300)
+        os.replace(destinatie + ".partial", destinatie)
+    except subprocess.CalledProcessError as e:
+        raise ClipIndisponibil(e.stderr.decode(errors="replace").strip() or f"ffmpeg a ieșit cu codul {e.returncode}")
+    finally:
+        os.unlink(lista.name)
+    return destinatie
+
+
+def taie_meci(clip, de_la=0.0, pana_la=None):
+    """
+    MP4-ul cu secundele [de_la, pana_la] ale meciului (implicit tot meciul).
+    Clipurile meciurilor încheiate sunt tăiate o singură dată.
+    """
+    start = clip.inceput + timedelta(seconds=de_la)
+    stop = clip.inceput + timedelta(seconds=pana_la) if pana_la is not None else clip.sfarsit
+    parti = segmente(clip.director, start, stop)
+    if not parti:
+        raise ClipIndisponibil(f"Înregistrarea clipului {clip.id} nu mai există.")
+
+    destinatie = os.path.join(director_clipuri(), f"clip_{clip.id}_{de_la:g}_{'final' if pana_la is None else f'{pana_la:g}'}.mp4")
+    if not os.path.exists(destinatie):
+        os.makedirs(director_clipuri(), exist_ok=True)
+        taie_clip(
+            [cale for cale, _ in parti], destinatie,
+            de_la=max(0.0, (start - parti[0][1]).total_seconds()), durata=(stop - start).total_seconds(),
+        )
+    return destinatie
+
+
+def clip_pentru_analiza(clip, ultimele=None):
+    """
+    Segmentele întregi care acoperă ultimele `ultimele` secunde ale meciului
+    (sau tot meciul), lipite fără re-encodare. Întoarce calea fișierului,
+    momentul în care începe și secunda din fișier de la care începe meciul
+    analizat.
+    """
+    sfarsit = clip.sfarsit or timezone.now()
+    start = clip.inceput
+    if ultimele:
+        start = max(start, sfarsit - timedelta(seconds=ultimele))
+    parti = segmente(clip.director, start, sfarsit)
+    if not parti:
+        raise ClipIndisponibil(f"Înregistrarea clipului {clip.id} nu mai există.")
+
+    os.makedirs(director_clipuri(), exist_ok=True)
+    destinatie = taie_clip([cale for cale, _ in parti], os.path.join(director_clipuri(), f"analiza_{clip.id}.mp4"))
+    return destinatie, parti[0][1], max(0.0, (start - parti[0][1]).total_seconds())
+
+
+def curata_inregistrari(ore, acum=None):
+    """
+    Retenția înregistrărilor: șterge segmentele terminate de cel puțin `ore`
+    ore care nu intră în intervalul niciunui ClipMeci și clipurile MP4 tăiate
+    mai vechi de `ore` ore (sunt refăcute din segmente la cerere). Segmentul
+    scris acum nu este atins. Întoarce (segmente șterse, clipuri șterse).
+    """
+    acum = acum or timezone.now()
+    limita = acum - timedelta(hours=ore)
+
+    try:
+        with os.scandir(settings.INREGISTRARI_DIR) as intrari:
+            directoare = [i.path for i in intrari if i.is_dir() and i.name.startswith("saltea_")]
+    except FileNotFoundError:
+        directoare = []
+
+    segmente_sterse = 0
+    for director in directoare:
+        # Clipurile ordonate după început, cu cel mai târziu sfârșit de până la fiecare
+        intervale = sorted(
+            (inceput, sfarsit or acum)
+            for inceput, sfarsit in ClipMeci.objects.filter(director=director).values_list('inceput', 'sfarsit')
+        )
+        inceputuri = [inceput for inceput, _ in intervale]
+        sfarsit_maxim = []
+        for _, sfarsit in intervale:
+            sfarsit_maxim.append(max(sfarsit, sfarsit_maxim[-1]) if sfarsit_maxim else sfarsit)
+
+        toate = segmente(director)
+        for (cale, inceput), (_, sfarsit) in zip(toate, toate[1:]):
+            if sfarsit > limita:
+                break
+            i = bisect_left(inceputuri, sfarsit)
+            if i and sfarsit_maxim[i - 1] > inceput:
+                continue
+            try:
+                os.unlink(cale)
+                segmente_sterse += 1
+            except FileNotFoundError:
+                pass
+
+    clipuri_sterse = 0
+    try:
+        with os.scandir(director_clipuri()) as intrari:
+            for intrare in intrari:
+                if intrare.is_file() and intrare.stat().st_mtime < limita.timestamp():
+                    os.unlink(intrare.path)
+                    clipuri_sterse += 1
+    except FileNotFoundError:
+        pass
+    return segmente_sterse, clipuri_sterse
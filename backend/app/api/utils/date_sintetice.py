@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+from django.db.models import F
+from ..models import Club, Sportiv, Proba, Categorie, Competitie, Inscriere, Saltea, Meci, ClasamentProba
+from .bracket_generation import genereaza_bracket_si_meciuri
+from .categorii import CATEGORII_STANDARD, PROBE_FARA_GREUTATE
+from .import_participanti import ANTET_SABLON
+import openpyxl
+import random
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+NUMAR_CLUBURI = 50
+NUMAR_SALTELE = 8
+
+PROBE_CAMPIONAT = ["Pankration Athlima", "Pankration Agon", "Palaismata"]
+
+# Ponderea fiecărei grupe de vârstă din CATEGORII_STANDARD într-un campionat național
+PONDERI_VARSTA = {
+    (6, 7): 6, (8, 9): 9, (10, 11): 13, (12, 14): 18, (15, 17): 18,
+    (18, 20): 14, (21, 34): 16, (35, 100): 6,
+}
+
+ORASE = [
+    "Bucuresti", "Cluj", "Iasi", "Timisoara", "Constanta", "Craiova", "Brasov", "Galati",
+    "Ploiesti", "Oradea", "Braila", "Arad", "Pitesti", "Sibiu", "Bacau", "Suceava",
+]
+NUME = [
+    "Popescu", "Ionescu", "Popa", "Pop", "Radu", "Dumitru", "Stan", "Stoica", "Gheorghe",
+    "Matei", "Ciobanu", "Rusu", "Munteanu", "Lazar", "Florea", "Constantin", "Marin", "Dinu",
+]
+PRENUME = {
+    "M": ["Andrei", "Alexandru", "Mihai", "Stefan", "David", "Matei", "Luca", "Ionut", "Vlad", "Darius"],
+    "F": ["Maria", "Ioana", "Elena", "Ana", "Andreea", "Sofia", "Daria", "Bianca", "Irina", "Alexia"],
+}
+
+
+def genereaza_competitie_sintetica(numar_meciuri, sportivi_pe_categorie=16, procent_disputate=0.5, seed=0):
+    """
+    Creează o competiție sintetică cu aproximativ `numar_meciuri` meciuri:
+    categorii de câte `sportivi_pe_categorie` sportivi, înscrieri și bracket-uri
+    generate ca la un import real. Din prima rundă, `procent_disputate` din
+    meciuri primesc câștigător; restul meciurilor nedisputate sunt repartizate
+    pe saltele, iar fiecare categorie primește un clasament parțial.
+    """
+    rng = random.Random(seed)
+    azi = date.today()
+
+    competitie = Competitie.objects.create(nume=f"Sintetic {numar_meciuri}", data_incepere=azi, data_sfarsit=azi)
+    proba = Proba.objects.create(nume="Sintetic")
+    competitie.probe.add(proba)
+
+    cluburi = Club.objects.bulk_create([Club(nume=f"Club sintetic {i}") for i in range(NUMAR_CLUBURI)])
+    numar_categorii = max(1, round(numar_meciuri / sportivi_pe_categorie))
+    categorii = Categorie.objects.bulk_create([
+        Categorie(
+            proba=proba, sex='M' if i % 2 else 'F', varsta_min=18, varsta_max=35,
+            categorie_greutate=f"-{40 + i}"
+        )
+        for i in range(numar_categorii)
+    ])
+
+    # CNP-uri care nu pot coincide cu cele reale (încep cu o literă)
+    sportivi = Sportiv.objects.bulk_create([
+        Sportiv(
+            nume="Sintetic", prenume=str(i), cnp=f"S{competitie.id:05d}{i:07d}",
+            club=rng.choice(cluburi), sex='M', data_nastere=date(2000, 1, 1)
+        )
+        for i in range(numar_categorii * sportivi_pe_categorie)
+    ], batch_size=5000)
+
+    Inscriere.objects.bulk_create([
+        Inscriere(sportiv=sportiv, categorie=categorii[i // sportivi_pe_categorie], competitie=competitie, varsta=25)
+        for i, sportiv in enumerate(sportivi)
+    ], batch_size=5000)
+
+    inscrieri = Inscriere.objects.filter(competitie=competitie).select_related('sportiv', 'categorie__proba')
+    genereaza_bracket_si_meciuri(inscrieri, competitie)
+
+    prima_runda = list(Meci.objects.filter(
+        competitie=competitie, sportiv1__isnull=False, sportiv2__isnull=False, next_meci__isnull=False
+    ).values_list('id', flat=True))
+    disputate = rng.sample(prima_runda, int(len(prima_runda) * procent_disputate))
+    for i in range(0, len(disputate), 500):
+        Meci.objects.filter(id__in=disputate[i:i + 500]).update(castigator=F('sportiv1'), scor1=3, scor2=1)
+
+    saltele = [
+        Saltea.objects.filter(numar=numar).first() or Saltea.objects.create(numar=numar)
+        for numar in range(1, NUMAR_SALTELE + 1)
+    ]
+    nedisputate = list(Meci.objects.filter(competitie=competitie, castigator__isnull=True).order_by('id').values_list('id', flat=True))
+    # Ordinea pe saltea urmează id-ul; UPDATE-uri pe bucăți, mult mai rapide decât bulk_update
+    for numar, saltea in enumerate(saltele):
+        ids = nedisputate[numar::NUMAR_SALTELE]
+        for i in range(0, len(ids), 500):
+            Meci.objects.filter(id__in=ids[i:i + 500]).update(saltea=saltea, ordine=F('id'))
+
+    ClasamentProba.objects.bulk_create([
+        ClasamentProba(
+            competitie=competitie, categorie=categorii[i // sportivi_pe_categorie],
+            sportiv=sportiv, puncte=i % sportivi_pe_categorie + 1
+        )
+        for i, sportiv in enumerate(sportivi)
+        if i % sportivi_pe_categorie < 4
+    ], batch_size=5000)
+
+    logger.info(
+        f"Competitie sintetica {competitie.id}: {numar_categorii} categorii, {len(sportivi)} sportivi, "
+        f"{Meci.objects.filter(competitie=competitie).count()} meciuri"
+    )
+    return competitie
+
+
+def genereaza_participanti(numar_sportivi, numar_cluburi, probe, data_competitie, seed=0):
+    """
+    Rândurile (fără antet) unui fișier de înscriere pentru un campionat național
+    sintetic, identice pentru același `seed`. Vârstele și greutățile acoperă toate
+    grupele din CATEGORII_STANDARD; o parte din sportivi concurează la două probe,
+    iar unii au doar greutatea cântărită (coloana KG), fără categorie aleasă.
+    """
+    rng = random.Random(seed)
+    cluburi = [f"CS {rng.choice(ORASE)} {i + 1}" for i in range(numar_cluburi)]
+    # Câteva cluburi mari și multe cluburi mici
+    ponderi_cluburi = [1 / (i + 1) ** 0.7 for i in range(numar_cluburi)]
+    grupe = list(PONDERI_VARSTA)
+
+    randuri = []
+    for i in range(numar_sportivi):
+        sex = rng.choice("MMMF")
+        varsta_min, varsta_max = rng.choices(grupe, weights=PONDERI_VARSTA.values())[0]
+        varsta = rng.randint(varsta_min, min(varsta_max, 45))
+        # import-ul calculează vârsta ca zile // 365
+        data_nastere = data_competitie - timedelta(days=varsta * 365 + rng.randint(10, 300))
+
+        limite = CATEGORII_STANDARD[(varsta_min, varsta_max)][sex]
+        categorie_greutate = rng.choice(limite)
+        limita = int(categorie_greutate[1:])
+        kg = limita + rng.randint(1, 15) if categorie_greutate.startswith("+") else limita - rng.randint(0, 2)
+
+        cnp = f"{(5 if data_nastere.year >= 2000 else 1) + (sex == 'F')}{data_nastere:%y%m%d}{i:06d}"
+        numar_probe = 2 if len(probe) > 1 and rng.random() < 0.25 else 1
+        for proba in rng.sample(probe, numar_probe):
+            fara_greutate = any(p.lower() in proba.lower() for p in PROBE_FARA_GREUTATE)
+            cantarit = not fara_greutate and rng.random() < 0.2
+            randuri.append([
+                f"L{i:06d}",
+                f"{rng.choice(NUME)} {rng.choice(PRENUME[sex])}",
+                rng.choices(cluburi, weights=ponderi_cluburi)[0],
+                "Masculin" if sex == "M" else "Feminin",
+                cnp,
+                data_nastere.strftime("%d.%m.%Y"),
+                f"{varsta_min}-{varsta_max}",
+                None if fara_greutate else kg,
+                None if fara_greutate or cantarit else f"{categorie_greutate} KG",
+                proba,
+                None,
+                100,
+            ])
+    return randuri
+
+
+def fisier_participanti(randuri):
+    """
+    Fișierul Excel de înscriere (antetul șablonului + rândurile), în memorie.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sportivi")
+    ws.append(ANTET_SABLON)
+    for rand in randuri:
+        ws.append(rand)
+    fisier = io.BytesIO()
+    wb.save(fisier)
+    fisier.seek(0)
+    return fisier
@@ -0,0 +1,140 @@
+from collections import defaultdict
+from django.db import transaction
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+MARIME_COADA = 200
+
+
+class Abonament:
+    """
+    Coada de evenimente a unui client conectat, legată de bucla asyncio în
+    care a fost creată. Evenimentele pot fi publicate din orice fir.
+    """
+
+    def __init__(self, competitie_id, categorie_id=None, marime_coada=MARIME_COADA):
+        self.competitie_id = competitie_id
+        self.categorie_id = categorie_id
+        self.coada = asyncio.Queue(maxsize=marime_coada)
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    def accepta(self, eveniment):
+        return self.categorie_id is None or eveniment.get('categorie') in (None, self.categorie_id)
+
+    def trimite(self, eveniment):
+        if self._loop is None:
+            self._pune(eveniment)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._pune, eveniment)
+
+    def _pune(self, eveniment):
+        if self.coada.full():
+            # Clientul nu ține pasul: renunțăm la delte și îi cerem să reîncarce starea
+            while not self.coada.empty():
+                self.coada.get_nowait()
+            eveniment = {'tip': 'resync', 'competitie': self.competitie_id}
+        self.coada.put_nowait(eveniment)
+
+    async def urmatorul(self, timeout=None):
+        return await asyncio.wait_for(self.coada.get(), timeout)
+
+
+class Broadcaster:
+    """
+    Distribuie evenimentele unei competiții abonaților din procesul curent.
+    Cu mai multe procese de server, fiecare proces își servește doar propriii
+    abonați, deci fluxul trebuie servit de un singur proces ASGI.
+    """
+
+    def __init__(self):
+        self._lacat = threading.Lock()
+        self._abonati = defaultdict(set)
+
+    def aboneaza(self, competitie_id, categorie_id=None):
+        abonament = Abonament(competitie_id, categorie_id)
+        with self._lacat:
+            self._abonati[competitie_id].add(abonament)
+        return abonament
+
+    def dezaboneaza(self, abonament):
+        with self._lacat:
+            abonati = self._abonati.get(abonament.competitie_id)
+            if abonati is not None:
+                abonati.discard(abonament)
+                if not abonati:
+                    del self._abonati[abonament.competitie_id]
+
+    def numar_abonati(self, competitie_id):
+        with self._lacat:
+            return len(self._abonati.get(competitie_id, ()))
+
+    def publica(self, eveniment):
+        with self._lacat:
+            abonati = list(self._abonati.get(eveniment['competitie'], ()))
+        for abonament in abonati:
+            if abonament.accepta(eveniment):
+                abonament.trimite(eveniment)
+
+
+broadcaster = Broadcaster()
+
+
+def publica_dupa_commit(*evenimente):
+    """
+    Publică evenimentele doar după commit, ca niciun client să nu vadă
+    o stare anulată de rollback.
+    """
+    if evenimente:
+        transaction.on_commit(lambda: [broadcaster.publica(e) for e in evenimente])
+
+
+def eveniment_meci(meci):
+    """
+    Delta compactă pentru un meci: doar câmpurile care se schimbă în timpul competiției.
+    """
+    return {
+        'tip': 'meci',
+        'competitie': meci.competitie_id,
+        'categorie': meci.categorie_id,
+        'meci': {
+            'id': meci.id,
+            'sportiv1': meci.sportiv1_id,
+            'sportiv2': meci.sportiv2_id,
+            'scor1': meci.scor1,
+            'scor2': meci.scor2,
+            'castigator': meci.castigator_id,
+            'diferenta_activata': meci.diferenta_activata,
+            'castigator_video': meci.castigator_video,
+        },
+    }
+
+
+def eveniment_bracket(competitie_id, categorie_id):
+    """
+    Bracket-ul categoriei a fost refăcut; clienții îl reîncarcă.
+    """
+    return {'tip': 'bracket', 'competitie': competitie_id, 'categorie': categorie_id}
+
+
+def evenimente_program(competitie_id, meciuri):
+    """
+    Câte un eveniment pe categorie cu noile saltele, ordini și ore ale meciurilor.
+    """
+    pe_categorii = defaultdict(list)
+    for meci in meciuri:
+        pe_categorii[meci.categorie_id].append({
+            'id': meci.id,
+            'saltea': meci.saltea_id,
+            'ordine': meci.ordine,
+            'ora_programata': meci.ora_programata.isoformat() if meci.ora_programata else None,
+        })
+    return [
+        {'tip': 'program', 'competitie': competitie_id, 'categorie': categorie_id, 'meciuri': lista}
+        for categorie_id, lista in pe_categorii.items()
+    ]
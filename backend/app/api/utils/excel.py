@@ -0,0 +1,88 @@
+from django.http import FileResponse
+from django.utils.http import quote
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+import tempfile
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+INALTIME_RAND = 25
+MARIME_BUCATA = 64 * 1024
+
+_SUBTIRE = Side(style='thin')
+_FARA = Side(style=None)
+_CENTRU = Alignment(horizontal='center', vertical='center')
+_ROSU = "FF0000"
+
+# Stilurile partajate; fiecare celulă primește doar numele stilului, nu obiecte Font/Border proprii
+STILURI = {
+    'antet': dict(font=Font(bold=True, name="Calibri"), border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_SUBTIRE, bottom=_SUBTIRE)),
+    'date': dict(font=Font(name="Calibri"), border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_SUBTIRE, bottom=_SUBTIRE)),
+    'mesaj': dict(font=Font(italic=True, name="Calibri")),
+    'titlu_statistici': dict(
+        font=Font(bold=True, italic=True, name="Calibri", color=_ROSU), alignment=_CENTRU,
+        border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_SUBTIRE, bottom=_SUBTIRE)
+    ),
+    # Grupurile de câte 3 rânduri din statistici: chenar sus, pe laterale și jos
+    'statistici_sus': dict(font=Font(bold=True, name="Calibri"), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_SUBTIRE, bottom=_FARA)),
+    'statistici_sus_rosu': dict(font=Font(bold=True, name="Calibri", color=_ROSU), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_SUBTIRE, bottom=_FARA)),
+    'statistici_mijloc': dict(font=Font(bold=True, name="Calibri"), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_FARA, bottom=_FARA)),
+    'statistici_mijloc_rosu': dict(font=Font(bold=True, name="Calibri", color=_ROSU), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_FARA, bottom=_FARA)),
+    'statistici_jos': dict(font=Font(bold=True, name="Calibri"), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_FARA, bottom=_SUBTIRE)),
+    'statistici_jos_rosu': dict(font=Font(bold=True, name="Calibri", color=_ROSU), alignment=_CENTRU, border=Border(left=_SUBTIRE, right=_SUBTIRE, top=_FARA, bottom=_SUBTIRE)),
+}
+
+
+def creeaza_workbook():
+    """
+    Workbook în modul write_only, cu stilurile din STILURI înregistrate o singură dată.
+    Rândurile adăugate sunt scrise imediat pe disc, deci memoria nu crește cu numărul lor.
+    """
+    wb = Workbook(write_only=True)
+    for nume, atribute in STILURI.items():
+        wb.add_named_style(NamedStyle(name=nume, **atribute))
+    return wb
+
+
+def adauga_foaie(wb, titlu, headere, latimi, stil_antet='antet'):
+    """
+    Creează o foaie cu lățimile de coloană date și scrie rândul de antet.
+    Lățimile și înălțimea rândurilor trebuie fixate înainte de primul rând scris.
+    """
+    ws = wb.create_sheet(title=titlu)
+    for i, latime in enumerate(latimi, start=1):
+        if latime:
+            ws.column_dimensions[get_column_letter(i)].width = latime
+    ws.sheet_format.defaultRowHeight = INALTIME_RAND
+    ws.sheet_format.customHeight = True
+
+    ws.append(rand(ws, headere, stil_antet))
+    return ws
+
+
+def celula(ws, valoare, stil):
+    cell = WriteOnlyCell(ws, value=valoare)
+    cell.style = stil
+    return cell
+
+
+def rand(ws, valori, stil):
+    return [celula(ws, valoare, stil) for valoare in valori]
+
+
+def raspuns_excel(wb, filename):
+    """
+    Salvează workbook-ul într-un fișier temporar și îl trimite în bucăți.
+    Arhiva xlsx se poate închide doar după ce toate foile sunt complete, așa că
+    fișierul temporar ține locul bufferului din memorie.
+    """
+    fisier = tempfile.TemporaryFile()
+    wb.save(fisier)
+    fisier.seek(0)
+
+    response = FileResponse(fisier, content_type=XLSX_CONTENT_TYPE)
+    # Frontend-ul citește numele din forma filename*=UTF-8''...
+    response["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response.block_size = MARIME_BUCATA
+    return response
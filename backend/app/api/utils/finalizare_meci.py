@@ -0,0 +1,205 @@
+from django.db import OperationalError, connection, transaction
+from django.db.models import Subquery
+from django.http import Http404
+from ..models import Meci, Runda
+from ..signals import meci_finalizat
+from .bracket_generation import slot_in_meciul_urmator
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# De câte ori este reluată finalizarea când rândurile categoriei sunt blocate
+# de o altă tranzacție care nu a putut fi așteptată (de exemplu SQLite)
+INCERCARI_BLOCARE = 8
+
+
+class FinalizareInvalida(Exception):
+    """
+    Meciul nu poate fi finalizat cu datele primite.
+    """
+
+    def __init__(self, error, message):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+
+
+class MeciOcupat(Exception):
+    """
+    Categoria meciului a rămas blocată de alte finalizări după toate reîncercările.
+    """
+
+
+def _este_blocare(eroare):
+    mesaj = str(eroare).lower()
+    return any(text in mesaj for text in ('locked', 'deadlock', 'could not obtain lock', 'could not serialize'))
+
+
+class FinalizareMeci:
+    """
+    Finalizează un meci cu un număr constant de interogări:
+    meciurile categoriei sunt blocate și încărcate o singură dată, avansarea este
+    calculată în memorie, iar modificările sunt scrise în bloc. Clasamentele sunt
+    actualizate de receptorii evenimentului `meci_finalizat`, în aceeași tranzacție.
+    """
+
+    def __init__(self, meci_id):
+        self.meci_id = meci_id
+        self.numar_interogari = 0
+        self.meci = None
+        self.meciuri_modificate = []
+
+    def executa(self, scor1, scor2, castigator_id, diferenta_activata):
+        """
+        Rulează finalizarea într-o tranzacție nouă, reluată când baza de date
+        refuză blocarea (SQLite întoarce imediat "database is locked" când două
+        tranzacții vor să scrie; PostgreSQL poate raporta un deadlock). Reluarea
+        citește din nou meciurile, deci vede finalizarea care a câștigat.
+        """
+        for incercare in range(1, INCERCARI_BLOCARE + 1):
+            self.meciuri_modificate = []
+            try:
+                return self._executa(scor1, scor2, castigator_id, diferenta_activata)
+            except OperationalError as e:
+                # Într-o tranzacție exterioară reluarea nu este posibilă
+                if not _este_blocare(e) or connection.in_atomic_block:
+                    raise
+                if incercare == INCERCARI_BLOCARE:
+                    raise MeciOcupat(str(e)) from e
+                logger.info(f"Meciul {self.meci_id}: categorie blocată ({e}), reîncercarea {incercare}")
+                time.sleep(random.uniform(0, 0.02 * 2 ** incercare))
+
+    def _executa(self, scor1, scor2, castigator_id, diferenta_activata):
+        with connection.execute_wrapper(self._numara_interogari), transaction.atomic():
+            meciuri = self._incarca_meciuri_categorie()
+            meci = self.meci = meciuri[self.meci_id]
+
+            castigator, pierzator = self._valideaza(meci, scor1, scor2, castigator_id)
+
+            # Actualizăm meciul
+            meci.scor1 = int(scor1)
+            meci.scor2 = int(scor2)
+            meci.castigator = castigator
+            meci.diferenta_activata = diferenta_activata
+            modificate = [meci]
+
+            logger.info(f"Meci finalizat: {meci} - Scor: {scor1}-{scor2} - Câștigător: {castigator}")
+
+            # Gestionăm avansarea în bracket
+            self.meciuri_modificate = self._avanseaza(meci, castigator, pierzator, meciuri)
+            modificate.extend(self.meciuri_modificate)
+
+            Meci.objects.bulk_update(
+                modificate,
+                ['scor1', 'scor2', 'castigator', 'diferenta_activata', 'sportiv1', 'sportiv2']
+            )
+
+            # Evenimentul de domeniu actualizează incremental clasamentele
+            meci_finalizat.send(
+                sender=self.__class__, meci=meci, meciuri=list(meciuri.values()), modificate=modificate
+            )
+
+        return meci
+
+    def _numara_interogari(self, execute, sql, params, many, context):
+        self.numar_interogari += 1
+        return execute(sql, params, many, context)
+
+    def _incarca_meciuri_categorie(self):
+        """
+        Blochează și încarcă, într-o singură interogare, toate meciurile din
+        categoria meciului (inclusiv meciul următor și meciul pentru locul 3).
+        Rândurile sunt blocate în ordinea id-urilor, deci două finalizări simultane
+        din aceeași categorie se serializează fără deadlock, iar a doua vede
+        locurile deja completate de prima.
+        """
+        meci_cautat = Meci.objects.filter(pk=self.meci_id)
+        meciuri = Meci.objects.select_for_update(of=('self',)).select_related(
+            'sportiv1', 'sportiv2', 'castigator'
+        ).filter(
+            competitie_id=Subquery(meci_cautat.values('competitie_id')[:1]),
+            categorie_id=Subquery(meci_cautat.values('categorie_id')[:1]),
+        ).order_by('id')
+
+        meciuri = {m.id: m for m in meciuri}
+        if self.meci_id not in meciuri:
+            raise Http404("Meciul nu există.")
+        return meciuri
+
+    def _valideaza(self, meci, scor1, scor2, castigator_id):
+        # Validăm că meciul nu este deja finalizat
+        if meci.castigator_id is not None:
+            raise FinalizareInvalida(
+                'Meciul este deja finalizat',
+                f'Meciul a fost câștigat de {meci.castigator}'
+            )
+
+        # Validăm că ambii sportivi sunt prezenți
+        if not meci.sportiv1 or not meci.sportiv2:
+            raise FinalizareInvalida(
+                'Meciul nu poate fi finalizat',
+                'Lipsesc sportivii pentru acest meci'
+            )
+
+        try:
+            int(scor1)
+            int(scor2)
+        except (TypeError, ValueError):
+            raise FinalizareInvalida('Scor invalid', 'Scorurile trebuie să fie numere întregi')
+
+        castigator = None
+        pierzator = None
+        if castigator_id:
+            if castigator_id == meci.sportiv1.id:
+                castigator = meci.sportiv1
+                pierzator = meci.sportiv2
+            elif castigator_id == meci.sportiv2.id:
+                castigator = meci.sportiv2
+                pierzator = meci.sportiv1
+            else:
+                raise FinalizareInvalida(
+                    'Câștigător invalid',
+                    'Câștigătorul specificat nu participă la acest meci'
+                )
+        return castigator, pierzator
+
+    def _avanseaza(self, meci, castigator, pierzator, meciuri):
+        """
+        Câștigătorul urmează next_meci în locul său fix; după o semifinală,
+        pierzătorul intră în meciul pentru locul 3. Totul în memorie.
+        """
+        if not castigator:
+            return []
+
+        modificate = []
+
+        next_meci = meciuri.get(meci.next_meci_id)
+        if next_meci:
+            _ocupa_slot(next_meci, slot_in_meciul_urmator(meci), castigator)
+            modificate.append(next_meci)
+
+        if meci.runda == Runda.SEMIFINALA:
+            meci_loc3 = next((m for m in meciuri.values() if m.runda == Runda.LOCUL_3), None)
+            if meci_loc3:
+                _ocupa_slot(meci_loc3, slot_in_meciul_urmator(meci), pierzator)
+                modificate.append(meci_loc3)
+
+        for m in modificate:
+            logger.info(f"Sportiv avansat în meciul {m.id} ({m.runda})")
+        return modificate
+
+
+def _ocupa_slot(meci, slot, sportiv):
+    """
+    Scrie sportivul în locul fix din meciul țintă. Locul poate fi gol sau deja
+    ocupat de același sportiv; altfel bracket-ul ar fi corupt.
+    """
+    ocupant_id = getattr(meci, f'{slot}_id')
+    if ocupant_id is not None and ocupant_id != sportiv.id:
+        raise FinalizareInvalida(
+            'Bracket inconsistent',
+            f'Locul {slot} din meciul {meci.id} este deja ocupat'
+        )
+    setattr(meci, slot, sportiv)
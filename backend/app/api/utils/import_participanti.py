@@ -0,0 +1,351 @@
+from datetime import date, datetime
+from django.db import transaction
+from django.utils import timezone
+from ..models import Club, Sportiv, Proba, Categorie, Inscriere, JobImport
+from .bracket_generation import genereaza_bracket_si_meciuri
+from .categorii import IndexCategorii, populate_categorii_standard
+from .programare import replanifica_competitie
+from .revizii import creste_revizie
+import openpyxl
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLOANE = {
+    "nr_leg": "NR LEG",
+    "nume_si_prenume": "NUME SI PRENUME",
+    "club": "CLUB",
+    "gen": "GEN",
+    "cnp": "CNP",
+    "data_nasterii": "DATA NASTERII",
+    "cat_kg": "CATEGORIE KG",
+    "proba": "PROBA",
+    "meci_demonstrativ": "MECI",
+}
+
+# Coloane care pot lipsi din fișier (exportul nu are greutatea cântărită)
+COLOANE_OPTIONALE = {
+    "kg": "KG",
+}
+
+# Antetul șablonului de înscriere completat de cluburi
+ANTET_SABLON = [
+    "NR LEG", "NUME SI PRENUME", "CLUB", "GEN", "CNP", "DATA NASTERII",
+    "CATEGORIE VARSTA", "KG", "CATEGORIE KG", "PROBA", "MECI", "TAXA",
+]
+
+
+def proceseaza_job_import(job_id):
+    """
+    Rulează un JobImport în fundal: importul rândurilor, apoi regenerarea
+    bracket-urilor. Progresul este scris pe rândul jobului după fiecare etapă.
+    """
+    # Jobul este preluat o singură dată, chiar dacă este trimis de mai multe ori
+    if not JobImport.objects.filter(id=job_id, status='in_asteptare').update(
+        status='in_lucru', data_start=timezone.now()
+    ):
+        return
+
+    job = JobImport.objects.select_related('competitie').get(id=job_id)
+    actualizeaza = JobImport.objects.filter(id=job_id).update
+
+    try:
+        rezultat = ImportParticipanti(job.competitie, progres=actualizeaza).executa(io.BytesIO(job.fisier))
+        actualizeaza(erori=rezultat.errors)
+
+        inscrieri = Inscriere.objects.filter(competitie=job.competitie).select_related("sportiv", "categorie__proba", "sportiv__club")
+        # Doar categoriile cu alți sportivi și fără meciuri disputate sunt refăcute
+        raport = genereaza_bracket_si_meciuri(inscrieri, job.competitie, doar_modificate=True)
+        if raport['regenerate']:
+            replanifica_competitie(job.competitie_id)
+
+        actualizeaza(
+            status='finalizat',
+            categorii_regenerate=len(raport['regenerate']),
+            brackets=raport,
+            mesaj=f"{rezultat.added_count} inscrieri adaugate",
+            fisier=b'',
+            data_sfarsit=timezone.now(),
+        )
+    except ImportInvalid as e:
+        actualizeaza(status='esuat', mesaj=str(e), fisier=b'', data_sfarsit=timezone.now())
+    except Exception as e:
+        logger.exception(f"Importul {job_id} a esuat")
+        actualizeaza(status='esuat', mesaj=f"Eroare la import: {str(e)}", data_sfarsit=timezone.now())
+
+
+class ImportInvalid(Exception):
+    """
+    Fișierul nu poate fi importat deloc (format sau antet greșit).
+    """
+
+
+class ImportParticipanti:
+    """
+    Importă lista de participanți în etape, cu un număr de interogări care nu
+    depinde de numărul de rânduri:
+    1. citirea foii (read_only) și validarea fiecărui rând în memorie;
+    2. încărcarea cluburilor, sportivilor și probelor existente prin câteva
+       interogări IN, iar categoriile sunt găsite în IndexCategorii;
+    3. scrierea rândurilor noi cu bulk_create, într-o singură tranzacție.
+    Rândurile respinse sunt raportate în `errors`, cu numărul rândului din Excel.
+    """
+
+    def __init__(self, competitie, progres=None):
+        self.competitie = competitie
+        self.progres = progres
+        self.erori = []
+        self.randuri_citite = 0
+        self.added_count = 0
+        self.existing_count = 0
+
+    def executa(self, file_obj):
+        randuri = self._citeste(file_obj)
+        if self.progres:
+            self.progres(randuri_citite=self.randuri_citite, randuri_respinse=len(self.erori))
+
+        with transaction.atomic():
+            cluburi, probe = self._incarca_cluburi_si_probe(randuri)
+            inscrieri = self._rezolva_categorii(randuri, probe)
+            sportivi = self._incarca_sportivi(inscrieri, cluburi)
+            self._scrie_inscrieri(inscrieri, sportivi)
+            # Scrierile în bloc nu trimit post_save
+            creste_revizie('club', 'proba', 'sportiv', 'inscriere', f"competitie:{self.competitie.id}")
+
+        logger.info(
+            f"Import competitia {self.competitie.id}: {self.added_count} adaugate, "
+            f"{self.existing_count} existente, {len(self.erori)} erori"
+        )
+        if self.progres:
+            self.progres(
+                randuri_adaugate=self.added_count,
+                randuri_existente=self.existing_count,
+                randuri_respinse=len(self.erori),
+            )
+        return self
+
+    @property
+    def errors(self):
+        return [f"Randul {idx}: {mesaj}" for idx, mesaj in sorted(self.erori)]
+
+    def _eroare(self, idx, mesaj):
+        self.erori.append((idx, mesaj))
+
+    # ---------- Etapa 1: citire și validare în memorie ----------
+
+    def _citeste(self, file_obj):
+        try:
+            wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+            ws = wb.active
+            randuri_excel = ws.iter_rows(values_only=True)
+            header = list(next(randuri_excel, ()))
+        except Exception as e:
+            raise ImportInvalid(f"Fisier Excel invalid: {str(e)}")
+
+        try:
+            coloane = {cheie: header.index(nume) for cheie, nume in COLOANE.items()}
+        except ValueError as e:
+            wb.close()
+            raise ImportInvalid(f"Header lipsa: {str(e)}")
+        coloane.update({cheie: header.index(nume) for cheie, nume in COLOANE_OPTIONALE.items() if nume in header})
+
+        randuri = []
+        vazute = set()
+        for idx, row in enumerate(randuri_excel, start=2):
+            if not row or all(cell is None for cell in row):
+                continue
+            self.randuri_citite += 1
+            valori = dict.fromkeys(COLOANE_OPTIONALE)
+            valori.update({cheie: row[col] if col < len(row) else None for cheie, col in coloane.items()})
+            rand = self._valideaza_rand(idx, valori)
+            if rand is None:
+                continue
+
+            cheie = (rand["cnp"], rand["proba"], rand["cat_kg"])
+            if cheie in vazute:
+                self._eroare(idx, f"Sportivul cu CNP {rand['cnp']} apare de mai multe ori in aceeasi categorie")
+                continue
+            vazute.add(cheie)
+            randuri.append(rand)
+
+        wb.close()
+        return randuri
+
+    def _valideaza_rand(self, idx, valori):
+        try:
+            nume, prenume = str(valori["nume_si_prenume"]).strip().split(" ", 1)
+        except ValueError:
+            self._eroare(idx, "Numele si prenumele trebuie separate printr-un spatiu")
+            return None
+
+        sex = valori["gen"]
+        if sex == "Masculin":
+            sex = "M"
+        elif sex == "Feminin":
+            sex = "F"
+
+        obligatorii = {
+            "NR LEG": valori["nr_leg"],
+            "CLUB": valori["club"],
+            "GEN": sex,
+            "CNP": valori["cnp"],
+            "DATA NASTERII": valori["data_nasterii"],
+            "PROBA": valori["proba"],
+        }
+        lipsa = [coloana for coloana, valoare in obligatorii.items() if valoare in (None, "")]
+        if lipsa:
+            self._eroare(idx, f"Campuri lipsa: {', '.join(lipsa)}")
+            return None
+
+        data_nastere = _parseaza_data(valori["data_nasterii"])
+        if data_nastere is None:
+            self._eroare(idx, f"Data nasterii invalida: {valori['data_nasterii']} (format asteptat ZZ.LL.AAAA)")
+            return None
+
+        cnp = str(valori["cnp"]).strip()
+        if len(cnp) != 13:
+            self._eroare(idx, f"CNP invalid: {cnp}")
+            return None
+
+        return {
+            "idx": idx,
+            "nr_leg": str(valori["nr_leg"]).strip(),
+            "nume": nume.strip(),
+            "prenume": prenume.strip(),
+            "club": str(valori["club"]).strip(),
+            "sex": sex,
+            "cnp": cnp,
+            "data_nastere": data_nastere,
+            "varsta": (self.competitie.data_incepere - data_nastere).days // 365,
+            # Fără categorie aleasă, sportivul este încadrat după greutatea cântărită
+            "cat_kg": _parseaza_categorie_greutate(
+                valori["cat_kg"] if valori["cat_kg"] not in (None, "") else valori["kg"]
+            ),
+            "proba": str(valori["proba"]).strip(),
+            "meci_demonstrativ": valori["meci_demonstrativ"],
+        }
+
+    # ---------- Etapa 2: date existente, încărcate în bloc ----------
+
+    def _incarca_cluburi_si_probe(self, randuri):
+        """
+        Cluburile și probele lipsă sunt create în bloc; probele noi primesc
+        categoriile standard.
+        """
+        cluburi = _dupa_nume(Club, {r["club"] for r in randuri})
+        probe = _dupa_nume(Proba, {r["proba"] for r in randuri})
+
+        cu_categorii = set(
+            Categorie.objects.filter(proba__in=probe.values()).values_list("proba_id", flat=True).distinct()
+        )
+        fara_categorii = [proba for proba in probe.values() if proba.id not in cu_categorii]
+        if fara_categorii:
+            populate_categorii_standard(*fara_categorii)
+
+        return cluburi, probe
+
+    def _rezolva_categorii(self, randuri, probe):
+        index = IndexCategorii.pentru_probe(probe.values())
+
+        rezolvate = []
+        for rand in randuri:
+            proba = probe[rand["proba"]]
+            categorie = index.rezolva(proba, rand["sex"], rand["varsta"], rand["cat_kg"])
+
+            if categorie is None:
+                self._eroare(
+                    rand["idx"],
+                    f"Nu exista categorie {proba.nume} pentru {rand['sex']}, {rand['varsta']} ani, {rand['cat_kg'] or '-'} kg"
+                )
+                continue
+
+            rand["categorie"] = categorie
+            rezolvate.append(rand)
+        return rezolvate
+
+    def _incarca_sportivi(self, randuri, cluburi):
+        """
+        Sportivii sunt identificați după CNP; cei existenți nu sunt modificați.
+        """
+        cnp_uri = {r["cnp"] for r in randuri}
+        sportivi = {s.cnp: s for s in Sportiv.objects.filter(cnp__in=cnp_uri)}
+
+        noi = {}
+        for r in randuri:
+            if r["cnp"] not in sportivi and r["cnp"] not in noi:
+                noi[r["cnp"]] = Sportiv(
+                    cnp=r["cnp"],
+                    nume=r["nume"],
+                    prenume=r["prenume"],
+                    sex=r["sex"],
+                    club=cluburi[r["club"]],
+                    data_nastere=r["data_nastere"],
+                    nr_legitimatie=r["nr_leg"],
+                )
+
+        if noi:
+            # ignore_conflicts nu întoarce cheile primare, deci recitim după CNP
+            Sportiv.objects.bulk_create(noi.values(), ignore_conflicts=True)
+            sportivi.update({s.cnp: s for s in Sportiv.objects.filter(cnp__in=noi.keys())})
+
+        return sportivi
+
+    # ---------- Etapa 3: scriere ----------
+
+    def _scrie_inscrieri(self, randuri, sportivi):
+        existente = set(
+            Inscriere.objects.filter(
+                competitie=self.competitie, sportiv__in=sportivi.values()
+            ).values_list("sportiv_id", "categorie_id")
+        )
+
+        noi = []
+        for r in randuri:
+            sportiv = sportivi[r["cnp"]]
+            if (sportiv.id, r["categorie"].id) in existente:
+                self.existing_count += 1
+                continue
+            existente.add((sportiv.id, r["categorie"].id))
+            noi.append(Inscriere(
+                sportiv=sportiv,
+                categorie=r["categorie"],
+                competitie=self.competitie,
+                varsta=r["varsta"],
+                meci_demonstrativ=r["meci_demonstrativ"],
+            ))
+
+        Inscriere.objects.bulk_create(noi, ignore_conflicts=True)
+        self.added_count = len(noi)
+
+
+def _dupa_nume(model, nume):
+    """
+    Încarcă obiectele cu numele date și le creează în bloc pe cele lipsă.
+    """
+    obiecte = {}
+    for obiect in model.objects.filter(nume__in=nume).order_by("-id"):
+        obiecte[obiect.nume] = obiect  # la nume duplicate îl păstrăm pe cel mai vechi
+
+    lipsa = [model(nume=n) for n in sorted(nume - obiecte.keys())]
+    if lipsa:
+        for obiect in model.objects.bulk_create(lipsa):
+            obiecte[obiect.nume] = obiect
+    return obiecte
+
+
+def _parseaza_data(valoare):
+    if isinstance(valoare, datetime):
+        return valoare.date()
+    if isinstance(valoare, date):
+        return valoare
+    try:
+        return datetime.strptime(str(valoare).strip(), "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def _parseaza_categorie_greutate(raw_kg):
+    if raw_kg is None:
+        return None
+    return str(raw_kg).strip().replace(" ", "").replace("KG", "").replace("kg", "")
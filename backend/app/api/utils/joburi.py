@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Numărul de fire al fiecărei cozi; analizele video, grele pe CPU, au coada
+# lor, ca să nu întârzie importurile
+COZI = {
+    'implicit': 'JOBURI_WORKERS',
+    'video': 'JOBURI_WORKERS_VIDEO',
+}
+
+_executori = {}
+_lacat = threading.Lock()
+
+
+def _pool(coada):
+    with _lacat:
+        if coada not in _executori:
+            _executori[coada] = ThreadPoolExecutor(
+                max_workers=getattr(settings, COZI[coada], 1),
+                thread_name_prefix=f'joburi-{coada}',
+            )
+        return _executori[coada]
+
+
+def trimite_job(functie, *args, coada='implicit'):
+    """
+    Rulează `functie(*args)` pe un fir din pool-ul cozii, după commit-ul
+    tranzacției curente, ca jobul să vadă rândurile create de request.
+    Starea jobului trebuie ținută în baza de date de funcția însăși.
+    Cu JOBURI_SINCRON, jobul rulează pe firul curent, tot după commit.
+    """
+    if settings.JOBURI_SINCRON:
+        transaction.on_commit(lambda: functie(*args))
+    else:
+        transaction.on_commit(lambda: _pool(coada).submit(_ruleaza, functie, *args))
+
+
+def _ruleaza(functie, *args):
+    close_old_connections()
+    try:
+        functie(*args)
+    except Exception:
+        logger.exception(f"Job {functie.__name__}{args} eșuat")
+    finally:
+        connection.close()
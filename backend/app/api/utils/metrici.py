@@ -0,0 +1,170 @@
+from collections import defaultdict
+from contextvars import ContextVar
+from django.conf import settings
+import heapq
+import itertools
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limitele histogramei de latență, în secunde
+LIMITE_LATENTA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Câte interogări se păstrează pentru un request lent
+MAX_INTEROGARI_PASTRATE = 200
+
+_masuratoare_curenta = ContextVar('masuratoare', default=None)
+
+
+class Masuratoare:
+    """
+    Ce se măsoară în timpul unui request: interogările și durata lor, durata
+    serializării și, dacă sunt păstrate requesturile lente, textul interogărilor.
+    """
+
+    def __init__(self, pastreaza_sql=False):
+        self.start = time.perf_counter()
+        self.interogari = 0
+        self.timp_db = 0.0
+        self.timp_serializare = 0.0
+        self.in_serializare = False
+        self.sql = [] if pastreaza_sql else None
+
+    def executa(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            durata = time.perf_counter() - start
+            self.interogari += 1
+            self.timp_db += durata
+            if self.sql is not None and len(self.sql) < MAX_INTEROGARI_PASTRATE:
+                self.sql.append({'sql': sql, 'ms': round(durata * 1000, 2)})
+
+
+def masuratoare_curenta():
+    return _masuratoare_curenta.get()
+
+
+def executa_masurat(execute, sql, params, many, context):
+    """
+    Wrapper instalat pe fiecare conexiune la creare. Conexiunile sunt per fir,
+    dar variabila de context ajunge și în firul în care sync_to_async rulează
+    view-urile sincrone, deci interogările lor sunt atribuite requestului corect.
+    """
+    masuratoare = _masuratoare_curenta.get()
+    if masuratoare is None:
+        return execute(sql, params, many, context)
+    return masuratoare.executa(execute, sql, params, many, context)
+
+
+def incepe_masuratoare():
+    masuratoare = Masuratoare(pastreaza_sql=numar_lente() > 0)
+    return masuratoare, _masuratoare_curenta.set(masuratoare)
+
+
+def termina_masuratoare(token):
+    _masuratoare_curenta.reset(token)
+
+
+def numar_lente():
+    return getattr(settings, 'METRICI_LENTE', 0)
+
+
+class Registru:
+    """
+    Agregatele pe view ale procesului curent (fiecare worker are registrul lui)
+    și, opțional, cele mai lente `METRICI_LENTE` requesturi cu interogările lor.
+    """
+
+    def __init__(self):
+        self._lacat = threading.Lock()
+        self._contor = itertools.count()
+        self.reseteaza()
+
+    def reseteaza(self):
+        with self._lacat:
+            self._requesturi = defaultdict(int)
+            self._serii = defaultdict(lambda: {
+                'histograma': [0] * len(LIMITE_LATENTA), 'numar': 0, 'durata': 0.0,
+                'interogari': 0, 'timp_db': 0.0, 'timp_serializare': 0.0,
+            })
+            self._lente = []  # min-heap după durată
+
+    def inregistreaza(self, view, metoda, status, cale, durata, masuratoare):
+        with self._lacat:
+            self._requesturi[(view, metoda, str(status))] += 1
+
+            serie = self._serii[(view, metoda)]
+            for i, limita in enumerate(LIMITE_LATENTA):
+                if durata <= limita:
+                    serie['histograma'][i] += 1
+            serie['numar'] += 1
+            serie['durata'] += durata
+            serie['interogari'] += masuratoare.interogari
+            serie['timp_db'] += masuratoare.timp_db
+            serie['timp_serializare'] += masuratoare.timp_serializare
+
+            n = numar_lente()
+            if n > 0 and (len(self._lente) < n or durata > self._lente[0][0]):
+                intrare = (durata, next(self._contor), {
+                    'view': view, 'metoda': metoda, 'cale': cale, 'status': status,
+                    'ms': round(durata * 1000, 2), 'interogari': masuratoare.interogari,
+                    'db_ms': round(masuratoare.timp_db * 1000, 2),
+                    'serializare_ms': round(masuratoare.timp_serializare * 1000, 2),
+                    'sql': masuratoare.sql or [],
+                })
+                heapq.heappush(self._lente, intrare)
+                while len(self._lente) > n:
+                    heapq.heappop(self._lente)
+
+    def cele_mai_lente(self):
+        with self._lacat:
+            return [intrare for _, _, intrare in sorted(self._lente, reverse=True)]
+
+    def prometheus(self):
+        """Agregatele în formatul text Prometheus (versiunea 0.0.4)."""
+        with self._lacat:
+            requesturi = dict(self._requesturi)
+            serii = {cheie: {**serie, 'histograma': list(serie['histograma'])} for cheie, serie in self._serii.items()}
+
+        linii = [
+            "# HELP http_requests_total Requesturi procesate, pe view, metodă și status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (view, metoda, status), numar in sorted(requesturi.items()):
+            linii.append(f'http_requests_total{{{_etichete(view=view, method=metoda, status=status)}}} {numar}')
+
+        linii += [
+            "# HELP http_request_duration_seconds Latența totală a requesturilor.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (view, metoda), serie in sorted(serii.items()):
+            etichete = _etichete(view=view, method=metoda)
+            for limita, numar in zip(LIMITE_LATENTA, serie['histograma']):
+                linii.append(f'http_request_duration_seconds_bucket{{{etichete},le="{limita}"}} {numar}')
+            linii.append(f'http_request_duration_seconds_bucket{{{etichete},le="+Inf"}} {serie["numar"]}')
+            linii.append(f'http_request_duration_seconds_sum{{{etichete}}} {serie["durata"]:.6f}')
+            linii.append(f'http_request_duration_seconds_count{{{etichete}}} {serie["numar"]}')
+
+        for nume, cheie, descriere in (
+            ('http_request_db_queries_total', 'interogari', "Interogări SQL executate de requesturi."),
+            ('http_request_db_seconds_total', 'timp_db', "Timpul petrecut în baza de date."),
+            ('http_request_serializer_seconds_total', 'timp_serializare', "Timpul petrecut în serializatoare."),
+        ):
+            linii += [f"# HELP {nume} {descriere}", f"# TYPE {nume} counter"]
+            for (view, metoda), serie in sorted(serii.items()):
+                valoare = serie[cheie] if cheie == 'interogari' else f"{serie[cheie]:.6f}"
+                linii.append(f'{nume}{{{_etichete(view=view, method=metoda)}}} {valoare}')
+
+        return "\n".join(linii) + "\n"
+
+
+def _etichete(**valori):
+    def escape(valoare):
+        return str(valoare).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ",".join(f'{cheie}="{escape(valoare)}"' for cheie, valoare in valori.items())
+
+
+registru = Registru()
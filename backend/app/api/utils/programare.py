@@ -0,0 +1,329 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from ..models import ClipMeci, Meci, ProgramCompetitie, Runda, RUNDE_BEST_OF_3
+from .evenimente import publica_dupa_commit, evenimente_program
+from .revizii import creste_revizie
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def planifica_meciuri(meciuri, saltele, durata, pauza, sfarsituri=None, fixate=None):
+    """
+    Programează pe saltele meciurile nedisputate (list scheduling cu heap).
+    Timpii sunt în minute față de momentul de start (0).
+
+    - un meci nu începe înainte ca meciurile din care vin sportivii lui să se
+      termine, plus pauza minimă pentru câștigătorul care avansează;
+    - un sportiv (și cel înscris la mai multe categorii) are cel puțin `pauza`
+      minute între două meciuri;
+    - saltea liberă cea mai devreme primește meciul care poate începe primul,
+      iar la egalitate meciul cu cel mai lung drum până la finală.
+
+    `sfarsituri` dă, pentru meciuri deja disputate, momentul terminării
+    (de exemplu 0 pentru meciul tocmai finalizat); celelalte meciuri disputate
+    nu impun pauză. `fixate` dă meciurile nedisputate care rămân pe loc, ca
+    {meci_id: (saltea_id, ordine, minut_start)}: ocupă saltea și sportivii, iar
+    celelalte meciuri sunt adăugate după ele. Întoarce
+    {meci_id: (saltea, ordine, minut_start)} pentru meciurile nefixate.
+    """
+    sfarsituri = sfarsituri or {}
+    fixate = fixate or {}
+    dupa_id = {m.id: m for m in meciuri}
+    ramase = {m.id: m for m in meciuri if m.castigator_id is None and m.id not in fixate}
+    if not ramase or not saltele:
+        return {}
+
+    precedente = _precedente(meciuri)
+    urmatoare = defaultdict(list)
+    for meci_id, lista in precedente.items():
+        for p in lista:
+            urmatoare[p].append(meci_id)
+
+    drum = _drum_pana_la_finala(dupa_id)
+
+    # Ultimul minut în care fiecare sportiv a terminat un meci
+    ultim_meci = {}
+    for meci_id, sfarsit in sfarsituri.items():
+        meci = dupa_id.get(meci_id)
+        if meci:
+            for sportiv_id in (meci.sportiv1_id, meci.sportiv2_id):
+                if sportiv_id is not None:
+                    ultim_meci[sportiv_id] = max(ultim_meci.get(sportiv_id, sfarsit), sfarsit)
+
+    # Meciurile fixate ocupă saltelele până la ultimul lor și pe sportivi în intervalele lor
+    liber_saltea = defaultdict(float)
+    ordine_pe_saltea = defaultdict(int)
+    ocupat = defaultdict(list)
+    for meci_id, (saltea_id, ordine, minut) in fixate.items():
+        liber_saltea[saltea_id] = max(liber_saltea[saltea_id], minut + durata)
+        ordine_pe_saltea[saltea_id] = max(ordine_pe_saltea[saltea_id], ordine)
+        meci = dupa_id[meci_id]
+        for sportiv_id in (meci.sportiv1_id, meci.sportiv2_id):
+            if sportiv_id is not None:
+                ocupat[sportiv_id].append((minut, minut + durata))
+    for intervale in ocupat.values():
+        intervale.sort()
+
+    # Cel mai devreme start impus de meciurile precedente
+    start_minim = defaultdict(float)
+    neprogramate = {}
+    for meci_id in ramase:
+        neprogramate[meci_id] = 0
+        for p in precedente.get(meci_id, []):
+            if p in ramase:
+                neprogramate[meci_id] += 1
+            elif p in fixate:
+                start_minim[meci_id] = max(start_minim[meci_id], fixate[p][2] + durata + pauza)
+            elif p in sfarsituri:
+                start_minim[meci_id] = max(start_minim[meci_id], sfarsituri[p] + pauza)
+
+    def start_posibil(meci, de_la=0.0):
+        start = max(de_la, start_minim[meci.id])
+        for sportiv_id in (meci.sportiv1_id, meci.sportiv2_id):
+            if sportiv_id in ultim_meci:
+                start = max(start, ultim_meci[sportiv_id] + pauza)
+        # Meciul încape între meciurile fixate ale sportivilor, cu pauză de ambele părți
+        mutat = True
+        while mutat:
+            mutat = False
+            for sportiv_id in (meci.sportiv1_id, meci.sportiv2_id):
+                for inceput, sfarsit in ocupat.get(sportiv_id, ()):
+                    if start + durata + pauza <= inceput:
+                        break
+                    if start < sfarsit + pauza:
+                        start, mutat = sfarsit + pauza, True
+        return start
+
+    def cheie(meci):
+        return (start_posibil(meci), -drum[meci.id], meci.categorie_id, meci.pozitie_in_bracket, meci.id)
+
+    gata = [cheie(ramase[i]) for i, n in neprogramate.items() if n == 0]
+    heapq.heapify(gata)
+
+    libere = [(liber_saltea[s.id], s.numar, s.id, s) for s in saltele]
+    heapq.heapify(libere)
+
+    program = {}
+    while gata:
+        start, *rest = heapq.heappop(gata)
+        meci = ramase[rest[-1]]
+
+        # Pauza sportivilor poate fi crescut de când meciul a intrat în heap
+        actual = cheie(meci)
+        if actual[0] > start:
+            heapq.heappush(gata, actual)
+            continue
+
+        liber_de_la, numar, saltea_id, saltea = heapq.heappop(libere)
+        inceput = start_posibil(meci, liber_de_la)
+        sfarsit = inceput + durata
+        heapq.heappush(libere, (sfarsit, numar, saltea_id, saltea))
+
+        ordine_pe_saltea[saltea_id] += 1
+        program[meci.id] = (saltea, ordine_pe_saltea[saltea_id], inceput)
+
+        for sportiv_id in (meci.sportiv1_id, meci.sportiv2_id):
+            if sportiv_id is not None:
+                ultim_meci[sportiv_id] = sfarsit
+
+        for urmator_id in urmatoare.get(meci.id, []):
+            if urmator_id not in ramase:
+                continue
+            start_minim[urmator_id] = max(start_minim[urmator_id], sfarsit + pauza)
+            neprogramate[urmator_id] -= 1
+            if neprogramate[urmator_id] == 0:
+                heapq.heappush(gata, cheie(ramase[urmator_id]))
+
+    if len(program) < len(ramase):
+        logger.warning(f"{len(ramase) - len(program)} meciuri nu au putut fi programate (dependențe ciclice)")
+    return program
+
+
+def _precedente(meciuri):
+    """
+    Meciurile de care depinde fiecare meci: meciuri_precedente (next_meci),
+    semifinalele pentru locul 3 și meciul anterior dintr-un Best of 3.
+    """
+    precedente = defaultdict(list)
+    semifinale = defaultdict(list)
+    loc3 = {}
+    best_of_3 = defaultdict(dict)
+
+    for meci in meciuri:
+        if meci.next_meci_id is not None:
+            precedente[meci.next_meci_id].append(meci.id)
+        if meci.runda == Runda.SEMIFINALA:
+            semifinale[meci.categorie_id].append(meci.id)
+        elif meci.runda == Runda.LOCUL_3:
+            loc3[meci.categorie_id] = meci.id
+        elif meci.runda in RUNDE_BEST_OF_3:
+            best_of_3[meci.categorie_id][meci.pozitie_in_bracket] = meci.id
+
+    for categorie_id, meci_id in loc3.items():
+        precedente[meci_id].extend(semifinale[categorie_id])
+    for serie in best_of_3.values():
+        for pozitie, meci_id in serie.items():
+            if pozitie - 1 in serie:
+                precedente[meci_id].append(serie[pozitie - 1])
+    return precedente
+
+
+def _drum_pana_la_finala(dupa_id):
+    """
+    Numărul de meciuri până la capătul bracket-ului, urmând next_meci.
+    Meciurile din primele runde au drumul cel mai lung și au prioritate.
+    """
+    drum = {}
+    for meci_id in dupa_id:
+        lant = []
+        curent = meci_id
+        while curent is not None and curent not in drum and curent in dupa_id:
+            lant.append(curent)
+            curent = dupa_id[curent].next_meci_id
+        baza = drum.get(curent, 0)
+        for i, m in enumerate(reversed(lant), start=1):
+            drum[m] = baza + i
+    return drum
+
+
+def replanifica_competitie(competitie_id, acum=None):
+    """
+    Recalculează programul tuturor meciurilor rămase ale competiției, pornind
+    de la momentul curent, și scrie doar meciurile a căror programare s-a
+    schimbat. Nu face nimic dacă pentru competiție nu a fost creat un program.
+    """
+    with transaction.atomic():
+        program = ProgramCompetitie.objects.select_for_update().filter(competitie_id=competitie_id).first()
+        if program is None:
+            return None
+
+        ora_start = _ora_start(program, acum)
+        saltele = list(program.saltele.order_by('numar'))
+        meciuri = _meciuri_program(competitie_id)
+        planificare = planifica_meciuri(meciuri, saltele, program.durata_meci_minute, program.pauza_minima_minute)
+        modificate = _scrie_programare(competitie_id, meciuri, planificare, ora_start)
+
+    logger.info(f"Program competitia {competitie_id}: {len(planificare)} meciuri, {len(modificate)} modificate")
+    return planificare
+
+
+def replanifica_dupa_finalizare(meci, acum=None):
+    """
+    Reprogramare incrementală după finalizarea lui `meci`: saltea lui s-a
+    eliberat, iar sportivii lui încep pauza de acum. Meciurile în desfășurare
+    (cu înregistrarea pornită) nu sunt mutate, iar meciurile celorlalte saltele
+    își păstrează saltea, ordinea și ora. Sunt replanificate doar coada saltelei
+    eliberate, meciurile neprogramate și meciurile care nu mai respectă pauza
+    sportivilor sau meciurile precedente; ele sunt adăugate după cozile fixate.
+    """
+    with transaction.atomic():
+        program = ProgramCompetitie.objects.select_for_update().filter(competitie_id=meci.competitie_id).first()
+        if program is None:
+            return None
+
+        ora_start = _ora_start(program, acum)
+        saltele = list(program.saltele.order_by('numar'))
+        meciuri = _meciuri_program(meci.competitie_id)
+        durata, pauza = program.durata_meci_minute, program.pauza_minima_minute
+
+        in_desfasurare = set(ClipMeci.objects.filter(
+            meci__competitie_id=meci.competitie_id, meci__castigator__isnull=True, sfarsit__isnull=True
+        ).values_list('meci_id', flat=True))
+        ocupate = {s.id for s in saltele} - {meci.saltea_id}
+        dupa_id = {m.id: m for m in meciuri}
+
+        def minut(m):
+            return (m.ora_programata - ora_start).total_seconds() / 60
+
+        fixate = {}
+        for m in meciuri:
+            if m.castigator_id is not None or m.saltea_id is None or m.ora_programata is None or m.ordine is None:
+                continue
+            if m.id in in_desfasurare or m.saltea_id in ocupate:
+                fixate[m.id] = (m.saltea_id, m.ordine, minut(m))
+
+        # Sportivii meciului finalizat au nevoie de pauză de acum (minutul 0)
+        in_pauza = {s for s in (meci.sportiv1_id, meci.sportiv2_id) if s is not None}
+        for meci_id in [i for i in fixate if i not in in_desfasurare]:
+            m = dupa_id[meci_id]
+            if fixate[meci_id][2] < pauza and in_pauza & {m.sportiv1_id, m.sportiv2_id}:
+                del fixate[meci_id]
+
+        # Un meci fixat care ar începe înainte de sfârșitul unui meci precedent
+        # replanificat (plus pauza) este replanificat și el
+        precedente = _precedente(meciuri)
+        while True:
+            planificare = planifica_meciuri(meciuri, saltele, durata, pauza, {meci.id: 0}, fixate=fixate)
+            incalcate = [
+                meci_id for meci_id, (_, _, start) in fixate.items()
+                if meci_id not in in_desfasurare and any(
+                    _sfarsit(p, fixate, planificare, dupa_id, durata) + pauza > start
+                    for p in precedente.get(meci_id, [])
+                )
+            ]
+            if not incalcate:
+                break
+            for meci_id in incalcate:
+                del fixate[meci_id]
+
+        modificate = _scrie_programare(meci.competitie_id, meciuri, planificare, ora_start, pastrate=fixate)
+
+    logger.info(
+        f"Program competitia {meci.competitie_id}: {len(planificare)} meciuri replanificate, "
+        f"{len(modificate)} modificate"
+    )
+    return planificare
+
+
+def _sfarsit(meci_id, fixate, planificare, dupa_id, durata):
+    """Minutul la care se termină meciul, -inf dacă este disputat, inf dacă nu este programat."""
+    if dupa_id[meci_id].castigator_id is not None:
+        return float("-inf")
+    if meci_id in fixate:
+        return fixate[meci_id][2] + durata
+    if meci_id in planificare:
+        return planificare[meci_id][2] + durata
+    return float("inf")
+
+
+def _ora_start(program, acum=None):
+    acum = acum or timezone.now()
+    return max(program.ora_start, acum).replace(second=0, microsecond=0)
+
+
+def _meciuri_program(competitie_id):
+    return list(Meci.objects.filter(competitie_id=competitie_id).only(
+        'id', 'categorie', 'sportiv1', 'sportiv2', 'castigator', 'runda',
+        'pozitie_in_bracket', 'next_meci', 'saltea', 'ordine', 'ora_programata'
+    ))
+
+
+def _scrie_programare(competitie_id, meciuri, planificare, ora_start, pastrate=()):
+    """
+    Scrie cu un bulk_update meciurile nedisputate a căror programare diferă de
+    `planificare`. Meciurile disputate și cele din `pastrate` rămân neatinse;
+    restul meciurilor neplanificate pierd saltea și ora.
+    """
+    modificate = []
+    for meci in meciuri:
+        if meci.id in planificare:
+            saltea, ordine, minut = planificare[meci.id]
+            valori = (saltea.id, ordine, ora_start + timedelta(minutes=minut))
+        elif meci.castigator_id is None and meci.id not in pastrate:
+            valori = (None, None, None)
+        else:
+            continue  # meciurile disputate își păstrează saltea și ora
+
+        if (meci.saltea_id, meci.ordine, meci.ora_programata) != valori:
+            meci.saltea_id, meci.ordine, meci.ora_programata = valori
+            modificate.append(meci)
+
+    if modificate:
+        Meci.objects.bulk_update(modificate, ['saltea', 'ordine', 'ora_programata'], batch_size=1000)
+        publica_dupa_commit(*evenimente_program(competitie_id, modificate))
+        creste_revizie('meci', f"competitie:{competitie_id}")
+    return modificate
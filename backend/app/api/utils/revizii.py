@@ -0,0 +1,128 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from ..models import Competitie, Revizie
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def resurse_instanta(instanta):
+    """
+    Resursele invalidate de scrierea unui obiect: modelul lui și, pentru
+    obiectele unei competiții, revizia competiției.
+    """
+    resurse = [instanta._meta.model_name]
+    competitie_id = instanta.pk if isinstance(instanta, Competitie) else getattr(instanta, 'competitie_id', None)
+    if competitie_id is not None:
+        resurse.append(f"competitie:{competitie_id}")
+    return resurse
+
+
+def creste_revizie(*resurse):
+    """
+    Crește contoarele resurselor după commit-ul tranzacției curente.
+    Scrierile din aceeași tranzacție se adună, deci o regenerare cu mii de
+    meciuri costă câte un UPDATE pe resursă, iar rândul contorului nu rămâne
+    blocat pe durata tranzacției.
+    """
+    in_asteptare = getattr(_local, 'resurse', None)
+    if in_asteptare is None:
+        in_asteptare = _local.resurse = set()
+    in_asteptare.update(resurse)
+    transaction.on_commit(_aplica_revizii)
+
+
+def _aplica_revizii():
+    resurse = getattr(_local, 'resurse', None)
+    if not resurse:
+        return  # deja aplicate de un callback anterior din aceeași tranzacție
+    _local.resurse = set()
+
+    acum = timezone.now()
+    for resursa in sorted(resurse):
+        actualizate = Revizie.objects.filter(resursa=resursa).update(numar=F('numar') + 1, data_modificare=acum)
+        if not actualizate:
+            Revizie.objects.bulk_create([Revizie(resursa=resursa, data_modificare=acum)], ignore_conflicts=True)
+            Revizie.objects.filter(resursa=resursa).update(numar=F('numar') + 1, data_modificare=acum)
+
+
+def stare_revizii(resurse, varianta=''):
+    """
+    ETag-ul și momentul ultimei modificări (timestamp) pentru resursele date,
+    dintr-o singură interogare. `varianta` deosebește reprezentările aceleiași
+    resurse (de exemplu tipul de conținut).
+    """
+    revizii = Revizie.objects.filter(resursa__in=resurse).values_list('resursa', 'numar', 'data_modificare')
+    numere = {}
+    ultima_modificare = None
+    for resursa, numar, data_modificare in revizii:
+        numere[resursa] = numar
+        if ultima_modificare is None or data_modificare > ultima_modificare:
+            ultima_modificare = data_modificare
+
+    semnatura = ';'.join(f"{r}={numere.get(r, 0)}" for r in sorted(resurse)) + f"|{varianta}"
+    etag = quote_etag(hashlib.md5(semnatura.encode()).hexdigest())
+    return etag, int(ultima_modificare.timestamp()) if ultima_modificare else None
+
+
+class CacheConditionatMixin:
+    """
+    Cache HTTP pentru citirile publice ale unui viewset. Răspunsurile primesc
+    ETag și Last-Modified din reviziile resurselor de care depind; clienții cu
+    versiunea curentă primesc 304, iar ceilalți un răspuns JSON deja randat,
+    păstrat în cache-ul "raspunsuri" sub revizia lui.
+    """
+    resurse_cache = ()
+
+    def get_resurse_cache(self):
+        return self.resurse_cache
+
+    def list(self, request, *args, **kwargs):
+        return self.raspuns_conditionat(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.raspuns_conditionat(request, super().retrieve, *args, **kwargs)
+
+    def raspuns_conditionat(self, request, handler, *args, **kwargs):
+        etag, ultima_modificare = stare_revizii(self.get_resurse_cache(), request.accepted_media_type)
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=ultima_modificare)
+        if response is None:
+            response = self._raspuns_din_cache(request, etag, handler, *args, **kwargs)
+
+        response['ETag'] = etag
+        if ultima_modificare is not None:
+            response['Last-Modified'] = http_date(ultima_modificare)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def _raspuns_din_cache(self, request, etag, handler, *args, **kwargs):
+        # Doar JSON: interfața navigabilă depinde de utilizator și formulare
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        cache = caches['raspunsuri']
+        # URL-ul absolut: linkurile de paginare din răspuns depind de host
+        cheie = 'raspuns:' + hashlib.md5(f"{request.build_absolute_uri()}|{etag}".encode()).hexdigest()
+        salvat = cache.get(cheie)
+        if salvat is not None:
+            content_type, continut = salvat
+            return HttpResponse(continut, content_type=content_type)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            cache.set(cheie, (response['Content-Type'], response.content))
+        return response
@@ -0,0 +1,231 @@
+from django.conf import settings
+from django.utils import timezone
+from .analiza_live import AnalizaLive, argumente_ffmpeg, incalzeste
+from .clipuri import argumente_segmente, director_saltea, ultimul_segment
+import subprocess
+import threading
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+INREGISTRARE = 'inregistrare'
+LIVESTREAM = 'livestream'
+
+# Verificarea proceselor: la câte secunde, după câte secunde fără date o
+# înregistrare este considerată blocată și de câte ori este repornit un proces
+INTERVAL_MONITOR = 2
+SECUNDE_BLOCAJ = 20
+MAX_REPORNIRI = 5
+
+
+class PipelineActiv(Exception):
+    pass
+
+
+class Pipeline:
+    """
+    Un proces ffmpeg al unei saltele (înregistrare sau livestream), cu starea
+    necesară pentru a fi repornit. Înregistrarea scrie segmente în directorul
+    saltelei; după o repornire, segmentele noi continuă în același director.
+    """
+
+    def __init__(self, saltea, tip, meci_id=None, job_id=None, live=False):
+        self.saltea = saltea
+        self.tip = tip
+        self.meci_id = meci_id
+        self.job_id = job_id
+        self.live = live
+        self.director = director_saltea(saltea)
+        self.proces = None
+        self.analize = []
+        self.porniri = 0
+        self.ultim_cod = None
+        self.pornit_la = None
+        self.repornire_la = None
+        self.oprit = False
+        self.esuat = False
+        self.terminat = False
+        self._segment = None
+        self._crestere_la = time.monotonic()
+
+    def porneste(self):
+        cmd = self._comanda()
+        self.proces = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE if self.live else subprocess.DEVNULL,
+        )
+        self.porniri += 1
+        self.pornit_la = timezone.now()
+        self.repornire_la = None
+        self._segment, self._crestere_la = None, time.monotonic()
+        if self.live:
+            analiza = AnalizaLive(self.proces.stdout, self.job_id, self.pornit_la)
+            analiza.start()
+            self.analize.append(analiza)
+
+    def _comanda(self):
+        camera = self.saltea.camera_url or settings.CAMERA_URL_IMPLICITA
+        if self.tip == LIVESTREAM:
+            cmd = ["ffmpeg", "-re", "-i", camera]
+            audio = self.saltea.audio_url or settings.AUDIO_URL_IMPLICITA
+            if audio:
+                cmd += ["-re", "-i", audio, "-c:a", "aac", "-b:a", "128k", "-async", "1"]
+            return cmd + [
+                "-vcodec", "libx264", "-preset", "veryfast", "-vsync", "cfr", "-r", "25",
+                "-f", "flv", self.saltea.stream_url or settings.LIVESTREAM_URL,
+            ]
+
+        cmd = [
+            "ffmpeg", "-i", camera,
+            "-t", "00:10:00", "-vcodec", "libx264", "-preset", "veryfast", *argumente_segmente(self.director),
+        ]
+        if self.live:
+            # Analiza live primește cadrele direct de la ffmpeg, pe stdout
+            cmd += ["-t", "00:10:00", *argumente_ffmpeg()]
+        return cmd
+
+    def opreste(self):
+        self.oprit = True
+        if self.proces is not None and self.proces.poll() is None:
+            # 'q' închide fișierul corect; dacă nu merge, procesul este terminat
+            try:
+                self.proces.stdin.write(b'q\n')
+                self.proces.stdin.flush()
+                self.proces.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proces.terminate()
+                self.proces.wait()
+        if self.proces is not None:
+            self.ultim_cod = self.proces.returncode
+        # ffmpeg a închis pipe-ul; analiza live termină ultimul cadru
+        for analiza in self.analize:
+            analiza.join(timeout=10)
+
+    def activ(self):
+        return not (self.oprit or self.esuat or self.terminat)
+
+    def verifica(self):
+        """Apelat de monitor: repornește procesele oprite sau blocate."""
+        acum = time.monotonic()
+        cod = self.proces.poll()
+        if cod is None:
+            if self.tip == INREGISTRARE:
+                segment = ultimul_segment(self.director)
+                if segment is not None and segment != self._segment:
+                    self._segment, self._crestere_la = segment, acum
+                elif acum - self._crestere_la > SECUNDE_BLOCAJ:
+                    logger.warning(f"Saltea {self.saltea.numar}: {self.tip} fără date de {SECUNDE_BLOCAJ} s, repornit")
+                    self.proces.kill()
+            return
+
+        if self.repornire_la is None:
+            self.ultim_cod = cod
+            if cod == 0 and self.tip == INREGISTRARE:
+                # Durata maximă a înregistrării (-t) a fost atinsă
+                self.terminat = True
+                return
+            if self.porniri > MAX_REPORNIRI:
+                self.esuat = True
+                logger.error(f"Saltea {self.saltea.numar}: {self.tip} oprit de {self.porniri} ori (cod {cod}), abandonat")
+                return
+            # Așteptare exponențială între reporniri
+            self.repornire_la = acum + min(2 ** (self.porniri - 1), 30)
+            logger.warning(f"Saltea {self.saltea.numar}: {self.tip} oprit neașteptat (cod {cod})")
+        elif acum >= self.repornire_la:
+            try:
+                self.porneste()
+            except OSError as e:
+                self.esuat = True
+                logger.error(f"Saltea {self.saltea.numar}: {self.tip} nu a putut fi repornit: {e}")
+
+    def stare(self):
+        if self.oprit:
+            stare = 'oprit'
+        elif self.esuat:
+            stare = 'esuat'
+        elif self.terminat:
+            stare = 'terminat'
+        elif self.repornire_la is not None:
+            stare = 'repornire'
+        else:
+            stare = 'activ'
+        return {
+            'saltea': self.saltea.id,
+            'numar_saltea': self.saltea.numar,
+            'tip': self.tip,
+            'stare': stare,
+            'pid': self.proces.pid if self.proces is not None and stare == 'activ' else None,
+            'meci': self.meci_id,
+            'job': self.job_id,
+            'pornit_la': self.pornit_la,
+            'reporniri': max(0, self.porniri - 1),
+            'ultim_cod': self.ultim_cod,
+            'ultimul_segment': self._segment[0] if self._segment else None,
+            'secunde_fara_date': (
+                round(time.monotonic() - self._crestere_la) if self.tip == INREGISTRARE and stare == 'activ' else None
+            ),
+        }
+
+
+class Supervizor:
+    """
+    Procesele ffmpeg ale tuturor saltelelor: cel mult o înregistrare și un
+    livestream pe saltea, urmărite de un fir de monitorizare care le repornește.
+    Procesele aparțin procesului server curent (un singur worker).
+    """
+
+    def __init__(self):
+        self._pipelines = {}
+        self._lacat = threading.Lock()
+        self._monitor = None
+
+    def porneste(self, saltea, tip, **kwargs):
+        with self._lacat:
+            existent = self._pipelines.get((saltea.id, tip))
+            if existent is not None and existent.activ():
+                raise PipelineActiv(f"Saltea {saltea.numar} are deja un {tip} activ.")
+
+            pipeline = Pipeline(saltea, tip, **kwargs)
+            if tip == INREGISTRARE:
+                os.makedirs(pipeline.director, exist_ok=True)
+                if pipeline.live:
+                    incalzeste()
+            pipeline.porneste()
+            self._pipelines[(saltea.id, tip)] = pipeline
+            self._porneste_monitor()
+            return pipeline
+
+    def opreste(self, saltea_id, tip):
+        with self._lacat:
+            pipeline = self._pipelines.get((saltea_id, tip))
+            if pipeline is None or pipeline.oprit:
+                return None
+            pipeline.oprit = True
+        # Oprirea poate dura secunde; monitorul ignoră deja pipeline-ul
+        pipeline.opreste()
+        return pipeline
+
+    def stare(self):
+        with self._lacat:
+            pipelines = list(self._pipelines.values())
+        return [p.stare() for p in sorted(pipelines, key=lambda p: (p.saltea.numar, p.tip))]
+
+    def _porneste_monitor(self):
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._monitorizeaza, daemon=True, name='supervizor-ffmpeg')
+            self._monitor.start()
+
+    def _monitorizeaza(self):
+        while True:
+            time.sleep(INTERVAL_MONITOR)
+            with self._lacat:
+                active = [p for p in self._pipelines.values() if p.activ()]
+                for pipeline in active:
+                    try:
+                        pipeline.verifica()
+                    except Exception:
+                        logger.exception(f"Verificarea {pipeline.tip} pentru saltea {pipeline.saltea.numar} a eșuat")
+
+
+supervizor = Supervizor()
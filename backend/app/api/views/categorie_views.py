@@ -1,15 +1,35 @@
 from rest_framework import viewsets
-from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.rest_framework import DjangoFilterBackend, FilterSet, NumberFilter
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from ..models import Categorie
+from ..models import Categorie, Inscriere
+from ..pagination import CursorPaginare
 from ..serializers import CategorieSerializer
+from ..utils.revizii import CacheConditionatMixin
 
-class CategorieViewSet(viewsets.ModelViewSet):
+class CategorieFilter(FilterSet):
+    competitie = NumberFilter(method='filtreaza_competitie')
+
+    class Meta:
+        model = Categorie
+        fields = ['proba']
+
+    def filtreaza_competitie(self, queryset, name, value):
+        # Categoriile cu cel puțin o înscriere la competiție
+        return queryset.filter(id__in=Inscriere.objects.filter(competitie=value).values('categorie'))
+
+class CategorieViewSet(CacheConditionatMixin, viewsets.ModelViewSet):
     queryset = Categorie.objects.all()
     serializer_class = CategorieSerializer
+    pagination_class = CursorPaginare
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['proba']
+    filterset_class = CategorieFilter
+
+    def get_resurse_cache(self):
+        competitie = self.request.query_params.get('competitie', '')
+        if competitie.isdigit():
+            return ('categorie', 'proba', f"competitie:{competitie}")
+        return ('categorie', 'proba')
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -19,4 +39,4 @@ class CategorieViewSet(viewsets.ModelViewSet):
     def get_authenticators(self):
         if self.request.method == 'GET':
             return []
-        return [JWTAuthentication()]
\ No newline at end of file
+        return [JWTAuthentication()]
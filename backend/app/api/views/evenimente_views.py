@@ -0,0 +1,47 @@
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from ..models import Competitie
+from ..utils.evenimente import broadcaster
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Un comentariu SSE periodic ține conexiunea deschisă prin proxy-uri
+INTERVAL_KEEPALIVE = 15
+
+
+async def flux_evenimente(request, competition_id):
+    """
+    Server-Sent Events cu delta meciurilor unei competiții (opțional doar pentru
+    ?categorie=<id>). Evenimente: meci, program, bracket, resync. Necesită un
+    server ASGI, unde fiecare client ține doar o corutină, nu un fir.
+    """
+    if not await Competitie.objects.filter(id=competition_id).aexists():
+        raise Http404("Competiția nu există.")
+
+    categorie = request.GET.get('categorie')
+    try:
+        categorie_id = int(categorie) if categorie else None
+    except ValueError:
+        return HttpResponseBadRequest("Categorie invalidă.")
+
+    abonament = broadcaster.aboneaza(competition_id, categorie_id)
+
+    async def flux():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    eveniment = await abonament.urmatorul(INTERVAL_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {eveniment['tip']}\ndata: {json.dumps(eveniment)}\n\n"
+        finally:
+            broadcaster.dezaboneaza(abonament)
+
+    response = StreamingHttpResponse(flux(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, Http404, JsonResponse
+from django.views.decorators.http import require_GET
+from ..utils.metrici import numar_lente, registru
+import hmac
+
+
+def _acces_permis(request):
+    """
+    Prometheus se autentifică cu `Authorization: Bearer <METRICI_TOKEN>`;
+    din browser, metricile sunt vizibile doar pentru staff.
+    """
+    token = getattr(settings, 'METRICI_TOKEN', '')
+    antet = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(antet.encode(), f"Bearer {token}".encode()):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+@require_GET
+def metrici(request):
+    """Agregatele pe view ale acestui proces, în formatul text Prometheus."""
+    if not _acces_permis(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registru.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+def requesturi_lente(request):
+    """
+    Cele mai lente METRICI_LENTE requesturi, cu interogările lor;
+    ?reseteaza=1 golește și agregatele.
+    """
+    if not _acces_permis(request):
+        return HttpResponseForbidden()
+    if numar_lente() <= 0:
+        raise Http404("Păstrarea requesturilor lente este dezactivată (METRICI_LENTE=0).")
+
+    lente = registru.cele_mai_lente()
+    if request.GET.get('reseteaza'):
+        registru.reseteaza()
+    return JsonResponse({'requesturi': lente}, json_dumps_params={'ensure_ascii': False})
@@ -4,12 +4,14 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from ..models import Proba
 from ..serializers import ProbaSerializer
+from ..utils.revizii import CacheConditionatMixin
 
-class ProbaViewSet(viewsets.ModelViewSet):
+class ProbaViewSet(CacheConditionatMixin, viewsets.ModelViewSet):
     queryset = Proba.objects.all()
     serializer_class = ProbaSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['id']
+    resurse_cache = ('proba',)
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -1,123 +1,177 @@
-import subprocess
-import os
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-import sys
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ..models import Meci, Saltea, JobAnalizaVideo, ClipMeci
+from ..serializers import JobAnalizaVideoSerializer, ClipMeciSerializer
+from ..utils.analiza_video import proceseaza_job_analiza
+from ..utils.clipuri import ClipIndisponibil, director_saltea, taie_meci
+from ..utils.supervizor import supervizor, PipelineActiv, INREGISTRARE, LIVESTREAM
+from ..utils.joburi import trimite_job
+
+def _saltea_implicita():
+    """Prima saltea, creată la nevoie: înregistrarea merge și fără program."""
+    return Saltea.objects.order_by('numar', 'id').first() or Saltea.objects.create(numar=1)
+
+def _saltea_si_meci(request):
+    """
+    Saltea cererii (parametrul `saltea`, saltea meciului sau saltea implicită)
+    și id-ul meciului; (None, None, eroare) dacă nu pot fi determinate.
+    """
+    meci_id = request.data.get('meci')
+    meci = None
+    if meci_id is not None:
+        meci = Meci.objects.select_related('saltea').filter(id=meci_id).first() if str(meci_id).isdigit() else None
+        if meci is None:
+            return None, None, "Meciul nu există."
+
+    saltea_id = request.data.get('saltea')
+    if saltea_id is not None:
+        saltea = Saltea.objects.filter(id=saltea_id).first() if str(saltea_id).isdigit() else None
+        if saltea is None:
+            return None, None, "Saltea nu există."
+    else:
+        saltea = (meci.saltea if meci else None) or _saltea_implicita()
+    return saltea, meci.id if meci else None, None
 
 class StartRecordingView(APIView):
     permission_classes = []
-    process = None
 
     def post(self, request):
-        output_path = "recorded.mp4"
-        source_url = "http://192.168.1.245:8080/video"
-
-        if os.path.exists(output_path):
-            os.remove(output_path)
-
-        cmd = [
-            "ffmpeg",
-            "-i", source_url,
-            "-t", "00:10:00",
-            "-vcodec", "libx264",
-            "-preset", "veryfast",
-            "-movflags", "+faststart",
-            "recorded.mp4"
-        ]
-
+        saltea, meci_id, eroare = _saltea_si_meci(request)
+        if eroare:
+            return Response({"error": eroare}, status=400)
+
+        live = settings.ANALIZA_LIVE
+        # Meciul ocupă în înregistrarea saltelei intervalul dintre start și stop
+        clip = ClipMeci.objects.create(
+            meci_id=meci_id, saltea=saltea, director=director_saltea(saltea), inceput=timezone.now(),
+        )
+        job = JobAnalizaVideo.objects.create(
+            meci_id=meci_id, clip=clip, status='in_lucru' if live else 'in_asteptare',
+            data_start=timezone.now() if live else None,
+        )
         try:
-            self.__class__.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
-            return Response({"message": "Recording started."})
+            pipeline = supervizor.porneste(saltea, INREGISTRARE, meci_id=meci_id, job_id=job.id, live=live)
+        except PipelineActiv as e:
+            clip.delete()
+            job.delete()
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
+            clip.delete()
+            job.delete()
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"message": "Recording started.", **pipeline.stare()})
 
 class StopRecordingView(APIView):
     permission_classes = []
     
     def post(self, request):
-        if StartRecordingView.process:
-            # Trimite 'q' pentru oprire gracioasă
-            try:
-                StartRecordingView.process.stdin.write(b'q\n')
-                StartRecordingView.process.stdin.flush()
-                StartRecordingView.process.wait(timeout=10)
-            except:
-                # Dacă nu merge, folosește terminate
-                StartRecordingView.process.terminate()
-                StartRecordingView.process.wait()
-            
-            StartRecordingView.process = None
-
-            script_path = os.path.join(settings.BASE_DIR, "app", "script", "process_video.py")
-            video_path = os.path.join(settings.BASE_DIR, "recorded.mp4")
-
-            try:
-                result = subprocess.run(
-                    [sys.executable, script_path, video_path],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=60  # seconds
-                )
-                return Response({
-                    "message": "Recording stopped and processed.",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                })
-            except Exception as e:
-                return Response({"error": f"Recording stopped, but script failed: {str(e)}"}, status=500)
-
-        return Response({"error": "No active recording."}, status=400)
+        saltea, meci_id, eroare = _saltea_si_meci(request)
+        if eroare:
+            return Response({"error": eroare}, status=400)
+
+        pipeline = supervizor.opreste(saltea.id, INREGISTRARE)
+        if pipeline is None:
+            return Response({"error": "No active recording."}, status=400)
+
+        job_id = pipeline.job_id
+        ClipMeci.objects.filter(analize__id=job_id).update(sfarsit=timezone.now())
+        if meci_id is not None:
+            JobAnalizaVideo.objects.filter(id=job_id, meci__isnull=True).update(meci_id=meci_id)
+            ClipMeci.objects.filter(analize__id=job_id, meci__isnull=True).update(meci_id=meci_id)
+
+        # Verdictul live este deja salvat; altfel fișierul este analizat în fundal
+        if JobAnalizaVideo.objects.filter(id=job_id, status__in=['in_lucru', 'in_asteptare']).update(
+            status='in_asteptare', data_start=None
+        ):
+            trimite_job(proceseaza_job_analiza, job_id, coada='video')
+            mesaj, cod = "Recording stopped, analysis queued.", status.HTTP_202_ACCEPTED
+        else:
+            mesaj, cod = "Recording stopped, winner detected live.", status.HTTP_200_OK
+
+        job = JobAnalizaVideo.objects.get(id=job_id)
+        return Response({"message": mesaj, **JobAnalizaVideoSerializer(job).data}, status=cod)
+
+class StarePipelineView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        return Response(supervizor.stare())
+
+class JobAnalizaVideoView(APIView):
+    permission_classes = []
+
+    def get(self, request, job_id):
+        job = get_object_or_404(JobAnalizaVideo, id=job_id)
+        return Response(JobAnalizaVideoSerializer(job).data)
+
+class ClipuriMeciView(APIView):
+    permission_classes = []
+
+    def get(self, request, meci_id):
+        clipuri = ClipMeci.objects.filter(meci_id=meci_id).order_by('inceput')
+        return Response(ClipMeciSerializer(clipuri, many=True).data)
+
+class ClipVideoView(APIView):
+    """
+    MP4-ul unui meci înregistrat, tăiat fără re-encodare; ?de_la=&pana_la=
+    (secunde de la începutul meciului) restrâng clipul, de exemplu în jurul
+    unei decizii a arbitrului.
+    """
+    permission_classes = []
+
+    def get(self, request, clip_id):
+        clip = get_object_or_404(ClipMeci, id=clip_id)
+        if clip.sfarsit is None:
+            return Response({"error": "Meciul este încă înregistrat."}, status=status.HTTP_409_CONFLICT)
+        try:
+            de_la = max(0.0, float(request.query_params.get('de_la', 0)))
+            pana_la = request.query_params.get('pana_la')
+            pana_la = float(pana_la) if pana_la is not None else None
+        except ValueError:
+            return Response({"error": "de_la și pana_la trebuie să fie numere de secunde."}, status=400)
+        durata = (clip.sfarsit - clip.inceput).total_seconds()
+        if pana_la is not None and pana_la > durata:
+            pana_la = None
+        if de_la >= (durata if pana_la is None else pana_la):
+            return Response({"error": "Interval gol."}, status=400)
+
+        try:
+            cale = taie_meci(clip, de_la, pana_la)
+        except ClipIndisponibil as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(cale, 'rb'), content_type='video/mp4', filename=f"meci_{clip.meci_id or clip.id}.mp4")
 
 class StartLivestreamView(APIView):
     permission_classes = []
-    process = None
 
     def post(self, request):
-        stream_url = "rtmp://a.rtmp.youtube.com/live2/9hj1-ab4d-s7xz-w51v-85xs"  # înlocuiește cu cheia ta
-        source_url = "http://192.168.1.245:8080/video"  # IP Webcam
-
-        cmd = [
-            "ffmpeg",
-            "-re",
-            "-i", source_url,
-            "-re",
-            "-i", "http://192.168.1.245:8080/audio.wav",
-            "-vcodec", "libx264",
-            "-preset", "veryfast",
-            "-c:a", "aac",
-            "-b:a", "128k",
-            "-async", "1",
-            "-vsync", "cfr",
-            "-r", "25",
-            "-f", "flv",
-            stream_url
-        ]
+        saltea, _, eroare = _saltea_si_meci(request)
+        if eroare:
+            return Response({"error": eroare}, status=400)
+        if not (saltea.stream_url or settings.LIVESTREAM_URL):
+            return Response({"error": "Saltea nu are o destinație de livestream (stream_url)."}, status=400)
 
         try:
-            self.__class__.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
-            return Response({"message": "Livestream started."})
+            pipeline = supervizor.porneste(saltea, LIVESTREAM)
+        except PipelineActiv as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"message": "Livestream started.", **pipeline.stare()})
 
 
 class StopLivestreamView(APIView):
     permission_classes = []
 
     def post(self, request):
-        if StartLivestreamView.process:
-            # Trimite 'q' pentru oprire gracioasă
-            try:
-                StartLivestreamView.process.stdin.write(b'q\n')
-                StartLivestreamView.process.stdin.flush()
-                StartLivestreamView.process.wait(timeout=10)
-            except:
-                # Dacă nu merge, folosește terminate
-                StartLivestreamView.process.terminate()
-                StartLivestreamView.process.wait()
-            
-            StartLivestreamView.process = None
-            return Response({"message": "Livestream stopped."})
-        return Response({"error": "No active livestream."}, status=400)
\ No newline at end of file
+        saltea, _, eroare = _saltea_si_meci(request)
+        if eroare:
+            return Response({"error": eroare}, status=400)
+        if supervizor.opreste(saltea.id, LIVESTREAM) is None:
+            return Response({"error": "No active livestream."}, status=400)
+        return Response({"message": "Livestream stopped."})
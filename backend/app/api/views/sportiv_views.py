@@ -1,15 +1,35 @@
 from rest_framework import viewsets
-from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.rest_framework import DjangoFilterBackend, FilterSet, NumberFilter
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from ..models import Sportiv
+from ..models import Sportiv, Inscriere
+from ..pagination import CursorPaginare
 from ..serializers import SportivSerializer
+from ..utils.revizii import CacheConditionatMixin
 
-class SportivViewSet(viewsets.ModelViewSet):
-    queryset = Sportiv.objects.all()
+class SportivFilter(FilterSet):
+    competitie = NumberFilter(method='filtreaza_competitie')
+
+    class Meta:
+        model = Sportiv
+        fields = ['club']
+
+    def filtreaza_competitie(self, queryset, name, value):
+        # Sportivii înscriși la competiție; subinterogarea evită un DISTINCT pe join
+        return queryset.filter(id__in=Inscriere.objects.filter(competitie=value).values('sportiv'))
+
+class SportivViewSet(CacheConditionatMixin, viewsets.ModelViewSet):
+    queryset = Sportiv.objects.select_related('club')
     serializer_class = SportivSerializer
+    pagination_class = CursorPaginare
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['club']
+    filterset_class = SportivFilter
+
+    def get_resurse_cache(self):
+        competitie = self.request.query_params.get('competitie', '')
+        if competitie.isdigit():
+            return ('sportiv', 'club', f"competitie:{competitie}")
+        return ('sportiv', 'club')
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -19,4 +39,4 @@ class SportivViewSet(viewsets.ModelViewSet):
     def get_authenticators(self):
         if self.request.method == 'GET':
             return []
-        return [JWTAuthentication()]
\ No newline at end of file
+        return [JWTAuthentication()]
@@ -1,328 +1,584 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import time
+"""
+Analiza headless a unei înregistrări: găsește arbitrul și brațul ridicat
+care desemnează câștigătorul.
+
+Cadrele sunt decodate într-un fir separat, iar detecția pozei rulează într-un
+pool de procese. Cât timp nu există un gest candidat sunt analizate puține
+cadre pe secundă; când apare un braț ridicat, analiza se îndesește până la
+confirmare, după care se oprește imediat. Timpii sunt măsurați în timpul
+video-ului, nu în timpul de procesare.
+
+    python process_video.py <video_path> [--procese N] [--complexitate 0|1|2] [--ultimele SECUNDE]
+    python process_video.py <video_path> --benchmark 200
+
+Rezultatul este un obiect JSON pe stdout. analizeaza_flux face aceeași
+analiză în timp real, pe cadrele brute trimise de ffmpeg în timpul înregistrării.
+"""
 from collections import deque
-import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+import multiprocessing
+import argparse
+import queue
+import threading
+import json
+import time
 import sys
+import os
 
-mp_hands = mp.solutions.hands
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+import cv2
+import numpy as np
 
-hands = mp_hands.Hands(max_num_hands=8, min_detection_confidence=0.2, min_tracking_confidence=0.2, model_complexity=1)
-pose = mp_pose.Pose(min_detection_confidence=0.3, min_tracking_confidence=0.3, model_complexity=2)
+# Indicii punctelor MediaPipe Pose folosite
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+# Umăr, cot, încheietură pentru fiecare braț, în ordinea din BRATE
+BRATE = ("Left", "Right")
+PUNCTE_BRATE = np.array([
+    [LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST],
+    [RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST],
+])
 
-if len(sys.argv) < 2:
-    print("Usage: python process_video.py <video_path>")
-    sys.exit(1)
+# Cât timp (secunde video) trebuie ținut brațul ridicat
+DURATA_CONFIRMARE = 0.2
+# Cadre analizate pe secundă de video în căutare și în timpul confirmării
+FPS_CAUTARE = 5
+FPS_CONFIRMARE = 15
+# Cadrele sunt micșorate la această lățime înainte de detecție
+LATIME_ANALIZA = 640
+SCOR_MINIM_ARBITRU = 20
+# Culoarea este măsurată pe zona persoanei micșorată la cel mult atâția pixeli pe latură
+LATURA_ROI = 64
+# Biți păstrați din fiecare canal BGR în tabelul culorilor roșii (64³ intrări)
+BITI_CULOARE = 6
 
-video_path = sys.argv[1]
-cap = cv2.VideoCapture(video_path)
+CASTIGATOR_BRAT = {"Right": "ALBASTRU", "Left": "ALB"}
 
-candidate_arm = None
-gesture_start_time = None
-winner = None
+RED_RANGES = [
+    ([0, 50, 20], [10, 255, 255]),
+    ([160, 50, 20], [180, 255, 255]),
+    ([0, 30, 30], [15, 255, 255]),
+    ([165, 30, 30], [180, 255, 255]),
+]
+# Pragul componentei a* (LAB) peste care un pixel este considerat roșu
+PRAG_LAB_A = 130
 
-referee_history = deque(maxlen=10)
 
-def detect_all_persons(image):
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    results_original = pose.process(image_rgb)
-    
-    persons = []
-    h, w, _ = image.shape
-    
-    if results_original.pose_landmarks:
-        person = extract_person_info(results_original.pose_landmarks, image, "original")
-        if person:
-            persons.append(person)
-    
-    return persons
-
-def extract_person_info(pose_landmarks, image, source=""):
-    landmarks = pose_landmarks.landmark
+@dataclass
+class Rezultat:
+    castigator: str | None = None
+    brat: str | None = None
+    moment_secunde: float | None = None
+    durata_video: float = 0.0
+    fps_video: float = 0.0
+    cadre_totale: int = 0
+    cadre_citite: int = 0
+    cadre_analizate: int = 0
+    cadre_cu_arbitru: int = 0
+    durata_procesare: float = 0.0
+    eroare: str | None = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+# ---------- În procesele din pool ----------
+
+_pose = None
+
+
+def _init_worker(complexitate, imagini_independente):
+    """Fiecare proces își încarcă o singură dată modelul de poză."""
+    global _pose
+    import mediapipe as mp
+    # Cadrele distribuite pe mai multe procese nu sunt consecutive,
+    # deci urmărirea între cadre nu ajută
+    _pose = mp.solutions.pose.Pose(
+        static_image_mode=imagini_independente,
+        model_complexity=complexitate,
+        min_detection_confidence=0.3,
+        min_tracking_confidence=0.3,
+    )
+
+
+def analyze_frame(image):
+    """
+    Detecția pozei și scorul de arbitru pentru un cadru BGR. Întoarce doar
+    date simple (picklable), sau None dacă în cadru nu este un arbitru plauzibil.
+    """
+    results = _pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    if not results.pose_landmarks:
+        return None
+
+    person = extract_person_info(landmark_array(results.pose_landmarks), image)
+    if person is None:
+        return None
+
     h, w, _ = image.shape
-    
-    visible_landmarks = sum(1 for lm in landmarks if lm.visibility > 0.5)
-    if visible_landmarks < 5:
+    scores = calculate_referee_score(person, image, w, h)
+    if scores["total_score"] <= SCOR_MINIM_ARBITRU:
         return None
-    
-    visible_x = [lm.x for lm in landmarks if lm.visibility > 0.5]
-    visible_y = [lm.y for lm in landmarks if lm.visibility > 0.5]
-    
-    if not visible_x or not visible_y:
+    return {**person, "scores": scores}
+
+
+def landmark_array(pose_landmarks):
+    """Punctele MediaPipe ca tablou (33, 3) de (x, y, visibility) normalizate."""
+    return np.array([(lm.x, lm.y, lm.visibility) for lm in pose_landmarks.landmark], dtype=np.float32)
+
+
+def extract_person_info(landmarks, image):
+    h, w, _ = image.shape
+
+    vizibile = landmarks[landmarks[:, 2] > 0.5, :2]
+    if len(vizibile) < 5:
         return None
-    
-    x1 = int(min(visible_x) * w)
-    x2 = int(max(visible_x) * w)
-    y1 = int(min(visible_y) * h)
-    y2 = int(max(visible_y) * h)
-    
+
+    (x1, y1), (x2, y2) = vizibile.min(axis=0) * (w, h), vizibile.max(axis=0) * (w, h)
+    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
     padding_x = int((x2 - x1) * 0.2)
     padding_y = int((y2 - y1) * 0.1)
-    
+
     x1 = max(0, x1 - padding_x)
     x2 = min(w, x2 + padding_x)
     y1 = max(0, y1 - padding_y)
     y2 = min(h, y2 + padding_y)
-    
-    area = (x2 - x1) * (y2 - y1)
-    
-    nose = landmarks[mp_pose.PoseLandmark.NOSE]
-    center_x = nose.x * w if nose.visibility > 0.5 else (x1 + x2) / 2
-    center_y = nose.y * h if nose.visibility > 0.5 else (y1 + y2) / 2
-    
+
+    nose_x, nose_y, nose_v = landmarks[NOSE]
     return {
         "bbox": (x1, y1, x2, y2),
-        "center_x": center_x,
-        "center_y": center_y,
-        "area": area,
-        "pose_landmarks": pose_landmarks,
-        "visibility_score": visible_landmarks,
-        "source": source
+        "center_x": float(nose_x * w) if nose_v > 0.5 else (x1 + x2) / 2,
+        "center_y": float(nose_y * h) if nose_v > 0.5 else (y1 + y2) / 2,
+        "area": (x2 - x1) * (y2 - y1),
+        "landmarks": landmarks,
+        "visibility_score": len(vizibile),
     }
 
-def enhanced_color_detection(image, bbox):
+
+@lru_cache(maxsize=None)
+def tabel_rosu(biti=BITI_CULOARE):
+    """
+    Tabelul pixelilor roși, indexat după culoarea BGR redusă la `biti` biți pe
+    canal: calculat o singură dată cu aceleași praguri HSV și LAB, în loc de
+    două conversii și patru măști pentru fiecare cadru.
+    """
+    nivele = 1 << biti
+    pas = 256 >> biti
+    valori = (np.arange(nivele) * pas + pas // 2).astype(np.uint8)
+    culori = np.stack(np.meshgrid(valori, valori, valori, indexing="ij"), axis=-1).reshape(-1, 1, 3)
+
+    hsv = cv2.cvtColor(culori, cv2.COLOR_BGR2HSV)
+    rosu = cv2.cvtColor(culori, cv2.COLOR_BGR2LAB)[..., 1] > PRAG_LAB_A
+    for lower, upper in RED_RANGES:
+        rosu |= np.all((hsv >= lower) & (hsv <= upper), axis=-1)
+    return rosu.reshape(-1).astype(np.uint8) * 255
+
+
+def roi_micsorat(image, bbox, latura=LATURA_ROI):
     x1, y1, x2, y2 = bbox
     roi = image[y1:y2, x1:x2]
-    
+    h, w = roi.shape[:2]
+    if max(h, w) > latura:
+        scara = latura / max(h, w)
+        roi = cv2.resize(roi, (max(1, round(w * scara)), max(1, round(h * scara))), interpolation=cv2.INTER_AREA)
+    return roi
+
+
+def masca_rosie(image, biti=BITI_CULOARE):
+    """Masca (0/255) pixelilor roșii ai unei imagini BGR, citită din tabel_rosu."""
+    canale = (image >> (8 - biti)).astype(np.intp)
+    index = (canale[..., 0] << (2 * biti)) | (canale[..., 1] << biti) | canale[..., 2]
+    return tabel_rosu(biti)[index]
+
+
+def enhanced_color_detection(image, bbox, biti=BITI_CULOARE):
+    """Proporția de pixeli roșii din zona persoanei."""
+    roi = roi_micsorat(image, bbox)
     if roi.size == 0:
         return 0.0
-    
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    lab = cv2.cvtColor(roi, cv2.COLOR_BGR2LAB)
-    
-    red_masks_hsv = []
-    red_ranges = [
-        ([0, 50, 20], [10, 255, 255]),
-        ([160, 50, 20], [180, 255, 255]),
-        ([0, 30, 30], [15, 255, 255]),
-        ([165, 30, 30], [180, 255, 255])
-    ]
-    
-    for lower, upper in red_ranges:
-        mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
-        red_masks_hsv.append(mask)
-    
-    hsv_mask = cv2.bitwise_or(red_masks_hsv[0], red_masks_hsv[1])
-    for mask in red_masks_hsv[2:]:
-        hsv_mask = cv2.bitwise_or(hsv_mask, mask)
-    
-    a_channel = lab[:, :, 1]
-    lab_mask = cv2.threshold(a_channel, 130, 255, cv2.THRESH_BINARY)[1]
-    
-    combined_mask = cv2.bitwise_or(hsv_mask, lab_mask)
-    
+
+    mask = masca_rosie(roi, biti)
     kernel = np.ones((3, 3), np.uint8)
-    combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
-    combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
-    
-    red_ratio = np.sum(combined_mask > 0) / combined_mask.size
-    return red_ratio
-
-def calculate_referee_score(person, image_width, image_height):
-    score = 0.0
-    
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+
+    return np.count_nonzero(mask) / mask.size
+
+
+def calculate_referee_score(person, image, image_width, image_height):
     center_offset = abs(person["center_x"] - image_width / 2) / (image_width / 2)
     center_score = max(0, 40 * (1 - center_offset))
-    score += center_score
-    
-    image_area = image_width * image_height
-    size_ratio = person["area"] / image_area
+
+    size_ratio = person["area"] / (image_width * image_height)
     size_score = min(20, size_ratio * 1000)
-    score += size_score
-    
-    red_ratio = enhanced_color_detection(cv2.cvtColor(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), cv2.COLOR_RGB2BGR), person["bbox"])
+
+    red_ratio = enhanced_color_detection(image, person["bbox"])
     red_score = min(30, red_ratio * 75)
-    score += red_score
-    
+
     visibility_score = min(10, person["visibility_score"] / 2)
-    score += visibility_score
-    
+
     return {
-        "total_score": score,
+        "total_score": center_score + size_score + red_score + visibility_score,
         "center_score": center_score,
         "size_score": size_score,
         "red_score": red_score,
         "visibility_score": visibility_score,
-        "red_ratio": red_ratio
+        "red_ratio": float(red_ratio),
     }
 
-def find_referee_advanced(image):
-    persons = detect_all_persons(image)
-    
-    if not persons:
-        return None
-    
-    h, w, _ = image.shape
-    best_referee = None
-    best_score = 0
-    
-    for person in persons:
-        scores = calculate_referee_score(person, w, h)
-        
-        if scores["total_score"] > best_score and scores["total_score"] > 20:
-            best_score = scores["total_score"]
-            best_referee = {
-                **person,
-                "scores": scores
-            }
-    
-    if best_referee:
-        referee_history.append(best_referee)
-        
-        if len(referee_history) >= 3:
-            recent_centers = [ref["center_x"] for ref in list(referee_history)[-3:]]
-            center_variance = np.var(recent_centers)
-            
-            if center_variance > (w * 0.1) ** 2:
-                return None
-    
-    return best_referee
-
-def calculate_arm_angle(shoulder, elbow, wrist):
-    upper_arm = np.array([elbow.x - shoulder.x, elbow.y - shoulder.y])
-    forearm = np.array([wrist.x - elbow.x, wrist.y - elbow.y])
-    
-    full_arm = np.array([wrist.x - shoulder.x, wrist.y - shoulder.y])
-    
-    angle_rad = math.atan2(-full_arm[1], full_arm[0])
-    angle_deg = math.degrees(angle_rad)
-    
-    if angle_deg > 180:
-        angle_deg -= 360
-    elif angle_deg < -180:
-        angle_deg += 360
-    
-    return angle_deg
+
+# ---------- În procesul principal ----------
 
 def detect_raised_arms(referee):
-    if not referee or not referee["pose_landmarks"]:
+    """Brațele ridicate, calculate pentru ambele brațe deodată."""
+    if not referee:
         return []
-    
-    landmarks = referee["pose_landmarks"].landmark
-    raised_arms = []
-    
-    left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-    right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-    left_elbow = landmarks[mp_pose.PoseLandmark.LEFT_ELBOW]
-    right_elbow = landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW]
-    left_wrist = landmarks[mp_pose.PoseLandmark.LEFT_WRIST]
-    right_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST]
-    
-    if (left_shoulder.visibility > 0.5 and left_elbow.visibility > 0.5 and left_wrist.visibility > 0.5):
-        left_angle = calculate_arm_angle(left_shoulder, left_elbow, left_wrist)
-        
-        conditions_left = [
-            45 <= left_angle <= 135,
-            left_wrist.y < left_shoulder.y,
-            left_elbow.y <= left_shoulder.y + 0.1,
-            (left_shoulder.y - left_wrist.y) > 0.05,
-        ]
-        
-        relaxed_conditions_left = [
-            30 <= left_angle <= 150,
-            left_wrist.y < left_shoulder.y,
-            left_elbow.y < left_shoulder.y + 0.15,
-        ]
-        
-        if sum(conditions_left) >= 3 or sum(relaxed_conditions_left) >= 2:
-            raised_arms.append("Left")
-    
-    if (right_shoulder.visibility > 0.5 and right_elbow.visibility > 0.5 and right_wrist.visibility > 0.5):
-        right_angle = calculate_arm_angle(right_shoulder, right_elbow, right_wrist)
-        
-        conditions_right = [
-            45 <= right_angle <= 135,
-            right_wrist.y < right_shoulder.y,
-            right_elbow.y <= right_shoulder.y + 0.1,
-            (right_shoulder.y - right_wrist.y) > 0.05,
-        ]
-        
-        relaxed_conditions_right = [
-            30 <= right_angle <= 150,
-            right_wrist.y < right_shoulder.y,
-            right_elbow.y < right_shoulder.y + 0.15,
-        ]
-        
-        if sum(conditions_right) >= 3 or sum(relaxed_conditions_right) >= 2:
-            raised_arms.append("Right")
-    
-    return raised_arms
-
-def draw_visual_feedback(image, referee, raised_arms, candidate_arm, gesture_start_time, winner):
-    if referee is None:
-        cv2.putText(image, "Cautam arbitrul...", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        return
-    
-    if winner:
-        status_text = f"Winner: {winner}!"
-        cv2.putText(image, status_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
-    else:
-        status_text = "Ridica un brat pentru a decide castigatorul"
-        cv2.putText(image, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        if candidate_arm:
-            elapsed_time = time.time() - gesture_start_time
-            countdown = max(0, 0.5 - elapsed_time)
-            cv2.putText(image, f"Timp ramas: {countdown:.1f}s", (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.putText(image, f"Detectat: {candidate_arm}", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-
-frame_count = 0
-show_visual = True
-
-while cap.isOpened():
-    success, image = cap.read()
-    if not success:
-        break
-    
-    frame_count += 1
-    original_image = image.copy()
-    
-    if frame_count % 4 == 0:
-        continue
-    
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    image_height, image_width, _ = image.shape
-    
-    referee = find_referee_advanced(image)
-    
-    if referee is None:
-        if show_visual:
-            draw_visual_feedback(image, None, [], candidate_arm, gesture_start_time, winner)
-            cv2.imshow('Arm Tracking', image)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+
+    # (braț, umăr/cot/încheietură, x/y/visibility)
+    puncte = referee["landmarks"][PUNCTE_BRATE]
+    umar, cot, incheietura = puncte[:, 0], puncte[:, 1], puncte[:, 2]
+    vizibile = puncte[:, :, 2].min(axis=1) > 0.5
+
+    angle = np.degrees(np.arctan2(-(incheietura[:, 1] - umar[:, 1]), incheietura[:, 0] - umar[:, 0]))
+    incheietura_sus = incheietura[:, 1] < umar[:, 1]
+    conditions = (
+        ((45 <= angle) & (angle <= 135)).astype(int)
+        + incheietura_sus
+        + (cot[:, 1] <= umar[:, 1] + 0.1)
+        + ((umar[:, 1] - incheietura[:, 1]) > 0.05)
+    )
+    relaxed_conditions = (
+        ((30 <= angle) & (angle <= 150)).astype(int)
+        + incheietura_sus
+        + (cot[:, 1] < umar[:, 1] + 0.15)
+    )
+    ridicate = vizibile & ((conditions >= 3) | (relaxed_conditions >= 2))
+    return [brat for brat, ridicat in zip(BRATE, ridicate) if ridicat]
+
+
+def micsoreaza(image, latime):
+    h, w, _ = image.shape
+    if w > latime:
+        image = cv2.resize(image, (latime, round(h * latime / w)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+class DecodorCadre(threading.Thread):
+    """
+    Citește video-ul și pune în coadă (index, secunda_video, cadru) pentru
+    cadrele alese. Pasul dintre cadre se schimbă prin `mod_confirmare`;
+    cadrele sărite sunt doar avansate (grab), fără decodarea imaginii.
+    """
+
+    def __init__(self, cap, fps, fps_cautare, fps_confirmare, latime, marime_coada, index_start=0):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.index_start = index_start
+        self.fps = fps
+        self.pas_cautare = max(1, round(fps / fps_cautare))
+        self.pas_confirmare = max(1, round(fps / fps_confirmare))
+        self.latime = latime
+        self.coada = queue.Queue(maxsize=marime_coada)
+        self.mod_confirmare = threading.Event()
+        self.oprire = threading.Event()
+        self.cadre_citite = 0
+
+    def run(self):
+        index = self.index_start - 1
+        urmatorul = self.index_start
+        try:
+            while not self.oprire.is_set():
+                if not self.cap.grab():
+                    break
+                index += 1
+                if index < urmatorul:
+                    continue
+
+                ok, image = self.cap.retrieve()
+                if not ok:
+                    break
+                image = micsoreaza(image, self.latime)
+
+                pas = self.pas_confirmare if self.mod_confirmare.is_set() else self.pas_cautare
+                urmatorul = index + pas
+                self._pune((index, index / self.fps, image))
+        finally:
+            self.cadre_citite = index + 1 - self.index_start
+            self._pune(None)
+
+    def _pune(self, element):
+        while not self.oprire.is_set():
+            try:
+                self.coada.put(element, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class UrmarireGest:
+    """
+    Starea gestului arbitrului, pe timpul video: un singur braț ridicat,
+    ținut cel puțin DURATA_CONFIRMARE secunde, desemnează câștigătorul.
+    """
+
+    def __init__(self, latime_cadru):
+        self.latime_cadru = latime_cadru
+        self.istoric_arbitru = deque(maxlen=10)
+        self.brat_candidat = None
+        self.start_gest = None
+
+    def arbitru_stabil(self, referee):
+        self.istoric_arbitru.append(referee["center_x"])
+        if len(self.istoric_arbitru) < 3:
+            return True
+        return np.var(list(self.istoric_arbitru)[-3:]) <= (self.latime_cadru * 0.1) ** 2
+
+    def observa(self, referee, secunda, rezultat):
+        """
+        Rezultatul detecției pentru un cadru, în ordinea cadrelor. La confirmarea
+        gestului completează `rezultat` și întoarce True.
+        """
+        rezultat.cadre_analizate += 1
+        # Un cadru fără arbitru (sau cu arbitrul sărind) nu întrerupe gestul
+        if referee is None:
+            return False
+        rezultat.cadre_cu_arbitru += 1
+        if not self.arbitru_stabil(referee):
+            return False
+
+        brat = self.actualizeaza(referee, secunda)
+        if brat is None:
+            return False
+        rezultat.brat = brat
+        rezultat.castigator = CASTIGATOR_BRAT[brat]
+        rezultat.moment_secunde = round(secunda, 2)
+        return True
+
+    def actualizeaza(self, referee, secunda):
+        """Întoarce brațul confirmat sau None."""
+        raised_arms = detect_raised_arms(referee)
+        if len(raised_arms) != 1:
+            self.brat_candidat = self.start_gest = None
+            return None
+
+        if self.brat_candidat != raised_arms[0]:
+            self.brat_candidat, self.start_gest = raised_arms[0], secunda
+            return None
+        if secunda - self.start_gest >= DURATA_CONFIRMARE:
+            return self.brat_candidat
+        return None
+
+
+def creeaza_pool(procese, complexitate):
+    """
+    Pool-ul de procese pentru detecția pozei. "spawn": procesul părinte poate
+    fi un server cu fire active, în care fork-ul nu este sigur.
+    """
+    return ProcessPoolExecutor(
+        max_workers=procese, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(complexitate, procese > 1),
+    )
+
+
+def analizeaza_video(video_path, procese=None, complexitate=1, fps_cautare=FPS_CAUTARE,
+                     fps_confirmare=FPS_CONFIRMARE, latime=LATIME_ANALIZA, de_la=0.0, ultimele=None):
+    """
+    Analizează înregistrarea și întoarce un Rezultat. Se oprește la primul
+    câștigător confirmat. Analiza începe la secunda `de_la` sau, cu `ultimele`,
+    cu atâtea secunde înainte de sfârșit; momentele rămân măsurate de la
+    începutul fișierului.
+    """
+    start = time.perf_counter()
+    rezultat = Rezultat()
+    procese = procese or max(1, (os.cpu_count() or 2) // 2)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        rezultat.eroare = f"Nu s-a putut deschide {video_path}"
+        return rezultat
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    rezultat.fps_video = fps
+    rezultat.cadre_totale = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    rezultat.durata_video = round(rezultat.cadre_totale / fps, 2)
+
+    if ultimele:
+        de_la = max(de_la, rezultat.durata_video - ultimele)
+    index_start = int(de_la * fps) if de_la > 0 else 0
+    if index_start:
+        # Căutarea sare direct la cadrul cheie anterior, fără decodarea cadrelor dinainte
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index_start)
+
+    decodor = DecodorCadre(cap, fps, fps_cautare, fps_confirmare, latime, marime_coada=procese * 4, index_start=index_start)
+    urmarire = None
+    in_lucru = deque()
+
+    pool = creeaza_pool(procese, complexitate)
+    decodor.start()
+    try:
+        terminat = False
+        while not terminat or in_lucru:
+            # Pool-ul primește cel mult două cadre pe proces, ca ordinea să fie păstrată ieftin
+            while not terminat and len(in_lucru) < procese * 2:
+                element = decodor.coada.get()
+                if element is None:
+                    terminat = True
+                    break
+                index, secunda, image = element
+                if urmarire is None:
+                    urmarire = UrmarireGest(image.shape[1])
+                in_lucru.append((secunda, pool.submit(analyze_frame, image)))
+
+            if not in_lucru:
+                break
+            secunda, viitor = in_lucru.popleft()
+            if urmarire.observa(viitor.result(), secunda, rezultat):
                 break
-        continue
-    
-    raised_arms = detect_raised_arms(referee)
-    
-    if winner is None:
-        if len(raised_arms) == 1:
-            current_arm = raised_arms[0]
-            if candidate_arm == current_arm:
-                if time.time() - gesture_start_time >= 0.2:
-                    winner = "ALBASTRU" if current_arm == "Right" else "ALB"
+            if urmarire.brat_candidat:
+                decodor.mod_confirmare.set()
             else:
-                candidate_arm = current_arm
-                gesture_start_time = time.time()
-        else:
-            candidate_arm = None
-            gesture_start_time = None
-    
-    if show_visual:
-        draw_visual_feedback(image, referee, raised_arms, candidate_arm, gesture_start_time, winner)
-        cv2.imshow('Arm Tracking', image)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+                decodor.mod_confirmare.clear()
+    finally:
+        decodor.oprire.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        decodor.join()
+        cap.release()
+
+    rezultat.cadre_citite = decodor.cadre_citite
+    rezultat.durata_procesare = round(time.perf_counter() - start, 3)
+    return rezultat
+
+
+def cadre_rawvideo(flux, latime, inaltime):
+    """Cadrele BGR dintr-un flux rawvideo bgr24 (de exemplu stdout-ul lui ffmpeg)."""
+    marime = latime * inaltime * 3
+    while True:
+        date = flux.read(marime)
+        if len(date) < marime:
+            return
+        yield np.frombuffer(date, np.uint8).reshape(inaltime, latime, 3)
+
+
+def analizeaza_flux(cadre, fps, pool, la_verdict=None):
+    """
+    Analizează cadrele unui flux live pe măsură ce sosesc. Cât timp procesul de
+    detecție lucrează, cadrele noi sunt sărite, deci producătorul fluxului nu
+    așteaptă niciodată după analiză. `la_verdict(rezultat)` este apelat imediat
+    ce gestul este confirmat; după aceea cadrele sunt doar consumate până la
+    sfârșitul fluxului.
+    """
+    start = time.perf_counter()
+    rezultat = Rezultat(fps_video=fps)
+    urmarire = None
+    in_lucru = None
+
+    def primeste(secunda, viitor):
+        try:
+            referee = viitor.result()
+        except Exception as e:
+            rezultat.eroare = f"Detecția a eșuat: {e}"
+            return
+        if urmarire.observa(referee, secunda, rezultat) and la_verdict:
+            rezultat.durata_procesare = round(time.perf_counter() - start, 3)
+            la_verdict(rezultat)
+
+    for index, image in enumerate(cadre):
+        rezultat.cadre_citite += 1
+        if rezultat.castigator or rezultat.eroare:
+            continue
+        if in_lucru is not None and in_lucru[1].done():
+            primeste(*in_lucru)
+            in_lucru = None
+        if in_lucru is None and not (rezultat.castigator or rezultat.eroare):
+            if urmarire is None:
+                urmarire = UrmarireGest(image.shape[1])
+            in_lucru = (index / fps, pool.submit(analyze_frame, image))
+
+    if in_lucru is not None and not (rezultat.castigator or rezultat.eroare):
+        primeste(*in_lucru)
+
+    rezultat.cadre_totale = rezultat.cadre_citite
+    rezultat.durata_video = round(rezultat.cadre_citite / fps, 2)
+    if not rezultat.castigator:
+        rezultat.durata_procesare = round(time.perf_counter() - start, 3)
+    return rezultat
+
+
+def masoara_etape(video_path, cadre=200, complexitate=1, latime=LATIME_ANALIZA):
+    """
+    Micro-benchmark: cadre pe secundă pentru fiecare etapă a analizei unui cadru,
+    rulate secvențial în procesul curent pe primele `cadre` cadre ale video-ului.
+    Etapele de după detecția pozei primesc doar cadrele în care a fost găsită
+    o persoană.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"eroare": f"Nu s-a putut deschide {video_path}"}
+
+    durate, numar = {}, {}
+
+    def etapa(nume, functie, intrari):
+        start = time.perf_counter()
+        iesiri = [functie(x) for x in intrari]
+        durate[nume], numar[nume] = time.perf_counter() - start, len(intrari)
+        return iesiri
+
+    start = time.perf_counter()
+    imagini = []
+    while len(imagini) < cadre:
+        ok, image = cap.read()
+        if not ok:
             break
+        imagini.append(image)
+    cap.release()
+    durate["decodare"], numar["decodare"] = time.perf_counter() - start, len(imagini)
+
+    imagini = etapa("micsorare", lambda image: micsoreaza(image, latime), imagini)
+    _init_worker(complexitate, False)
+    poze = etapa("poza", lambda image: _pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)).pose_landmarks, imagini)
+    cu_poza = [(image, poza) for image, poza in zip(imagini, poze) if poza]
+    persoane = etapa("puncte", lambda x: extract_person_info(landmark_array(x[1]), x[0]), cu_poza)
+    cu_persoana = [(image, person) for (image, _), person in zip(cu_poza, persoane) if person]
+    # Tabelul culorilor este construit o singură dată per proces, în afara măsurătorii
+    tabel_rosu(BITI_CULOARE)
+    etapa("culoare", lambda x: enhanced_color_detection(x[0], x[1]["bbox"]), cu_persoana)
+    etapa("gest", lambda x: detect_raised_arms(x[1]), cu_persoana)
+
+    return {
+        nume: {"cadre": numar[nume], "fps": round(numar[nume] / durate[nume], 1) if durate[nume] > 0 else None}
+        for nume in durate
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detectează câștigătorul din gestul arbitrului.")
+    parser.add_argument("video_path")
+    parser.add_argument("--procese", type=int, default=None, help="Procese pentru detecția pozei")
+    parser.add_argument("--complexitate", type=int, choices=(0, 1, 2), default=1, help="model_complexity MediaPipe")
+    parser.add_argument("--fps-cautare", type=float, default=FPS_CAUTARE)
+    parser.add_argument("--fps-confirmare", type=float, default=FPS_CONFIRMARE)
+    parser.add_argument("--latime", type=int, default=LATIME_ANALIZA)
+    parser.add_argument("--de-la", type=float, default=0.0, help="Secunda de la care începe analiza")
+    parser.add_argument("--ultimele", type=float, default=None, help="Analizează doar ultimele N secunde")
+    parser.add_argument("--benchmark", type=int, metavar="CADRE", help="Măsoară cadrele pe secundă ale fiecărei etape")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        etape = masoara_etape(args.video_path, args.benchmark, args.complexitate, args.latime)
+        print(json.dumps(etape, ensure_ascii=False))
+        return 1 if "eroare" in etape else 0
+
+    rezultat = analizeaza_video(
+        args.video_path, procese=args.procese, complexitate=args.complexitate,
+        fps_cautare=args.fps_cautare, fps_confirmare=args.fps_confirmare, latime=args.latime,
+        de_la=args.de_la, ultimele=args.ultimele,
+    )
+    print(json.dumps(rezultat.to_dict(), ensure_ascii=False))
+    return 1 if rezultat.eroare else 0
 
-cap.release()
-if show_visual:
-    cv2.destroyAllWindows()
 
-if winner:
-    print(f"Winner: {winner}")
-else:
-    print("Nu s-a putut detecta un castigator.")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Fluxul de evenimente (competitii/<id>/evenimente/) ține conexiunile deschise
+și folosește un broadcaster în memorie, deci trebuie servit de un singur
+proces ASGI (de exemplu `uvicorn core.asgi:application`).
 """
 
 import os
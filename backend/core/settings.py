@@ -86,6 +86,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'app.api.middleware.InstrumentareMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -123,6 +124,10 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# Finalizarea meciurilor blochează rândurile categoriei (select_for_update). Pe
+# SQLite, care blochează toată baza, finalizările simultane sunt reluate automat;
+# OPTIONS {'transaction_mode': 'IMMEDIATE', 'timeout': 20} le face să aștepte
+# în loc să fie reluate.
 
 DATABASES = {
     'default': {
@@ -176,3 +181,49 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Numărul de fire pentru joburile în fundal (importuri, analize video)
+JOBURI_WORKERS = config('JOBURI_WORKERS', default=2, cast=int)
+JOBURI_WORKERS_VIDEO = config('JOBURI_WORKERS_VIDEO', default=1, cast=int)
+# Joburile rulează pe firul request-ului, după commit (benchmark-uri, depanare)
+JOBURI_SINCRON = config('JOBURI_SINCRON', default=False, cast=bool)
+
+# Înregistrările meciurilor și procesele de detecție a pozei per analiză (implicit jumătate din nuclee)
+INREGISTRARI_DIR = config('INREGISTRARI_DIR', default=str(BASE_DIR / 'inregistrari'))
+# Segmentele care nu aparțin niciunui meci și clipurile tăiate sunt șterse după N ore (curata_inregistrari)
+INREGISTRARI_RETENTIE_ORE = config('INREGISTRARI_RETENTIE_ORE', default=24, cast=float)
+ANALIZA_VIDEO_PROCESE = config('ANALIZA_VIDEO_PROCESE', default=0, cast=int)
+# Analiza după oprire caută gestul arbitrului doar în ultimele N secunde ale meciului (0 = tot meciul)
+ANALIZA_VIDEO_ULTIMELE_SECUNDE = config('ANALIZA_VIDEO_ULTIMELE_SECUNDE', default=30, cast=int)
+# Sursele implicite pentru saltelele fără camera_url / audio_url / stream_url proprii
+CAMERA_URL_IMPLICITA = config('CAMERA_URL_IMPLICITA', default='http://192.168.1.245:8080/video')
+AUDIO_URL_IMPLICITA = config('AUDIO_URL_IMPLICITA', default='http://192.168.1.245:8080/audio.wav')
+LIVESTREAM_URL = config('LIVESTREAM_URL', default='')
+
+# Analiza live: ffmpeg trimite în timpul înregistrării cadre brute unui proces de detecție păstrat pornit
+ANALIZA_LIVE = config('ANALIZA_LIVE', default=True, cast=bool)
+ANALIZA_LIVE_FPS = config('ANALIZA_LIVE_FPS', default=8, cast=int)
+ANALIZA_LIVE_COMPLEXITATE = config('ANALIZA_LIVE_COMPLEXITATE', default=1, cast=int)
+
+# Instrumentarea requesturilor (Server-Timing, /metrics). METRICI_LENTE > 0 păstrează
+# cele mai lente N requesturi cu interogările lor, vizibile la /metrics/lente
+METRICI_ACTIVE = config('METRICI_ACTIVE', default=True, cast=bool)
+METRICI_LENTE = config('METRICI_LENTE', default=0, cast=int)
+METRICI_TOKEN = config('METRICI_TOKEN', default='')
+
+# Răspunsurile GET publice sunt păstrate în memorie, indexate după revizia datelor;
+# la depășirea numărului maxim de intrări sunt eliminate cele folosite cel mai demult
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'raspunsuri': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'raspunsuri',
+        'TIMEOUT': config('CACHE_RASPUNSURI_TIMEOUT', default=3600, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_RASPUNSURI_MAX', default=500, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
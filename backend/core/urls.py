@@ -16,9 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from app.api.views.metrici_views import metrici, requesturi_lente
 
 
 urlpatterns = [
         path('admin/', admin.site.urls),
         path('api/', include('app.api.urls')),
+        path('metrics', metrici, name='metrici'),
+        path('metrics/lente', requesturi_lente, name='requesturi_lente'),
 ]
@@ -17,9 +17,9 @@ export default function App() {
             <AuthProvider>
                 <Routes>
                     <Route path="/" element={<Home />} />
-                    <Route path="/brackets" element={<Brackets />} />
                     <Route path="/competitions" element={<Competitions />} />
                     <Route path="/competition/:id" element={<CompetitionPage />} />
+                    <Route path="/competition/:id/brackets" element={<Brackets />} />
                     <Route path="/login" element={<Login />} />
                     <Route path="/register" element={<Register />} />
                     <Route path="/match-dashboard" element={<MatchDashboard />} />
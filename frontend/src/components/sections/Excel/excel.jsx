@@ -133,6 +133,17 @@ const Excel = () => {
         }
     };
 
+    const waitForImport = async (jobId, token) => {
+        const headers = token ? { Authorization: `Bearer ${token}` } : {};
+        while (true) {
+            const response = await axios.get(`${API_URL}/competitii/${competitionId}/imports/${jobId}/`, { headers });
+            if (response.data.status === "finalizat" || response.data.status === "esuat") {
+                return response.data;
+            }
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
+    };
+
     const uploadExcel = async () => {
         if (!file) return;
 
@@ -157,9 +168,27 @@ const Excel = () => {
 
             const response = await axios.post(`${API_URL}/competitii/${competitionId}/upload-participants/`, formData, { headers });
 
+            // Importul rulează în fundal; urmărim jobul până se termină
+            const job = await waitForImport(response.data.id, token);
+            if (job.status === "esuat" || (job.randuri_adaugate === 0 && job.randuri_existente === 0 && job.erori.length > 0)) {
+                setUploadError(job.mesaj || "Niciun rand din fisier nu a putut fi importat.");
+                setErrorDetails(job.erori);
+                showSnackbar(job.mesaj || "Niciun rand din fisier nu a putut fi importat.", "error");
+                return;
+            }
+
             setUploadSuccess(true);
             setFile(null);
-            showSnackbar(`Sportivii au fost adăugați cu succes!`, "success");
+            setErrorDetails(job.erori);
+            const blocate = job.brackets?.blocate || [];
+            if (blocate.length > 0) {
+                showSnackbar(
+                    `${job.randuri_adaugate} înscrieri noi. Bracket-uri neregenerate (au meciuri disputate): ${blocate.map((c) => c.nume).join(", ")}`,
+                    "warning"
+                );
+            } else {
+                showSnackbar(`Sportivii au fost adăugați cu succes! (${job.randuri_adaugate} înscrieri noi)`, "success");
+            }
         } catch (error) {
             console.error("Eroare la încărcarea fișierului:", error);
 
@@ -2,7 +2,7 @@ import { useState, useEffect, useMemo, useCallback } from "react";
 import { Bracket, Seed, SeedItem, SeedTeam } from "react-brackets";
 import { Select, MenuItem, FormControl, InputLabel, Box, Typography, Grid } from "@mui/material";
 import axios from "axios";
-import { useNavigate, useLocation, useSearchParams } from "react-router-dom";
+import { useNavigate, useLocation, useParams, useSearchParams } from "react-router-dom";
 import Navbar from "../../components/sections/Navbar/navbar";
 import API_URL from "../../config";
 
@@ -74,10 +74,49 @@ const CustomSeed = ({ seed, breakpoint }) => {
     );
 };
 
+// Numele afișat ca în lista de meciuri: "Nume Prenume (Club)"
+const numeSportiv = (sportiv) => (sportiv.club ? `${sportiv.nume} (${sportiv.club})` : sportiv.nume);
+
+// Bracket-urile competiției într-o singură cerere: categoriile vin cu proba și meciurile lor,
+// iar meciurile cu sportivii și cluburile deja unite
+const fetchBrackets = async (apiClient, competitieId) => {
+    const res = await apiClient.get(`${API_URL}/competitions/${competitieId}/brackets/`);
+
+    const catMap = {};
+    const probaMap = {};
+    const sportiviMap = {};
+    const meciuri = [];
+    res.data.categorii.forEach((cat) => {
+        catMap[cat.id] = {
+            proba: cat.proba.id,
+            sex: cat.sex,
+            varsta_min: cat.varsta_min,
+            varsta_max: cat.varsta_max,
+            categorie_greutate: cat.categorie_greutate,
+        };
+        probaMap[cat.proba.id] = cat.proba.nume;
+        cat.meciuri.forEach((m) => {
+            [m.sportiv1, m.sportiv2].forEach((s) => {
+                if (s) sportiviMap[s.id] = numeSportiv(s);
+            });
+            meciuri.push({
+                ...m,
+                competitie: res.data.competitie,
+                categorie: cat.id,
+                sportiv1: m.sportiv1?.id ?? null,
+                sportiv2: m.sportiv2?.id ?? null,
+            });
+        });
+    });
+
+    return { meciuri, catMap, probaMap, sportiviMap };
+};
+
 const BracketPage = () => {
     const apiClient = axios.create({ timeout: 5000, headers: { "Content-Type": "application/json" } });
     const navigate = useNavigate();
     const location = useLocation();
+    const { id: competitieId } = useParams();
     const [searchParams, setSearchParams] = useSearchParams();
 
     const [bracketData, setBracketData] = useState([]);
@@ -91,6 +130,7 @@ const BracketPage = () => {
     const [categoriiMap, setCategoriiMap] = useState({});
     const [isLoading, setIsLoading] = useState(false);
     const [dataLoaded, setDataLoaded] = useState(false);
+    const [sportiviNume, setSportiviNume] = useState({});
 
     const updateURL = useCallback(
         (categoryId, sexValue, ageValue, weightValue) => {
@@ -157,79 +197,41 @@ const BracketPage = () => {
         [selectedCategoryId, sex, age, updateURL]
     );
 
+    const aplicaBrackets = useCallback(({ meciuri, catMap, probaMap, sportiviMap }) => {
+        setCategoriiMap(catMap);
+        setSportiviNume(sportiviMap);
+
+        setCategories(
+            Object.entries(catMap).map(([categorie, c]) => ({
+                categorie,
+                sex: c.sex,
+                probaId: c.proba,
+                varsta_min: c.varsta_min,
+                varsta_max: c.varsta_max,
+                proba: probaMap[c.proba],
+                categorie_greutate: c.categorie_greutate || "",
+            }))
+        );
+
+        setBracketData(
+            meciuri.map((m) => ({
+                ...m,
+                sex: catMap[m.categorie].sex,
+                varsta: `${catMap[m.categorie].varsta_min}-${catMap[m.categorie].varsta_max}`,
+                greutate: catMap[m.categorie].categorie_greutate,
+                sportiv1_nume: sportiviMap[m.sportiv1],
+                sportiv2_nume: sportiviMap[m.sportiv2],
+            }))
+        );
+
+        setProbes(Object.entries(probaMap).map(([id, nume]) => ({ id: parseInt(id), nume })));
+    }, []);
+
     useEffect(() => {
         const fetchData = async () => {
             setIsLoading(true);
             try {
-                const [meciuriRes, sportiviRes, categoriiRes] = await Promise.all([
-                    apiClient.get(`${API_URL}/meciuri/`),
-                    apiClient.get(`${API_URL}/sportivi/`),
-                    apiClient.get(`${API_URL}/categorii/`),
-                ]);
-
-                const meciuri = meciuriRes.data;
-
-                const sportiviMap = {};
-                sportiviRes.data.forEach((s) => {
-                    sportiviMap[s.id] = `${s.nume} ${s.prenume} (${s.club_nume})`;
-                });
-
-                const catMap = {};
-                categoriiRes.data.forEach((cat) => {
-                    catMap[cat.id] = {
-                        proba: cat.proba,
-                        sex: cat.sex,
-                        varsta_min: cat.varsta_min,
-                        varsta_max: cat.varsta_max,
-                        categorie_greutate: cat.categorie_greutate,
-                    };
-                });
-                setCategoriiMap(catMap);
-
-                const categorySet = new Set();
-                const probaIds = new Set();
-                meciuri.forEach((m) => {
-                    const c = catMap[m.categorie];
-                    if (c) {
-                        categorySet.add(`${m.categorie}-${c.sex}-${c.proba}-${c.varsta_min}-${c.varsta_max}`);
-                        probaIds.add(c.proba);
-                    }
-                });
-
-                const probeRes = await Promise.all(Array.from(probaIds).map((id) => apiClient.get(`${API_URL}/probe/${id}/`)));
-
-                const probaMap = {};
-                probeRes.forEach((res) => {
-                    probaMap[res.data.id] = res.data.nume;
-                });
-
-                const uniqueCategories = Array.from(categorySet).map((item) => {
-                    const [categorie, sex, probaId, varsta_min, varsta_max] = item.split("-");
-                    const catObj = categoriiRes.data.find((c) => c.id == categorie);
-                    return {
-                        categorie,
-                        sex,
-                        probaId,
-                        varsta_min,
-                        varsta_max,
-                        proba: probaMap[parseInt(probaId)],
-                        categorie_greutate: catObj?.categorie_greutate || "",
-                    };
-                });
-
-                setBracketData(
-                    meciuri.map((m) => ({
-                        ...m,
-                        sex: catMap[m.categorie]?.sex,
-                        varsta: `${catMap[m.categorie]?.varsta_min}-${catMap[m.categorie]?.varsta_max}`,
-                        greutate: catMap[m.categorie]?.categorie_greutate,
-                        sportiv1_nume: sportiviMap[m.sportiv1],
-                        sportiv2_nume: sportiviMap[m.sportiv2],
-                    }))
-                );
-
-                setCategories(uniqueCategories);
-                setProbes(Object.entries(probaMap).map(([id, nume]) => ({ id: parseInt(id), nume })));
+                aplicaBrackets(await fetchBrackets(apiClient, competitieId));
                 setDataLoaded(true);
             } catch (error) {
                 console.error("Eroare la fetch:", error);
@@ -239,37 +241,50 @@ const BracketPage = () => {
         };
 
         fetchData();
-    }, []);
+    }, [competitieId]);
+
+    // Răspunsul are ETag, deci reîncărcarea fără modificări este ieftină pe server
+    const refreshMatches = useCallback(async () => {
+        try {
+            aplicaBrackets(await fetchBrackets(apiClient, competitieId));
+        } catch (error) {
+            console.error("Eroare la refresh meciuri:", error);
+        }
+    }, [apiClient, competitieId, aplicaBrackets]);
 
     useEffect(() => {
         if (dataLoaded && location.state?.refreshData) {
-            const refreshMatches = async () => {
-                try {
-                    const meciuriRes = await apiClient.get(`${API_URL}/meciuri/`);
-                    const meciuri = meciuriRes.data;
-
-                    setBracketData((prevData) =>
-                        meciuri.map((m) => {
-                            const existing = prevData.find((p) => p.id === m.id);
-                            return {
-                                ...m,
-                                sex: existing?.sex,
-                                varsta: existing?.varsta,
-                                greutate: existing?.greutate,
-                                sportiv1_nume: existing?.sportiv1_nume,
-                                sportiv2_nume: existing?.sportiv2_nume,
-                            };
-                        })
-                    );
-                } catch (error) {
-                    console.error("Eroare la refresh meciuri:", error);
-                }
-            };
-
             refreshMatches();
             window.history.replaceState({}, document.title);
         }
-    }, [dataLoaded, location.state, apiClient]);
+    }, [dataLoaded, location.state, refreshMatches]);
+
+    useEffect(() => {
+        if (!dataLoaded) return;
+
+        const aplicaDelta = (event) => {
+            const { meci } = JSON.parse(event.data);
+            setBracketData((prevData) =>
+                prevData.map((m) =>
+                    m.id === meci.id
+                        ? {
+                              ...m,
+                              ...meci,
+                              sportiv1_nume: sportiviNume[meci.sportiv1],
+                              sportiv2_nume: sportiviNume[meci.sportiv2],
+                          }
+                        : m
+                )
+            );
+        };
+
+        const sursa = new EventSource(`${API_URL}/competitii/${competitieId}/evenimente/`);
+        sursa.addEventListener("meci", aplicaDelta);
+        sursa.addEventListener("bracket", refreshMatches);
+        sursa.addEventListener("resync", refreshMatches);
+
+        return () => sursa.close();
+    }, [dataLoaded, competitieId, sportiviNume, refreshMatches]);
 
     const { filteredData, participantsCount } = useMemo(() => {
         if (!selectedCategoryId || !sex || !age || !weight) {
@@ -362,6 +377,7 @@ const BracketPage = () => {
                     { idSportiv: m.sportiv1, name: m.sportiv1_nume || "-------", score: m.scor1 },
                     { idSportiv: m.sportiv2, name: m.sportiv2_nume || "-------", score: m.scor2 },
                 ],
+                saltea: m.saltea,
                 greutate: m.greutate,
                 varsta: m.varsta,
                 sex: m.sex,
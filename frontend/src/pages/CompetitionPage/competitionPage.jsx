@@ -1,6 +1,6 @@
-import { Box, Typography, Card, useTheme, useMediaQuery, List, ListItem, ListItemIcon, ListItemText } from "@mui/material";
+import { Box, Button, Typography, Card, useTheme, useMediaQuery, List, ListItem, ListItemIcon, ListItemText } from "@mui/material";
 import axios from "axios";
-import { useParams } from "react-router-dom";
+import { Link, useParams } from "react-router-dom";
 import { useEffect, useState } from "react";
 import Navbar from "../../components/sections/Navbar/navbar";
 import Footer from "../../components/sections/Footer/footer";
@@ -178,6 +178,11 @@ export default function CompetitionPage() {
                             </Typography>
                         )}
                     </Box>
+                    <Box sx={{ pr: 5, textAlign: "center" }}>
+                        <Button variant="contained" color="primary" size="large" component={Link} to={`/competition/${id}/brackets`}>
+                            Bracket-uri
+                        </Button>
+                    </Box>
                 </Box>
 
                 {/* Right side - Google Maps */}
@@ -37,6 +37,7 @@ const MatchDashboard = () => {
     const [metadata, setMetadata] = useState({});
     const [isFinalizingMatch, setIsFinalizingMatch] = useState(false);
     const [error, setError] = useState(null);
+    const [verdictVideo, setVerdictVideo] = useState(null);
     const channel = useRef(new BroadcastChannel("match_channel"));
     const timerRef = useRef(null);
     const scoreRef = useRef(score);
@@ -498,16 +499,25 @@ const MatchDashboard = () => {
     );
 
     const startRecording = async () => {
-        await axios.post(`${API_URL}/start-recording/`);
+        setVerdictVideo(null);
+        await axios.post(`${API_URL}/start-recording/`, { meci: metadata.id, saltea: metadata.saltea });
     };
     const stopRecording = async () => {
-        await axios.post(`${API_URL}/stop-recording/`);
+        const { data: job } = await axios.post(`${API_URL}/stop-recording/`, { meci: metadata.id, saltea: metadata.saltea });
+        // Analiza rulează în fundal; verdictul este citit periodic până la terminare
+        let stare = job;
+        while (stare.status === "in_asteptare" || stare.status === "in_lucru") {
+            await new Promise((resolve) => setTimeout(resolve, 2000));
+            stare = (await axios.get(`${API_URL}/analize-video/${job.id}/`)).data;
+        }
+        setVerdictVideo(stare);
     };
     const startLiveStream = async () => {
-        await axios.post(`${API_URL}/start-livestream/`);
+        // Fără saltea (meci neprogramat), serverul folosește saltea implicită
+        await axios.post(`${API_URL}/start-livestream/`, { saltea: metadata.saltea });
     };
     const stopLiveStream = async () => {
-        await axios.post(`${API_URL}/stop-livestream/`);
+        await axios.post(`${API_URL}/stop-livestream/`, { saltea: metadata.saltea });
     };
 
     return (
@@ -520,6 +530,14 @@ const MatchDashboard = () => {
                     </Box>
                 )}
 
+                {verdictVideo && (
+                    <Box sx={{ mb: 2 }}>
+                        <Alert severity={verdictVideo.castigator ? "info" : "warning"} onClose={() => setVerdictVideo(null)}>
+                            Analiza video: {verdictVideo.mesaj}
+                        </Alert>
+                    </Box>
+                )}
+
                 {canFinalize() && (
                     <Box sx={{ mb: 2 }}>
                         <Alert severity="warning">Meciul poate fi finalizat: {getFinalizationReason()}</Alert>